@@ -0,0 +1,23 @@
+"""
+Portfolio Backend - Admin Token Check
+"""
+
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.config import settings
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    FastAPI dependency guarding operator-only endpoints.
+
+    404 unless ADMIN_TOKEN is configured, so the endpoint is invisible by
+    default; 401 when the X-Admin-Token header does not match.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_token or "", settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
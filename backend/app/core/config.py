@@ -19,6 +19,132 @@ class Settings(BaseSettings):
     # RAG Configuration
     confidence_threshold: float = 0.7
     max_conversation_history: int = 10
+    # Request size limits, enforced when ChatRequest is validated (422)
+    max_message_chars: int = 2000
+    max_history_messages: int = 50
+    max_history_chars: int = 40000
+    # /api/retrieve (needs ADMIN_TOKEN): queries per request and chunks per query
+    max_retrieve_queries: int = 100
+    max_retrieve_k: int = 20
+    # Prompt budget in approximate tokens, counted locally (see prompt.py)
+    prompt_max_input_tokens: int = 6000
+    prompt_max_context_tokens: int = 3000
+    # Most recent history messages sent verbatim; older ones are compacted
+    prompt_history_verbatim_messages: int = 4
+    prompt_compacted_message_tokens: int = 60
+    # Retrieval: cosine similarity cutoff and dynamic k
+    retrieval_max_k: int = 5
+    retrieval_min_similarity: float = 0.55
+    # Drop hits scoring more than this below the best hit
+    retrieval_relative_margin: float = 0.1
+    # Cosine similarities mapped to relevance 0.0 and 1.0
+    similarity_floor: float = 0.5
+    similarity_ceiling: float = 0.85
+    # Hybrid retrieval: BM25 keyword hits fused with vector hits by
+    # reciprocal rank fusion
+    hybrid_search_enabled: bool = True
+    rrf_k: int = 60
+    # Normalized BM25 score (1.0 ~ every query term once in an average chunk)
+    keyword_min_score: float = 0.5
+    # Skip the query embedding when the best keyword hit scores this high;
+    # 0 disables the fast path
+    keyword_fast_path_score: float = 1.0
+
+    # Vector index: flat, ivf_flat, hnsw or ivf_pq (see app/services/ann.py)
+    index_type: str = "flat"
+    index_nlist: int = 100
+    index_nprobe: int = 10
+    index_hnsw_m: int = 32
+    index_ef_construction: int = 200
+    index_ef_search: int = 64
+    index_pq_m: int = 64
+    index_pq_bits: int = 8
+    # Hash every index file against the manifest on load (slower cold start)
+    index_verify_checksums: bool = False
+
+    # Index builds
+    # "gemini", "local" (ONNX on CPU) or "stub" (offline, deterministic);
+    # see embedding_backends.py
+    embedding_backend: str = "gemini"
+    # Build a missing/stale index inside the server. Production images bake
+    # the index with `python -m app.index build` and disable this.
+    index_runtime_build: bool = True
+
+    # Index hot reload
+    # Token for POST /admin/reload and /api/retrieve (X-Admin-Token header);
+    # empty disables both
+    admin_token: str = ""
+    # Poll rag_docs for changes every N seconds; 0 disables the watcher
+    docs_watch_interval_seconds: float = 0.0
+
+    # Structured logging: records are written by a background thread
+    log_queue_size: int = 10000
+    # When the queue is full: "drop" (counted) or "block" (wait up to the
+    # timeout, then drop)
+    log_queue_policy: str = "drop"
+    log_queue_block_timeout_seconds: float = 0.05
+    log_batch_size: int = 256
+
+    # Prometheus metrics on GET /metrics (in-process, per worker)
+    metrics_enabled: bool = True
+
+    # Startup warm-up
+    warmup_enabled: bool = True
+    # Comma-separated queries to pre-embed (defaults to the frontend suggestions)
+    warmup_queries: str = "The Pitch,Work Style,Tech Insights,How This Works?"
+
+    # Gemini upstream calls
+    # Empty base URL uses the SDK default; point it at a stub server for load tests
+    gemini_base_url: str = ""
+    gemini_max_concurrency: int = 8
+    gemini_timeout_seconds: float = 30.0
+    embedding_timeout_seconds: float = 10.0
+    # Calls waiting for one of the GEMINI_MAX_CONCURRENCY slots; beyond this
+    # new calls are shed with 503 + Retry-After (see upstream.py)
+    upstream_max_queue: int = 32
+    # Retries of 429/5xx responses, with jittered exponential backoff
+    upstream_max_retries: int = 2
+    upstream_retry_base_delay: float = 0.5
+    # Budget per call for queueing, attempts and backoff together
+    upstream_deadline_seconds: float = 45.0
+    # Identical in-flight calls share one upstream request
+    upstream_coalesce: bool = True
+
+    # Index build embedding
+    embedding_batch_size: int = 100
+    embedding_max_workers: int = 4
+    embedding_max_retries: int = 5
+    embedding_retry_base_delay: float = 1.0
+
+    # Local embedding backend (fastembed)
+    local_embedding_model: str = "BAAI/bge-small-en-v1.5"
+    local_embedding_batch_size: int = 64
+    # Inference threads sharing the model, for builds and concurrent queries
+    local_embedding_workers: int = 2
+    # ONNX Runtime threads per inference; 0 uses the runtime default
+    local_embedding_threads: int = 0
+
+    # Query embedding cache
+    query_cache_size: int = 1024
+    query_cache_ttl_seconds: float = 3600.0
+    # SQLite file shared by workers on one host; empty disables it
+    query_cache_shared_path: str = ""
+
+    # Server-side conversation store (opt-in): clients may then send only
+    # the new message with their conversation_id
+    conversation_store_enabled: bool = False
+    conversation_store_size: int = 1000
+    conversation_ttl_seconds: float = 1800.0
+    # Serialized size cap per conversation; oldest turns are dropped to fit
+    conversation_max_bytes: int = 32768
+    # SQLite file shared by workers on one host; empty keeps it per worker
+    conversation_store_shared_path: str = ""
+
+    # Semantic response cache (opt-in)
+    response_cache_enabled: bool = False
+    response_cache_similarity: float = 0.95
+    response_cache_size: int = 256
+    response_cache_ttl_seconds: float = 3600.0
 
     class Config:
         env_file = ".env"
@@ -1,11 +1,147 @@
 """
 Portfolio Backend - Structured Logging
+
+Records are built on the calling thread but encoded and written by a
+background writer thread, so a slow stderr never blocks the event loop.
+The writer drains a bounded queue in batches; when the queue is full,
+records are dropped (or the caller waits briefly, with the "block"
+policy) and the drops are reported in a `log_dropped` record.
 """
 
+import atexit
 import json
+import queue
 import sys
+import threading
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, TextIO
+
+from app.core.config import settings
+from app.core.metrics import ERRORS, LOG_DROPPED
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+LOG_QUEUE_POLICIES = ("drop", "block")
+
+
+def _encode(entry: dict) -> str:
+    """One JSON line, with orjson when it is installed."""
+    try:
+        if orjson is not None:
+            return orjson.dumps(entry).decode()
+        return json.dumps(entry)
+    except TypeError:
+        # Unexpected value types are logged as strings rather than lost
+        return json.dumps(entry, default=str)
+
+
+class LogWriter:
+    """Bounded queue of log records drained by one writer thread."""
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        max_size: int,
+        policy: str = "drop",
+        block_timeout: float = 0.05,
+        batch_size: int = 256,
+        stream: Optional[TextIO] = None,
+    ) -> None:
+        if policy not in LOG_QUEUE_POLICIES:
+            raise ValueError(f"Unknown log queue policy {policy!r}")
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        # None writes to whatever sys.stderr is at write time
+        self.stream = stream
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def emit(self, entry: dict) -> None:
+        """Queue a record; never waits longer than the block timeout."""
+        if self._thread is None:
+            self.start()
+        try:
+            if self.policy == "block":
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            LOG_DROPPED.inc()
+
+    def start(self) -> None:
+        """Start the writer thread (idempotent)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write everything queued so far, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(entry is self._STOP for entry in batch)
+            self._write([entry for entry in batch if entry is not self._STOP])
+            if stop:
+                return
+
+    def _write(self, batch: list[dict]) -> None:
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            batch.append(
+                {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "severity": "WARNING",
+                    "type": "log_dropped",
+                    "dropped": dropped,
+                }
+            )
+        if not batch:
+            return
+        stream = self.stream or sys.stderr
+        try:
+            stream.write("".join(_encode(entry) + "\n" for entry in batch))
+            stream.flush()
+        except Exception:
+            # Logging must never take the writer thread down
+            pass
+
+
+_writer = LogWriter(
+    max_size=settings.log_queue_size,
+    policy=settings.log_queue_policy,
+    block_timeout=settings.log_queue_block_timeout_seconds,
+    batch_size=settings.log_batch_size,
+)
+# Processes without the FastAPI lifespan (CLI, tests) still flush on exit
+atexit.register(_writer.stop)
 
 
 class PortfolioLogger:
@@ -22,6 +158,11 @@ class PortfolioLogger:
         response_time_ms: int,
         warnings: list[str],
         query_hash: Optional[str] = None,
+        time_to_first_token_ms: Optional[int] = None,
+        cache: Optional[dict] = None,
+        cached: bool = False,
+        prompt_tokens: Optional[dict] = None,
+        stages: Optional[dict] = None,
     ) -> None:
         """Log chat metadata only - NO user input or AI response content."""
         log_entry = {
@@ -36,8 +177,42 @@ class PortfolioLogger:
             },
             "security": {"warnings": warnings},
             "query_hash": query_hash,
+            "cached": cached,
         }
-        print(json.dumps(log_entry), file=sys.stderr)
+        if time_to_first_token_ms is not None:
+            # Streaming responses only
+            log_entry["metrics"]["time_to_first_token_ms"] = time_to_first_token_ms
+        if cache is not None:
+            log_entry["cache"] = cache
+        if prompt_tokens is not None:
+            # Approximate input tokens per prompt section
+            log_entry["prompt_tokens"] = prompt_tokens
+        if stages is not None:
+            # Milliseconds per request stage (sanitize, embed, generate, ...)
+            log_entry["metrics"]["stages_ms"] = stages
+        _writer.emit(log_entry)
+
+    @staticmethod
+    def log_retrieve_request(
+        queries_count: int,
+        sources_count: int,
+        response_time_ms: int,
+        stages: Optional[dict] = None,
+    ) -> None:
+        """Log batch retrieval metadata only - NO queries or chunk content."""
+        log_entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "severity": "INFO",
+            "type": "retrieve_request",
+            "metrics": {
+                "queries_count": queries_count,
+                "sources_count": sources_count,
+                "response_time_ms": response_time_ms,
+            },
+        }
+        if stages is not None:
+            log_entry["metrics"]["stages_ms"] = stages
+        _writer.emit(log_entry)
 
     @staticmethod
     def log_retrieval_failure(query_hash: str) -> None:
@@ -48,15 +223,33 @@ class PortfolioLogger:
             "type": "retrieval_failure",
             "query_hash": query_hash,
         }
-        print(json.dumps(log_entry), file=sys.stderr)
+        _writer.emit(log_entry)
+
+    @staticmethod
+    def log_index_reload(changes: dict, duration_ms: int) -> None:
+        """Log an index reload (source file paths only, no content)."""
+        log_entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "severity": "INFO",
+            "type": "index_reload",
+            "duration_ms": duration_ms,
+            **changes,
+        }
+        _writer.emit(log_entry)
 
     @staticmethod
     def log_error(error_type: str, message: str) -> None:
         """Log application errors."""
+        ERRORS.inc(error_type)
         log_entry = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "severity": "ERROR",
             "type": error_type,
             "message": message,
         }
-        print(json.dumps(log_entry), file=sys.stderr)
+        _writer.emit(log_entry)
+
+    @staticmethod
+    def flush() -> None:
+        """Write all queued records and stop the writer (on shutdown)."""
+        _writer.stop()
@@ -0,0 +1,250 @@
+"""
+Portfolio Backend - Metrics
+
+In-process counters, gauges and latency histograms, rendered in the
+Prometheus text format by GET /metrics. Recording is a dictionary update
+under a lock (plus a bisect for histograms): about 1 us per counter
+increment and 2 us per timed stage, against requests taking milliseconds.
+
+Request stages are timed with `Stages`, one per request, which feeds the
+stage histogram and the stage breakdown in the chat request log.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterator
+
+# Seconds; covers sub-millisecond cache hits up to slow generations
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)  # fmt: skip
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for labels, value in sorted(self._values.items()):
+            yield self.name, _labels(self.labels, labels), value
+
+
+class Gauge(Counter):
+    """Current value per label combination."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """Bucketed distribution per label combination, with quantile estimates."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # Per label combination: [count per bucket (+Inf last), sum]
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def quantile(self, q: float, *labels: str) -> float:
+        """Estimate by linear interpolation inside the bucket holding rank q."""
+        series = self._series.get(labels)
+        if not series or not sum(series[0]):
+            return 0.0
+        counts = series[0]
+        rank = q * sum(counts)
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip([*self.buckets, float("inf")], counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                yield (
+                    self.name + "_bucket",
+                    _labels(self.labels, labels, le=le),
+                    cumulative,
+                )
+            yield self.name + "_sum", _labels(self.labels, labels), total[0]
+            yield self.name + "_count", _labels(self.labels, labels), cumulative
+
+    def quantile_samples(self) -> Iterator[tuple[str, str, float]]:
+        for labels in sorted(self._series):
+            for q in QUANTILES:
+                yield (
+                    self.name + "_quantile",
+                    _labels(self.labels, labels, quantile=str(q)),
+                    self.quantile(q, *labels),
+                )
+
+
+STAGE_SECONDS = Histogram(
+    "portfolio_stage_duration_seconds",
+    "Duration of each chat request stage",
+    labels=("stage",),
+)
+REQUEST_SECONDS = Histogram(
+    "portfolio_request_duration_seconds",
+    "End-to-end duration of chat and retrieve requests",
+    labels=("endpoint",),
+)
+REQUESTS = Counter(
+    "portfolio_requests_total", "Chat and retrieve requests", labels=("endpoint",)
+)
+ERRORS = Counter("portfolio_errors_total", "Logged errors", labels=("type",))
+CACHE_EVENTS = Counter(
+    "portfolio_cache_lookups_total",
+    "Cache lookups by cache and result",
+    labels=("cache", "result"),
+)
+TOKENS = Counter(
+    "portfolio_gemini_tokens_total",
+    "Gemini token usage reported by the API",
+    labels=("kind",),
+)
+UPSTREAM_CALLS = Counter(
+    "portfolio_upstream_calls_total",
+    "Gemini calls by upstream and outcome (ok, retried, coalesced, shed, failed)",
+    labels=("upstream", "outcome"),
+)
+LOG_DROPPED = Counter(
+    "portfolio_log_records_dropped_total", "Log records dropped on a full queue"
+)
+GAUGES = Gauge(
+    "portfolio_state", "Index and cache sizes at scrape time", labels=("name",)
+)
+
+REGISTRY = [
+    STAGE_SECONDS,
+    REQUEST_SECONDS,
+    REQUESTS,
+    ERRORS,
+    CACHE_EVENTS,
+    TOKENS,
+    UPSTREAM_CALLS,
+    LOG_DROPPED,
+    GAUGES,
+]
+
+
+def render(collect: Callable[[], dict[str, float]] = dict) -> str:
+    """Prometheus text exposition; `collect` returns gauges to refresh first."""
+    for name, value in collect().items():
+        GAUGES.set(value, name)
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines += [
+            f"# HELP {metric.name} {metric.help}",
+            f"# TYPE {metric.name} {metric.kind}",
+        ]
+        lines += [f"{n}{labels} {_number(v)}" for n, labels, v in metric.samples()]
+        if isinstance(metric, Histogram):
+            name = metric.name + "_quantile"
+            lines += [
+                f"# HELP {name} Estimated p50/p95/p99 of {metric.name}",
+                f"# TYPE {name} gauge",
+            ]
+            lines += [
+                f"{n}{labels} {_number(v)}"
+                for n, labels, v in metric.quantile_samples()
+            ]
+    return "\n".join(lines) + "\n"
+
+
+class Stages:
+    """Per-request stage durations on a monotonic clock."""
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = {}
+
+    def time(self, stage: str) -> "_StageTimer":
+        """Context manager adding the duration of its block to `stage`."""
+        return _StageTimer(self, stage)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, stage)
+
+    def as_ms(self) -> dict[str, float]:
+        """Stage breakdown for the request log."""
+        return {stage: round(s * 1000, 2) for stage, s in self.seconds.items()}
+
+
+class _StageTimer:
+    """Plain class rather than @contextmanager: half the per-use overhead."""
+
+    __slots__ = ("stages", "stage", "start")
+
+    def __init__(self, stages: Stages, stage: str) -> None:
+        self.stages = stages
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stages.add(self.stage, time.perf_counter() - self.start)
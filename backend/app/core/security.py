@@ -5,6 +5,12 @@ Portfolio Backend - Input Sanitization
 import re
 from typing import Tuple
 
+# ASCII lowercasing keeps string offsets intact; also folds the two non-ASCII
+# characters that IGNORECASE would match against the patterns' "s" and "k"
+_CASE_FOLD = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZſK", "abcdefghijklmnopqrstuvwxyzsk"
+)
+
 
 class InputSanitizer:
     """Prevents prompt injection attacks and detects PII in user input."""
@@ -17,11 +23,23 @@ class InputSanitizer:
         r"disregard (previous|above|all)",
     ]
 
+    # Matched against lowercased text. Emails are found from their "@", and
+    # quantifiers are bounded (RFC 5321 lengths), so long address-like runs
+    # cannot cause quadratic backtracking.
     PII_PATTERNS = {
         "phone": r"\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b",
-        "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b",
+        "email": r"(?<=[a-z0-9._%+-])@[a-z0-9.-]{1,253}\.[a-z]{2,63}\b",
     }
 
+    _PATTERNS = [
+        *(("injection", re.compile(p)) for p in INJECTION_PATTERNS),
+        *((f"contains_{name}", re.compile(p)) for name, p in PII_PATTERNS.items()),
+    ]
+    # One alternation scans the input once. Branches are not wrapped in
+    # capture groups, which would disable the regex engine's prefix scan;
+    # the rare match is attributed to its pattern afterwards.
+    _COMBINED = re.compile("|".join(f"(?:{p.pattern})" for _, p in _PATTERNS))
+
     @classmethod
     def sanitize(cls, user_input: str) -> Tuple[str, list[str]]:
         """
@@ -34,20 +52,27 @@ class InputSanitizer:
         - PII is detected but NOT blocked
         - All warnings are logged for monitoring
         """
-        warnings: list[str] = []
-        sanitized = user_input
-
-        # Check for prompt injection
-        for pattern in cls.INJECTION_PATTERNS:
-            if re.search(pattern, user_input, re.IGNORECASE):
-                warnings.append("potential_injection_attempt")
-                sanitized = re.sub(
-                    pattern, "[FILTERED]", sanitized, flags=re.IGNORECASE
-                )
-
-        # Check for PII (warn only, don't block)
-        for pii_type, pattern in cls.PII_PATTERNS.items():
-            if re.search(pattern, user_input):
-                warnings.append(f"contains_{pii_type}")
+        folded = user_input.translate(_CASE_FOLD)
+        matched: set[int] = set()
+        parts: list[str] = []
+        pos = 0
+        for match in cls._COMBINED.finditer(folded):
+            start, end = match.span()
+            i = next(
+                i
+                for i, (_, pattern) in enumerate(cls._PATTERNS)
+                if pattern.fullmatch(folded, start, end)
+            )
+            matched.add(i)
+            if cls._PATTERNS[i][0] == "injection":
+                parts += [user_input[pos:start], "[FILTERED]"]
+                pos = end
+        sanitized = "".join(parts) + user_input[pos:] if parts else user_input
 
+        # One warning per matched injection pattern, then per PII type
+        warnings = [
+            "potential_injection_attempt" if kind == "injection" else kind
+            for i, (kind, _) in enumerate(cls._PATTERNS)
+            if i in matched
+        ]
         return sanitized, warnings
@@ -0,0 +1,164 @@
+"""
+Portfolio Backend - Index CLI
+
+Builds and inspects the index artifact offline, e.g. while building the
+Docker image, so the server only ever loads a prebuilt index:
+
+    python -m app.index build [--full] [--backend gemini|local|stub]
+    python -m app.index verify
+    python -m app.index stats
+    python -m app.index diff
+
+Every command prints JSON; verify exits non-zero on a broken artifact.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.services import rag_service
+from app.services.bm25 import BM25Index
+from app.services.embedding_backends import EMBEDDING_BACKENDS
+from app.services.index_store import (
+    ChunkStore,
+    current_artifact,
+    open_index,
+    read_manifest,
+    verify_artifact,
+)
+from app.services.rag_service import RAGService
+
+
+def _artifact() -> tuple[Path, Optional[dict]]:
+    artifact = current_artifact(rag_service.INDEX_PATH)
+    return artifact, read_manifest(artifact)
+
+
+def build(args: argparse.Namespace) -> int:
+    """Build the index (incrementally unless --full) and publish it."""
+    if args.full:
+        RAGService.build_index()
+        changes = {"mode": "full"}
+    else:
+        changes = RAGService.update_index()
+
+    artifact, manifest = _artifact()
+    if manifest is None:
+        _print({"error": "No index was built (no documents?)"})
+        return 1
+    _print({**changes, "version": artifact.name, **_summary(manifest)})
+    return 0
+
+
+def verify(args: argparse.Namespace) -> int:
+    """Check checksums and that index, chunks and keyword index agree."""
+    artifact, manifest = _artifact()
+    if manifest is None:
+        _print({"ok": False, "errors": [f"No current artifact in {artifact}"]})
+        return 1
+
+    errors = [
+        f"checksum mismatch: {name}" for name in verify_artifact(artifact, manifest)
+    ]
+    if not errors:
+        counts = {
+            "manifest": manifest["count"],
+            "index": open_index(artifact).ntotal,
+            "chunks": len(ChunkStore(artifact)),
+        }
+        keyword_index = BM25Index.load(artifact)
+        if keyword_index is not None:
+            counts["bm25"] = keyword_index.count
+        if len(set(counts.values())) != 1:
+            errors.append(f"count mismatch: {counts}")
+
+    _print({"ok": not errors, "version": artifact.name, "errors": errors})
+    return 1 if errors else 0
+
+
+def stats(args: argparse.Namespace) -> int:
+    """Print what the current artifact contains."""
+    artifact, manifest = _artifact()
+    if manifest is None:
+        _print({"error": f"No current artifact in {artifact}"})
+        return 1
+    size = sum(p.stat().st_size for p in artifact.iterdir() if p.is_file())
+    _print({"version": artifact.name, "bytes": size, **_summary(manifest)})
+    return 0
+
+
+def diff(args: argparse.Namespace) -> int:
+    """Show which rag_docs files differ from the current artifact."""
+    artifact, manifest = _artifact()
+    files = RAGService._file_hashes()
+    if manifest is None:
+        _print({"version": None, "added": sorted(files), "changed": [], "removed": []})
+    else:
+        _print({"version": artifact.name, **RAGService.diff_files(manifest, files)})
+    return 0
+
+
+def _summary(manifest: dict) -> dict:
+    return {
+        key: manifest[key]
+        for key in (
+            "created_at",
+            "content_digest",
+            "embedding_model",
+            "dimension",
+            "count",
+            "index_type",
+            "index_config",
+            "chunker",
+        )
+    } | {"files": len(manifest["files"])}
+
+
+def _print(data: dict) -> None:
+    print(json.dumps(data, indent=2))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--index-path", type=Path, help="artifact root directory")
+    common.add_argument("--docs-path", type=Path, help="markdown source directory")
+    common.add_argument(
+        "--backend",
+        choices=EMBEDDING_BACKENDS,
+        help="embedding backend (default: EMBEDDING_BACKEND setting)",
+    )
+    parser = argparse.ArgumentParser(
+        prog="python -m app.index",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", parents=[common], help=build.__doc__)
+    build_parser.add_argument(
+        "--full", action="store_true", help="rebuild instead of updating"
+    )
+    build_parser.set_defaults(handler=build)
+    for handler in (verify, stats, diff):
+        commands.add_parser(
+            handler.__name__, parents=[common], help=handler.__doc__
+        ).set_defaults(handler=handler)
+    args = parser.parse_args(argv)
+
+    if args.index_path:
+        rag_service.INDEX_PATH = args.index_path
+    if args.docs_path:
+        rag_service.RAG_DOCS_PATH = args.docs_path
+    if args.backend:
+        settings.embedding_backend = args.backend
+
+    # Build progress goes to stderr, command output (JSON) to stdout
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
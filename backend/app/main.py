@@ -2,20 +2,35 @@
 Portfolio Backend - FastAPI Application
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.routers import chat, health
+from app.core.logging import PortfolioLogger
+from app.routers import admin, chat, health, metrics, retrieve
+from app.services.docs_watcher import DocsWatcher
+from app.services.warmup import WarmupService
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan - initialize resources on startup."""
-    # Initialize RAG service on startup (lazy load)
+    # Warm up in the background so the server starts accepting probes at once;
+    # /ready reports when the index is loaded
+    if settings.warmup_enabled:
+        WarmupService.start()
+    else:
+        WarmupService.status = "ready"
+    if settings.docs_watch_interval_seconds > 0:
+        DocsWatcher.start()
     yield
+    await DocsWatcher.stop()
+    await WarmupService.stop()
+    # Write out queued log records before the process exits
+    await asyncio.to_thread(PortfolioLogger.flush)
 
 
 app = FastAPI(
@@ -38,3 +53,6 @@ app.add_middleware(
 # Routers
 app.include_router(health.router)
 app.include_router(chat.router, prefix="/api")
+app.include_router(retrieve.router, prefix="/api")
+app.include_router(admin.router)
+app.include_router(metrics.router)
@@ -2,8 +2,10 @@
 Portfolio Backend - Pydantic Models
 """
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Optional
+
+from app.core.config import settings
 
 
 class ChatMessage(BaseModel):
@@ -16,9 +18,22 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     """Request body for /api/chat endpoint."""
 
-    message: str
-    history: list[ChatMessage] = []
-    conversation_id: Optional[str] = None
+    # Size limits keep validation and sanitization cost bounded per request
+    message: str = Field(max_length=settings.max_message_chars)
+    # May be left empty when the server-side conversation store is enabled
+    history: list[ChatMessage] = Field(
+        default=[], max_length=settings.max_history_messages
+    )
+    conversation_id: Optional[str] = Field(default=None, max_length=128)
+
+    @field_validator("history")
+    @classmethod
+    def _limit_history_size(cls, history: list[ChatMessage]) -> list[ChatMessage]:
+        if sum(len(msg.content) for msg in history) > settings.max_history_chars:
+            raise ValueError(
+                f"history exceeds {settings.max_history_chars} characters in total"
+            )
+        return history
 
 
 class Source(BaseModel):
@@ -27,6 +42,32 @@ class Source(BaseModel):
     document: str
     relevance_score: float
     excerpt: str
+    # Markdown heading path ("A > B") and anchor of the chunk, if any
+    section: Optional[str] = None
+    anchor: Optional[str] = None
+
+
+class RetrieveRequest(BaseModel):
+    """Request body for /api/retrieve endpoint."""
+
+    queries: list[Annotated[str, Field(max_length=settings.max_message_chars)]] = Field(
+        min_length=1, max_length=settings.max_retrieve_queries
+    )
+    # Chunks per query; defaults to RETRIEVAL_MAX_K
+    k: Optional[int] = Field(default=None, ge=1, le=settings.max_retrieve_k)
+
+
+class RetrieveResult(BaseModel):
+    """Retrieved chunks for one query, in relevance order."""
+
+    sources: list[Source]
+    mode: str  # "vector", "hybrid" or "keyword"
+
+
+class RetrieveResponse(BaseModel):
+    """Response body for /api/retrieve endpoint (one result per query)."""
+
+    results: list[RetrieveResult]
 
 
 class ChatResponse(BaseModel):
@@ -44,3 +85,21 @@ class HealthResponse(BaseModel):
 
     status: str
     rag_index_loaded: bool
+
+
+class ReadyResponse(BaseModel):
+    """Response body for /ready endpoint."""
+
+    status: str
+    rag_index_loaded: bool
+
+
+class ReloadResponse(BaseModel):
+    """Response body for /admin/reload endpoint."""
+
+    mode: str  # "incremental" or "full"
+    added: list[str]
+    changed: list[str]
+    removed: list[str]
+    version: str
+    swapped: bool
@@ -0,0 +1,30 @@
+"""
+Portfolio Backend - Admin Router
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.auth import require_admin_token
+from app.core.logging import PortfolioLogger
+from app.models.schemas import ReloadResponse
+from app.services.docs_watcher import reload_index
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.post(
+    "/reload",
+    response_model=ReloadResponse,
+    dependencies=[Depends(require_admin_token)],
+)
+async def reload() -> ReloadResponse:
+    """
+    Apply rag_docs changes to the index and swap it in without downtime.
+
+    Disabled (404) unless ADMIN_TOKEN is configured.
+    """
+    try:
+        return ReloadResponse(**await reload_index())
+    except Exception as e:
+        PortfolioLogger.log_error("index_reload_error", str(e))
+        raise HTTPException(status_code=500, detail="Index reload failed")
@@ -3,15 +3,20 @@ Portfolio Backend - Chat Router
 """
 
 import hashlib
+import json
 import time
 import uuid
+from typing import AsyncIterator, Optional
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.core.logging import PortfolioLogger
+from app.core.metrics import REQUEST_SECONDS, REQUESTS, Stages
 from app.core.security import InputSanitizer
 from app.models.schemas import ChatRequest, ChatResponse, Source
 from app.services.rag_service import RAGService
+from app.services.upstream import UpstreamOverloaded
 
 router = APIRouter(tags=["Chat"])
 
@@ -21,6 +26,21 @@ def _hash_query(query: str) -> str:
     return hashlib.sha256(query.encode()).hexdigest()[:16]
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format a single Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _overloaded(error: UpstreamOverloaded) -> HTTPException:
+    """429/503 with Retry-After for a shed or rate-limited upstream call."""
+    PortfolioLogger.log_error("upstream_overloaded", str(error))
+    return HTTPException(
+        status_code=error.status_code,
+        detail="The assistant is busy, please retry shortly",
+        headers=error.headers,
+    )
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest) -> ChatResponse:
     """
@@ -30,31 +50,39 @@ async def chat(request: ChatRequest) -> ChatResponse:
     - Retrieves relevant documents
     - Generates response with confidence scoring
     - Logs metadata only (no user content)
+    - Returns 429/503 with Retry-After when Gemini is overloaded
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
+    stages = Stages()
 
     # Validate input
     if not request.message.strip():
         raise HTTPException(status_code=400, detail="Message cannot be empty")
 
     # Sanitize input
-    sanitized_message, warnings = InputSanitizer.sanitize(request.message)
+    with stages.time("sanitize"):
+        sanitized_message, warnings = InputSanitizer.sanitize(request.message)
 
     # Generate conversation ID if not provided
     conversation_id = request.conversation_id or str(uuid.uuid4())
 
     try:
         # Get RAG service instance
-        rag_service = RAGService.get_instance()
+        rag_service = await RAGService.aget_instance()
 
         # Generate response
         result = await rag_service.generate_response(
             query=sanitized_message,
             history=request.history,
+            conversation_id=conversation_id,
+            stages=stages,
         )
 
         # Calculate response time
-        response_time_ms = int((time.time() - start_time) * 1000)
+        elapsed = time.perf_counter() - start_time
+        response_time_ms = int(elapsed * 1000)
+        REQUESTS.inc("chat")
+        REQUEST_SECONDS.observe(elapsed, "chat")
 
         # Log metadata only
         PortfolioLogger.log_chat_request(
@@ -64,23 +92,130 @@ async def chat(request: ChatRequest) -> ChatResponse:
             response_time_ms=response_time_ms,
             warnings=warnings,
             query_hash=_hash_query(request.message),
+            cache=result.get("cache"),
+            cached=result.get("cached", False),
+            prompt_tokens=result.get("prompt_tokens"),
+            stages=stages.as_ms(),
         )
 
         return ChatResponse(
             response=result["response"],
-            sources=[
-                Source(
-                    document=s["document"],
-                    relevance_score=s["relevance_score"],
-                    excerpt=s["excerpt"],
-                )
-                for s in result["sources"]
-            ],
+            sources=[Source(**s) for s in result["sources"]],
             confidence=result["confidence"],
             has_sufficient_context=result["has_sufficient_context"],
             conversation_id=conversation_id,
         )
 
+    except UpstreamOverloaded as e:
+        raise _overloaded(e)
     except Exception as e:
         PortfolioLogger.log_error("chat_error", str(e))
         raise HTTPException(status_code=500, detail="Failed to generate response")
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Streaming chat endpoint (Server-Sent Events).
+
+    Emits a `sources` frame first, then `token` frames with text deltas,
+    then a `done` frame with confidence and context sufficiency.
+    Time to first token is logged next to the total response time.
+    Requests are shed with 503 + Retry-After when the generate queue is
+    full; an overload after streaming starts becomes an `error` frame.
+    """
+    start_time = time.perf_counter()
+    stages = Stages()
+
+    # Validate input
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+
+    # Sanitize input
+    with stages.time("sanitize"):
+        sanitized_message, warnings = InputSanitizer.sanitize(request.message)
+
+    # Generate conversation ID if not provided
+    conversation_id = request.conversation_id or str(uuid.uuid4())
+
+    try:
+        rag_service = await RAGService.aget_instance()
+        # Shed before the 200 is sent; later overloads are reported in-band
+        rag_service.gemini.upstream.check_capacity()
+    except UpstreamOverloaded as e:
+        raise _overloaded(e)
+    except Exception as e:
+        PortfolioLogger.log_error("chat_error", str(e))
+        raise HTTPException(status_code=500, detail="Failed to generate response")
+
+    async def event_stream() -> AsyncIterator[str]:
+        first_token_ms: Optional[int] = None
+        sources_count = 0
+        try:
+            async for event in rag_service.stream_response(
+                query=sanitized_message,
+                history=request.history,
+                conversation_id=conversation_id,
+                stages=stages,
+            ):
+                if event["event"] == "sources":
+                    sources_count = len(event["sources"])
+                    yield _sse(
+                        "sources",
+                        {
+                            "sources": [
+                                Source(**s).model_dump() for s in event["sources"]
+                            ],
+                            "conversation_id": conversation_id,
+                        },
+                    )
+                elif event["event"] == "token":
+                    if first_token_ms is None:
+                        first_token_ms = int((time.perf_counter() - start_time) * 1000)
+                    yield _sse("token", {"text": event["text"]})
+                else:
+                    elapsed = time.perf_counter() - start_time
+                    response_time_ms = int(elapsed * 1000)
+                    REQUESTS.inc("chat_stream")
+                    REQUEST_SECONDS.observe(elapsed, "chat_stream")
+                    PortfolioLogger.log_chat_request(
+                        confidence=event["confidence"],
+                        sources_count=sources_count,
+                        has_sufficient_context=event["has_sufficient_context"],
+                        response_time_ms=response_time_ms,
+                        warnings=warnings,
+                        query_hash=_hash_query(request.message),
+                        time_to_first_token_ms=first_token_ms,
+                        cache=event.get("cache"),
+                        cached=event.get("cached", False),
+                        prompt_tokens=event.get("prompt_tokens"),
+                        stages=stages.as_ms(),
+                    )
+                    yield _sse(
+                        "done",
+                        {
+                            "confidence": event["confidence"],
+                            "has_sufficient_context": event["has_sufficient_context"],
+                            "conversation_id": conversation_id,
+                        },
+                    )
+        except UpstreamOverloaded as e:
+            PortfolioLogger.log_error("upstream_overloaded", str(e))
+            yield _sse(
+                "error",
+                {
+                    "detail": "The assistant is busy, please retry shortly",
+                    "status": e.status_code,
+                    "retry_after": int(e.headers["Retry-After"]),
+                },
+            )
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            PortfolioLogger.log_error("chat_error", str(e))
+            yield _sse("error", {"detail": "Failed to generate response"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,30 +2,40 @@
 Portfolio Backend - Health Check Router
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
-from app.models.schemas import HealthResponse
+from app.models.schemas import HealthResponse, ReadyResponse
+from app.services.rag_service import RAGService
+from app.services.warmup import WarmupService
 
 router = APIRouter(tags=["Health"])
 
 
+def _index_loaded() -> bool:
+    """Report index state without creating the RAG service."""
+    rag_service = RAGService._instance
+    return rag_service is not None and rag_service.is_loaded()
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
-    """Health check endpoint for Docker/Cloud Run."""
-    # Basic liveness check
-    try:
-        # Import here to avoid circular imports
-        from app.services.rag_service import RAGService
-
-        rag_service = RAGService.get_instance()
-        is_loaded = rag_service.is_loaded()
-    except Exception:
-        # If RAG service fails to initialize, the API is still "alive"
-        # but maybe not "ready". For development, we'll return healthy
-        # but with rag_index_loaded=False.
-        is_loaded = False
+    """
+    Liveness check endpoint for Docker/Cloud Run.
 
+    Never loads or builds the index, so it stays cheap while warm-up runs.
+    """
     return HealthResponse(
         status="healthy",
-        rag_index_loaded=is_loaded,
+        rag_index_loaded=_index_loaded(),
+    )
+
+
+@router.get("/ready", response_model=ReadyResponse)
+async def readiness_check(response: Response) -> ReadyResponse:
+    """Readiness check: 503 until startup warm-up has finished."""
+    if not WarmupService.is_ready():
+        response.status_code = 503
+    return ReadyResponse(
+        status=WarmupService.status,
+        rag_index_loaded=_index_loaded(),
     )
@@ -0,0 +1,49 @@
+"""
+Portfolio Backend - Metrics Router
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import render
+from app.services.rag_service import RAGService
+
+router = APIRouter(tags=["Metrics"])
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _collect() -> dict[str, float]:
+    """Index, cache and upstream queue sizes, without creating the RAG service."""
+    rag_service = RAGService._instance
+    if rag_service is None or rag_service.snapshot is None:
+        return {"index_loaded": 0}
+    gauges = {
+        "index_loaded": int(rag_service.is_loaded()),
+        "index_chunks": len(rag_service.snapshot.documents),
+        "index_vectors": rag_service.snapshot.index.ntotal,
+        "query_cache_entries": len(rag_service.query_cache),
+    }
+    for manager in (rag_service.gemini.upstream, rag_service.embedder.upstream):
+        if manager is not None:
+            for name, value in manager.stats().items():
+                gauges[f"upstream_{manager.name}_{name}"] = value
+    if rag_service.response_cache is not None:
+        gauges["response_cache_entries"] = rag_service.response_cache.stats()["size"]
+    if rag_service.conversations is not None:
+        gauges["conversation_entries"] = rag_service.conversations.stats()["size"]
+    return gauges
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Request, stage, cache, error and token metrics for Prometheus.
+
+    Disabled (404) when METRICS_ENABLED is false.
+    """
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(render(_collect), media_type=CONTENT_TYPE)
@@ -0,0 +1,79 @@
+"""
+Portfolio Backend - Retrieve Router
+"""
+
+import time
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.auth import require_admin_token
+from app.core.logging import PortfolioLogger
+from app.core.metrics import REQUEST_SECONDS, REQUESTS, Stages
+from app.models.schemas import (
+    RetrieveRequest,
+    RetrieveResponse,
+    RetrieveResult,
+    Source,
+)
+from app.services.rag_service import RAGService
+from app.services.upstream import UpstreamOverloaded
+
+router = APIRouter(tags=["Retrieve"])
+
+
+@router.post(
+    "/retrieve",
+    response_model=RetrieveResponse,
+    dependencies=[Depends(require_admin_token)],
+)
+async def retrieve(request: RetrieveRequest) -> RetrieveResponse:
+    """
+    Batch retrieval without generation, for evaluation and prefetching.
+
+    Each request can embed up to MAX_RETRIEVE_QUERIES queries with Gemini,
+    so it needs the X-Admin-Token header and is disabled (404) unless
+    ADMIN_TOKEN is configured.
+
+    - Ranks chunks for every query as /api/chat would
+    - Embeds uncached queries in batches, one FAISS search for all of them
+    - Logs metadata only (no queries or chunk content)
+    - Returns 429/503 with Retry-After when Gemini is overloaded
+    """
+    start_time = time.perf_counter()
+    stages = Stages()
+
+    try:
+        rag_service = await RAGService.aget_instance()
+        retrievals = await rag_service.retrieve_many(
+            request.queries, k=request.k, stages=stages
+        )
+    except UpstreamOverloaded as e:
+        PortfolioLogger.log_error("upstream_overloaded", str(e))
+        raise HTTPException(
+            status_code=e.status_code,
+            detail="Embedding service is busy, please retry shortly",
+            headers=e.headers,
+        )
+    except Exception as e:
+        PortfolioLogger.log_error("retrieve_error", str(e))
+        raise HTTPException(status_code=500, detail="Failed to retrieve documents")
+
+    elapsed = time.perf_counter() - start_time
+    REQUESTS.inc("retrieve")
+    REQUEST_SECONDS.observe(elapsed, "retrieve")
+    PortfolioLogger.log_retrieve_request(
+        queries_count=len(request.queries),
+        sources_count=sum(len(r.sources) for r in retrievals),
+        response_time_ms=int(elapsed * 1000),
+        stages=stages.as_ms(),
+    )
+
+    return RetrieveResponse(
+        results=[
+            RetrieveResult(
+                sources=[Source(**s) for s in retrieval.sources],
+                mode=retrieval.mode,
+            )
+            for retrieval in retrievals
+        ]
+    )
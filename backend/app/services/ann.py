@@ -0,0 +1,127 @@
+"""
+Portfolio Backend - ANN Index Backends
+
+Builds the FAISS index selected by `Settings.index_type`:
+
+    flat      exact scan (IndexFlat), the default
+    ivf_flat  inverted lists over a k-means coarse quantizer
+    hnsw      hierarchical navigable small world graph
+    ivf_pq    inverted lists with product-quantized codes
+
+Training is handled here; parameters the corpus is too small for are clamped.
+Vectors are labeled with stable chunk ids: IVF indexes store ids natively,
+flat and HNSW indexes are wrapped in IndexIDMap.
+"""
+
+import math
+from typing import Optional
+
+import faiss
+import numpy as np
+
+from app.core.config import Settings, settings
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+# FAISS wants roughly this many training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+
+def _largest_divisor(n: int, at_most: int) -> int:
+    for m in range(min(at_most, n), 0, -1):
+        if n % m == 0:
+            return m
+    return 1
+
+
+def index_config(count: int, dimension: int, config: Settings = settings) -> dict:
+    """Resolve the effective index type and build parameters for a corpus."""
+    index_type = config.index_type
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index_type {index_type!r}, expected {INDEX_TYPES}")
+
+    nlist = max(1, min(config.index_nlist, count // MIN_POINTS_PER_CENTROID))
+    resolved: dict = {"type": index_type}
+
+    if index_type == "ivf_pq":
+        # Each PQ sub-quantizer trains 2**pq_bits centroids on `count` points
+        max_bits = math.floor(math.log2(max(count, 1) / MIN_POINTS_PER_CENTROID))
+        pq_bits = min(config.index_pq_bits, max_bits)
+        if pq_bits < 1:
+            # Too few vectors to train a quantizer; an exact scan is cheaper anyway
+            return {"type": "flat"}
+        resolved.update(
+            nlist=nlist,
+            pq_m=_largest_divisor(dimension, config.index_pq_m),
+            pq_bits=pq_bits,
+        )
+    elif index_type == "ivf_flat":
+        resolved.update(nlist=nlist)
+    elif index_type == "hnsw":
+        resolved.update(
+            hnsw_m=config.index_hnsw_m,
+            ef_construction=config.index_ef_construction,
+        )
+    return resolved
+
+
+def _factory_string(resolved: dict) -> str:
+    index_type = resolved["type"]
+    if index_type == "ivf_flat":
+        return f"IVF{resolved['nlist']},Flat"
+    if index_type == "hnsw":
+        return f"IDMap,HNSW{resolved['hnsw_m']},Flat"
+    if index_type == "ivf_pq":
+        return f"IVF{resolved['nlist']},PQ{resolved['pq_m']}x{resolved['pq_bits']}"
+    return "IDMap,Flat"
+
+
+def base_index(index: faiss.Index) -> faiss.Index:
+    """The index inside an IndexIDMap wrapper, or the index itself."""
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def build_ann_index(
+    vectors: np.ndarray,
+    metric: int = faiss.METRIC_L2,
+    config: Settings = settings,
+    ids: Optional[np.ndarray] = None,
+) -> tuple[faiss.Index, dict]:
+    """
+    Create, train and fill the configured index.
+
+    Args:
+        ids: int64 label per vector (defaults to row numbers)
+
+    Returns:
+        Tuple of (index, resolved_config) for the artifact manifest
+    """
+    count, dimension = vectors.shape
+    resolved = index_config(count, dimension, config)
+    index = faiss.index_factory(dimension, _factory_string(resolved), metric)
+
+    if resolved["type"] == "hnsw":
+        base_index(index).hnsw.efConstruction = resolved["ef_construction"]
+    if resolved["type"] == "ivf_pq":
+        # Polysemous codes are unused at search time and dominate training cost
+        index.do_polysemous_training = False
+    if not index.is_trained:
+        index.train(vectors)
+    if ids is None:
+        ids = np.arange(count, dtype=np.int64)
+    index.add_with_ids(vectors, ids)
+
+    configure_search(index, config)
+    return index, resolved
+
+
+def configure_search(index: faiss.Index, config: Settings = settings) -> None:
+    """Apply query-time knobs (nprobe, efSearch) to a loaded index."""
+    ivf: Optional[faiss.IndexIVF] = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(config.index_nprobe, ivf.nlist)
+    hnsw = base_index(index)
+    if hasattr(hnsw, "hnsw"):
+        hnsw.hnsw.efSearch = config.index_ef_search
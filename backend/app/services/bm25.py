@@ -0,0 +1,150 @@
+"""
+Portfolio Backend - BM25 Keyword Index
+
+In-process sparse index over the same chunks as the FAISS index. Postings
+are stored as flat numpy arrays (CSR layout) next to the vector index and
+opened memory-mapped:
+
+    bm25_vocab.json      terms, in term-id order, plus corpus statistics
+    bm25_offsets.npy     int64 postings offsets per term (terms + 1)
+    bm25_doc_ids.npy     int32 chunk ids per posting
+    bm25_tfs.npy         float32 term frequency per posting
+    bm25_doc_lens.npy    float32 token count per chunk
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+VOCAB_FILE = "bm25_vocab.json"
+OFFSETS_FILE = "bm25_offsets.npy"
+DOC_IDS_FILE = "bm25_doc_ids.npy"
+TFS_FILE = "bm25_tfs.npy"
+DOC_LENS_FILE = "bm25_doc_lens.npy"
+
+# Keeps tech names like "c++", "c#" and "next.js" as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    """
+    a about an and any are as at be been but by can could did do does for
+    from had has have her hers his how i if in is it its know me my of on or
+    s she so t tell than that the their them there they this to was we were
+    what when where which who why will with would you your
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens without stopwords."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over chunk texts."""
+
+    def __init__(
+        self,
+        vocab: dict[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_lens: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lens = doc_lens
+        self.k1 = k1
+        self.b = b
+        self.count = len(doc_lens)
+        self.avg_len = float(doc_lens.mean()) if self.count else 0.0
+
+    @classmethod
+    def build(cls, texts: list[str]) -> "BM25Index":
+        """Build postings for the given chunk texts (chunk id = list position)."""
+        term_docs: dict[str, list[tuple[int, int]]] = {}
+        doc_lens = np.zeros(len(texts), dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lens[doc_id] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_docs.setdefault(term, []).append((doc_id, tf))
+
+        terms = sorted(term_docs)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(term_docs[term])
+        postings = [p for term in terms for p in term_docs[term]]
+        doc_ids = np.array([d for d, _ in postings], dtype=np.int32)
+        tfs = np.array([tf for _, tf in postings], dtype=np.float32)
+
+        vocab = {term: i for i, term in enumerate(terms)}
+        return cls(vocab, offsets, doc_ids, tfs, doc_lens)
+
+    def save(self, directory: Path) -> None:
+        terms = sorted(self.vocab, key=self.vocab.__getitem__)
+        (directory / VOCAB_FILE).write_text(
+            json.dumps({"k1": self.k1, "b": self.b, "terms": terms})
+        )
+        np.save(directory / OFFSETS_FILE, self.offsets)
+        np.save(directory / DOC_IDS_FILE, self.doc_ids)
+        np.save(directory / TFS_FILE, self.tfs)
+        np.save(directory / DOC_LENS_FILE, self.doc_lens)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["BM25Index"]:
+        """Open a saved index memory-mapped, or return None if absent."""
+        if not (directory / VOCAB_FILE).exists():
+            return None
+        meta = json.loads((directory / VOCAB_FILE).read_text())
+        return cls(
+            vocab={term: i for i, term in enumerate(meta["terms"])},
+            offsets=np.load(directory / OFFSETS_FILE, mmap_mode="r"),
+            doc_ids=np.load(directory / DOC_IDS_FILE, mmap_mode="r"),
+            tfs=np.load(directory / TFS_FILE, mmap_mode="r"),
+            doc_lens=np.load(directory / DOC_LENS_FILE, mmap_mode="r"),
+            k1=meta["k1"],
+            b=meta["b"],
+        )
+
+    def _idf(self, df: int) -> float:
+        return math.log(1 + (self.count - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score chunks against the query.
+
+        Returns:
+            Tuple of (chunk_ids, normalized_scores), best first. Scores are
+            divided by the sum of the matched terms' IDF, so 1.0 means every
+            query term occurs once in an average-length chunk.
+        """
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids or self.count == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = np.zeros(self.count, dtype=np.float32)
+        idf_total = 0.0
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end]
+            idf = self._idf(int(end - start))
+            idf_total += idf
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lens[docs] / self.avg_len)
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        k = min(k, self.count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[scores[top] > 0]
+        return top, scores[top] / idf_total if idf_total > 0 else scores[top]
@@ -0,0 +1,235 @@
+"""
+Portfolio Backend - In-Process Caches
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+import numpy as np
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Insert or refresh a value, evicting the least recently used."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        """Counters for structured logs."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "size": len(self),
+        }
+
+
+class SqliteCache:
+    """
+    Byte-value cache in a SQLite file with TTL expiry.
+
+    Lets several uvicorn workers on one host share entries; each worker
+    keeps its own TTLCache in front of it.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=5)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+            )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                (key, value, time.time() + self.ttl_seconds),
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE expires_at <= ?", (time.time(),)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+
+class SemanticResponseCache:
+    """
+    Response cache matched on query embedding similarity.
+
+    Entries are bucketed by (retrieved chunk IDs, history key) so only answers
+    generated from the same context are candidates; within a bucket the
+    closest cached query wins if its cosine similarity meets the threshold.
+
+    Keyword fast-path answers have no query embedding; they are stored with
+    `set_exact` and match only the same normalized query and context.
+    """
+
+    MAX_PER_BUCKET = 8
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        similarity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.similarity = similarity
+        self._clock = clock
+        self._buckets: TTLCache[list[tuple[float, np.ndarray, str]]] = TTLCache(
+            max_size=max_size, ttl_seconds=ttl_seconds, clock=clock
+        )
+        self._exact: TTLCache[str] = TTLCache(
+            max_size=max_size, ttl_seconds=ttl_seconds, clock=clock
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def get(
+        self,
+        embedding: np.ndarray,
+        chunk_ids: tuple[int, ...],
+        history_key: str,
+    ) -> Optional[str]:
+        """Return a cached response for a similar query with the same context."""
+        bucket = self._buckets.get((chunk_ids, history_key)) or []
+        now = self._clock()
+        query = self._unit(embedding)
+        best_score, best_response = -1.0, None
+        for expires_at, cached_query, response in bucket:
+            if expires_at <= now:
+                continue
+            score = float(np.dot(query, cached_query))
+            if score > best_score:
+                best_score, best_response = score, response
+
+        if best_response is not None and best_score >= self.similarity:
+            self.hits += 1
+            return best_response
+        self.misses += 1
+        return None
+
+    def set(
+        self,
+        embedding: np.ndarray,
+        chunk_ids: tuple[int, ...],
+        history_key: str,
+        response: str,
+    ) -> None:
+        """Store a generated response for later similar queries."""
+        key = (chunk_ids, history_key)
+        now = self._clock()
+        bucket = [e for e in (self._buckets.get(key) or []) if e[0] > now]
+        bucket.append(
+            (now + self._buckets.ttl_seconds, self._unit(embedding), response)
+        )
+        self._buckets.set(key, bucket[-self.MAX_PER_BUCKET :])
+
+    def get_exact(
+        self, query_key: str, chunk_ids: tuple[int, ...], history_key: str
+    ) -> Optional[str]:
+        """Return a response cached for the same normalized query and context."""
+        response = self._exact.get((query_key, chunk_ids, history_key))
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def set_exact(
+        self,
+        query_key: str,
+        chunk_ids: tuple[int, ...],
+        history_key: str,
+        response: str,
+    ) -> None:
+        """Store a response generated without a query embedding."""
+        self._exact.set((query_key, chunk_ids, history_key), response)
+
+    def clear(self) -> None:
+        """Invalidate everything, e.g. after the index is rebuilt."""
+        self._buckets.clear()
+        self._exact.clear()
+
+    def stats(self) -> dict:
+        """Counters for structured logs."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "size": len(self._buckets) + len(self._exact),
+        }
@@ -0,0 +1,332 @@
+"""
+Portfolio Backend - Text Chunking
+
+Splitters work on (start, end) character spans into the source text and
+only slice strings when emitting a chunk, so splitting is linear in the
+input size. Every chunk, including its overlap with the previous chunk,
+fits within `chunk_size`.
+
+MarkdownSplitter additionally follows the heading hierarchy: chunks never
+cross a heading, code fences and tables stay whole when they fit, and each
+chunk carries its heading path and section anchor.
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from app.services.documents import Document
+
+LENGTH_UNITS = ("chars", "tokens")
+
+WHITESPACE = re.compile(r"\s")
+HEADING = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+FENCE = re.compile(r"^[ \t]{0,3}(`{3,}|~{3,})")
+
+# ASCII character classes for token counting: 0 space, 1 word, 2 punctuation
+_ASCII_CLASSES = np.array(
+    [
+        0 if chr(c).isspace() else 1 if chr(c).isalnum() or chr(c) == "_" else 2
+        for c in range(128)
+    ],
+    dtype=np.uint8,
+)
+
+
+def token_starts(text: str) -> Sequence[int]:
+    """
+    Character offsets where approximate tokens begin.
+
+    A token is a run of word characters or a single punctuation mark, which
+    tracks subword token counts for English prose without a tokenizer.
+    Vectorized over code points; non-ASCII characters count as word characters.
+    """
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    classes = np.where(codes < 128, _ASCII_CLASSES[np.minimum(codes, 127)], 1)
+    word = classes == 1
+    word_start = word & ~np.concatenate(([False], word[:-1]))
+    # A compact int64 array keeps bisect fast without one object per token
+    starts = np.flatnonzero(word_start | (classes == 2)).astype(np.int64)
+    return array("q", starts.tobytes())
+
+
+class TextSplitter:
+    """Recursive text splitter over character spans."""
+
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        length_unit: str = "chars",
+    ) -> None:
+        if length_unit not in LENGTH_UNITS:
+            raise ValueError(f"Unknown length_unit {length_unit!r}")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be in [0, chunk_size)")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.length_unit = length_unit
+        self.separators = ["\n\n", "\n", ". ", " "]
+
+    def split(self, text: str, source: str) -> list[Document]:
+        """Split text into chunks with overlap."""
+        return list(self.iter_split(text, source))
+
+    def iter_split(self, text: str, source: str) -> Iterator[Document]:
+        """Yield chunks lazily, with their character offsets into `text`."""
+        splitter = _SpanSplitter(self, text)
+        for start, end in splitter.chunks():
+            yield Document(content=text[start:end], source=source, start=start, end=end)
+
+
+class _SpanSplitter:
+    """Single-use splitting state for one text."""
+
+    def __init__(self, config: TextSplitter, text: str) -> None:
+        self.text = text
+        self.size = config.chunk_size
+        self.overlap = config.chunk_overlap
+        self.separators = config.separators
+        self.by_tokens = config.length_unit == "tokens"
+        self.token_starts = token_starts(text) if self.by_tokens else array("q")
+
+    def length(self, start: int, end: int) -> int:
+        if not self.by_tokens:
+            return end - start
+        starts = self.token_starts
+        return bisect_left(starts, end) - bisect_left(starts, start)
+
+    def chunks(
+        self, begin: int = 0, stop: Optional[int] = None
+    ) -> Iterator[tuple[int, int]]:
+        """Greedily merge pieces of text[begin:stop] into chunks, with overlap."""
+        chunk_start = chunk_end = None
+        stop = len(self.text) if stop is None else stop
+        for start, end in self.pieces(begin, stop, 0):
+            if chunk_start is None:
+                chunk_start, chunk_end = start, end
+                continue
+            if self.length(chunk_start, end) <= self.size:
+                chunk_end = end
+                continue
+            span = self.trim(chunk_start, chunk_end)
+            if span:
+                yield span
+            overlap_start = self.overlap_start(chunk_start, chunk_end)
+            if self.length(overlap_start, end) <= self.size:
+                chunk_start = overlap_start
+            else:
+                chunk_start = start
+            chunk_end = end
+        if chunk_start is not None:
+            span = self.trim(chunk_start, chunk_end)
+            if span:
+                yield span
+
+    def pieces(self, start: int, end: int, level: int) -> Iterator[tuple[int, int]]:
+        """
+        Contiguous spans of at most `size`, cut after separators.
+
+        Each separator stays at the end of the piece it terminates; oversized
+        pieces are split again with the next, finer separator.
+        """
+        if self.length(start, end) <= self.size:
+            yield start, end
+            return
+        if level == len(self.separators):
+            yield from self.hard_split(start, end)
+            return
+
+        sep = self.separators[level]
+        pos = start
+        while pos < end:
+            found = self.text.find(sep, pos, end)
+            stop = end if found == -1 else found + len(sep)
+            yield from self.pieces(pos, stop, level + 1)
+            pos = stop
+
+    def hard_split(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """Fixed-size cut for text without any separator."""
+        if not self.by_tokens:
+            for pos in range(start, end, self.size):
+                yield pos, min(pos + self.size, end)
+            return
+        first = bisect_left(self.token_starts, start)
+        last = bisect_left(self.token_starts, end)
+        cuts = self.token_starts[first + self.size : last : self.size]
+        for cut_start, cut_end in zip([start, *cuts], [*cuts, end]):
+            yield cut_start, cut_end
+
+    def overlap_start(self, start: int, end: int) -> int:
+        """Where the next chunk starts so it repeats the tail of this one."""
+        if self.overlap == 0:
+            return end
+        if self.by_tokens:
+            last = bisect_left(self.token_starts, end)
+            first = max(bisect_left(self.token_starts, start) + 1, last - self.overlap)
+            return self.token_starts[first] if first < last else end
+        # Begin at a word boundary inside the overlap window
+        window = max(start + 1, end - self.overlap)
+        space = WHITESPACE.search(self.text, window, end)
+        return space.end() if space else end
+
+    def trim(self, start: int, end: int) -> Optional[tuple[int, int]]:
+        """Shrink a span to exclude surrounding whitespace; None if blank."""
+        text = self.text
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return (start, end) if start < end else None
+
+
+def slugify(title: str) -> str:
+    """GitHub-style heading anchor."""
+    return re.sub(r"[^\w\- ]", "", title.lower()).replace(" ", "-")
+
+
+class MarkdownSplitter(TextSplitter):
+    """Split markdown along its heading hierarchy."""
+
+    def iter_split(self, text: str, source: str) -> Iterator[Document]:
+        return self.split_lines(text.splitlines(keepends=True), source)
+
+    def split_lines(self, lines: Iterable[str], source: str) -> Iterator[Document]:
+        """
+        Chunk markdown read line by line (e.g. from an open file).
+
+        Only the current section is buffered, so files are streamed.
+        Offsets count characters from the start of the input.
+        """
+        headings: list[tuple[int, str]] = []
+        slugs: Counter[str] = Counter()
+        anchor = ""
+        section: list[str] = []
+        section_start = pos = 0
+        fence: Optional[str] = None
+
+        for line in lines:
+            if fence is None:
+                heading = HEADING.match(line)
+                if heading:
+                    yield from self._split_section(
+                        "".join(section), section_start, headings, anchor, source
+                    )
+                    level, title = len(heading.group(1)), heading.group(2).strip()
+                    while headings and headings[-1][0] >= level:
+                        headings.pop()
+                    headings.append((level, title))
+                    slug = slugify(title)
+                    anchor = f"{slug}-{slugs[slug]}" if slugs[slug] else slug
+                    slugs[slug] += 1
+                    section, section_start = [], pos
+                else:
+                    opening = FENCE.match(line)
+                    fence = opening.group(1) if opening else None
+            elif line.strip().startswith(fence):
+                fence = None
+            section.append(line)
+            pos += len(line)
+
+        yield from self._split_section(
+            "".join(section), section_start, headings, anchor, source
+        )
+
+    def _split_section(
+        self,
+        text: str,
+        offset: int,
+        headings: list[tuple[int, str]],
+        anchor: str,
+        source: str,
+    ) -> Iterator[Document]:
+        blocks = self._blocks(text)
+        # A heading directly followed by a subheading has no content of its own
+        if all(kind == "heading" for _, _, kind in blocks):
+            return
+        splitter = _SpanSplitter(self, text)
+        heading_path = [title for _, title in headings]
+        for start, end in self._pack(splitter, blocks):
+            yield Document(
+                content=text[start:end],
+                source=source,
+                start=offset + start,
+                end=offset + end,
+                heading_path=heading_path,
+                anchor=anchor,
+            )
+
+    @staticmethod
+    def _blocks(text: str) -> list[tuple[int, int, str]]:
+        """
+        Spans of headings, code fences, tables and text blocks.
+
+        Text blocks (paragraphs, lists) end at blank lines; blank lines
+        themselves belong to no block.
+        """
+        blocks: list[tuple[int, int, str]] = []
+        kind: Optional[str] = None
+        fence = ""
+        block_start = pos = 0
+
+        def close() -> None:
+            if kind is not None:
+                blocks.append((block_start, pos, kind))
+
+        for line in text.splitlines(keepends=True):
+            stripped = line.strip()
+            if kind == "code":
+                pos += len(line)
+                if stripped.startswith(fence):
+                    close()
+                    kind = None
+                continue
+
+            opening = FENCE.match(line)
+            if opening or HEADING.match(line) or not stripped:
+                line_kind = "code" if opening else "heading" if stripped else None
+            else:
+                line_kind = "table" if stripped.startswith("|") else "text"
+
+            if line_kind != kind or line_kind == "heading":
+                close()
+                kind, block_start = line_kind, pos
+                if opening:
+                    fence = opening.group(1)
+            pos += len(line)
+        close()
+        return blocks
+
+    def _pack(
+        self, splitter: _SpanSplitter, blocks: list[tuple[int, int, str]]
+    ) -> Iterator[tuple[int, int]]:
+        """Greedily pack whole blocks into chunks; split only oversized ones."""
+        chunk: Optional[tuple[int, int]] = None
+        for start, end, kind in blocks:
+            if chunk and splitter.length(chunk[0], end) <= self.chunk_size:
+                chunk = (chunk[0], end)
+                continue
+            if chunk:
+                span = splitter.trim(*chunk)
+                if span:
+                    yield span
+                chunk = None
+            if splitter.length(start, end) <= self.chunk_size:
+                chunk = (start, end)
+            elif kind in ("code", "table"):
+                # Too big to keep whole: fall back to line boundaries
+                lines = []
+                for line in splitter.text[start:end].splitlines(keepends=True):
+                    lines.append((start, start + len(line), "line"))
+                    start += len(line)
+                yield from self._pack(splitter, lines)
+            else:
+                yield from splitter.chunks(start, end)
+        if chunk:
+            span = splitter.trim(*chunk)
+            if span:
+                yield span
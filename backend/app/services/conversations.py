@@ -0,0 +1,111 @@
+"""
+Portfolio Backend - Conversation Store
+
+Opt-in server-side conversation state keyed by `conversation_id`, so clients
+can send only the new message instead of the whole history every turn.
+
+Each conversation keeps the compacted history that was sent to the model,
+plus the new turn, and the chunks retrieved for the previous question.
+State is serialized to bytes and held in an LRU with TTL; the byte size of
+every entry is capped, which together with the entry count bounds memory.
+An optional shared backend lets several workers serve the same
+conversation: the SQLite file cache on one host, or any object with the
+same `get`/`set` of bytes (e.g. a Redis client wrapper). When configured
+it is read first; the local LRU is only a fallback.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from app.services.cache import SqliteCache, TTLCache
+from app.services.documents import Document
+
+
+@dataclass
+class Conversation:
+    """Stored state of one conversation."""
+
+    history: list[dict] = field(default_factory=list)
+    # Chunks retrieved for the previous question, for follow-up questions
+    documents: list[Document] = field(default_factory=list)
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {
+                "history": self.history,
+                "documents": [asdict(doc) for doc in self.documents],
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Conversation":
+        state = json.loads(data)
+        return cls(
+            history=state["history"],
+            documents=[Document(**doc) for doc in state["documents"]],
+        )
+
+
+class ConversationStore:
+    """LRU + TTL conversation store with a per-conversation byte cap."""
+
+    KEY_PREFIX = "conversation:"
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        max_bytes: int,
+        max_messages: int,
+        shared: Optional[SqliteCache] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.local: TTLCache[bytes] = TTLCache(
+            max_size=max_size, ttl_seconds=ttl_seconds
+        )
+        self.shared = shared
+
+    def get(self, conversation_id: str) -> Optional[Conversation]:
+        """Stored state, or None for a new or expired conversation."""
+        key = self.KEY_PREFIX + conversation_id
+        # With a shared backend it is the source of truth: another worker may
+        # have saved later turns than this worker's local copy
+        data = self.shared.get(key) if self.shared is not None else None
+        if data is not None:
+            self.local.set(key, data)
+        else:
+            data = self.local.get(key)
+        return Conversation.from_bytes(data) if data is not None else None
+
+    def save(self, conversation_id: str, conversation: Conversation) -> None:
+        """
+        Store state, shrunk to fit the caps.
+
+        The oldest messages go first, then the previous chunks; a single
+        turn too large for the cap is not stored at all.
+        """
+        history = conversation.history[-self.max_messages :]
+        documents = list(conversation.documents)
+        data = Conversation(history, documents).to_bytes()
+        while len(data) > self.max_bytes and (history or documents):
+            if len(history) > 2:
+                history = history[2:]
+            elif documents:
+                documents.pop()
+            else:
+                history = []
+            data = Conversation(history, documents).to_bytes()
+        if len(data) > self.max_bytes or not history:
+            return
+
+        key = self.KEY_PREFIX + conversation_id
+        self.local.set(key, data)
+        if self.shared is not None:
+            self.shared.set(key, data)
+
+    def stats(self) -> dict:
+        """Counters for structured logs."""
+        return self.local.stats()
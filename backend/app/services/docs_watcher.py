@@ -0,0 +1,78 @@
+"""
+Portfolio Backend - rag_docs Watcher
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import PortfolioLogger
+from app.services.rag_service import RAGService
+
+
+class DocsWatcher:
+    """
+    Background task that polls rag_docs and hot-reloads the index.
+
+    Polling compares file modification times and sizes; the reload itself
+    diffs content hashes, so touching a file without changing it is cheap.
+    The first poll also picks up edits made while the server was down.
+    """
+
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def start(cls) -> None:
+        """Schedule the watcher on the running event loop."""
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls.run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Cancel the watcher on shutdown."""
+        if cls._task is not None and not cls._task.done():
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+
+    @classmethod
+    async def run(cls) -> None:
+        """Poll until cancelled, reloading when the files change."""
+        last: Optional[tuple] = None
+        while True:
+            await asyncio.sleep(settings.docs_watch_interval_seconds)
+            try:
+                current = await asyncio.to_thread(cls.signature)
+                if current != last:
+                    await reload_index()
+                    last = current
+            except Exception as e:
+                # Keep serving the current snapshot; retry on the next poll
+                PortfolioLogger.log_error("index_reload_error", str(e))
+
+    @staticmethod
+    def signature() -> tuple:
+        """Cheap fingerprint of the markdown files under rag_docs."""
+        entries = []
+        for source, path in RAGService._markdown_files().items():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Deleted between listing and stat; the next poll sees it gone
+                continue
+            entries.append((source, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+
+async def reload_index() -> dict:
+    """Reload the index in a worker thread and log the outcome."""
+    start_time = time.time()
+    rag_service = await RAGService.aget_instance()
+    result = await asyncio.to_thread(rag_service.reload)
+    PortfolioLogger.log_index_reload(
+        result, duration_ms=int((time.time() - start_time) * 1000)
+    )
+    return result
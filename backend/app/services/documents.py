@@ -0,0 +1,25 @@
+"""
+Portfolio Backend - Document Model
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Document:
+    """Simple document container."""
+
+    content: str
+    source: str
+    # Character offsets of the chunk in its source file
+    start: int = 0
+    end: int = 0
+    # Enclosing markdown headings, outermost first, and the section anchor
+    heading_path: list[str] = field(default_factory=list)
+    anchor: str = ""
+
+    def contextual_text(self) -> str:
+        """Content prefixed with its heading path, for embedding and prompts."""
+        if not self.heading_path:
+            return self.content
+        return f"[{' > '.join(self.heading_path)}]\n{self.content}"
@@ -0,0 +1,241 @@
+"""
+Portfolio Backend - Embedding Providers
+
+The index and the queries must be embedded by the same provider. The artifact
+manifest records the provider's model name, and the server refuses an index
+built by a different one.
+
+    gemini  Gemini API (gemini-embedding-001)
+    local   ONNX sentence-embedding model on CPU via fastembed; no network
+            hop per query (`pip install fastembed`)
+    stub    deterministic hashed bag-of-words, no network; for tests and
+            offline builds
+
+Index builds call `embed_passages` from `embed_documents` in batches across a
+thread pool; queries go through `aembed_query` (or `aembed_queries` for
+batches), which run inference on the provider's own bounded executor so it
+never blocks the event loop. Gemini query calls also go through an
+UpstreamManager (see upstream.py), which coalesces identical queries and
+retries rate limits.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import numpy as np
+from google.genai import errors
+
+from app.core.config import settings
+from app.services.gemini_service import EMBEDDING_MODEL, create_client
+from app.services.upstream import RETRYABLE_STATUS_CODES, UpstreamManager, retry_delay
+
+EMBEDDING_BACKENDS = ("gemini", "local", "stub")
+
+STUB_MODEL = "stub-hashed-bow-256"
+STUB_DIMENSION = 256
+
+
+def stub_embedding(text: str, dimension: int = STUB_DIMENSION) -> list[float]:
+    """Hash each word into a bucket and return the normalized count vector."""
+    vector = np.zeros(dimension, dtype=np.float32)
+    for token in re.findall(r"\w+", text.lower()):
+        digest = hashlib.blake2b(token.encode(), digest_size=4).digest()
+        vector[int.from_bytes(digest, "little") % dimension] += 1.0
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector.tolist()
+
+
+class StubEmbeddingClient:
+    """Offline stand-in for `genai.Client` covering `models.embed_content`."""
+
+    def __init__(self) -> None:
+        self.models = SimpleNamespace(embed_content=self._embed_content)
+
+    @staticmethod
+    def _embed_content(*, model: str, contents, config=None):
+        texts = [contents] if isinstance(contents, str) else contents
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=stub_embedding(t)) for t in texts]
+        )
+
+
+class EmbeddingProvider(ABC):
+    """Base class: blocking batch embedding plus async query embedding."""
+
+    model: str = ""
+    # Remote providers route query calls through a manager
+    upstream: Optional[UpstreamManager] = None
+
+    def __init__(self, query_workers: int) -> None:
+        self.query_workers = query_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=query_workers, thread_name_prefix="embed"
+        )
+
+    @property
+    def batch_size(self) -> int:
+        """Texts per `embed_passages` call during index builds."""
+        return settings.embedding_batch_size
+
+    @property
+    def max_workers(self) -> int:
+        """Concurrent `embed_passages` calls during index builds."""
+        return settings.embedding_max_workers
+
+    @abstractmethod
+    def embed_passages(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch of chunk texts."""
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embed search queries; the same as passages unless overridden."""
+        return self.embed_passages(texts)
+
+    async def _run_embed(self, texts: list[str]) -> list[list[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.embed_queries, texts)
+
+    async def _aembed(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch of queries on the executor with a timeout."""
+        if self.upstream is None:
+            return await asyncio.wait_for(
+                self._run_embed(texts), timeout=settings.embedding_timeout_seconds
+            )
+        return await self.upstream.call(
+            partial(self._run_embed, texts),
+            timeout=settings.embedding_timeout_seconds,
+            key=(self.model, *texts),
+        )
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """Embed one query on the provider's executor with a timeout."""
+        return (await self._aembed([text]))[0]
+
+    async def aembed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed many queries, `batch_size` per call.
+
+        At most `query_workers` batches are submitted at once, so the timeout
+        bounds each call rather than time spent queued behind other batches.
+        """
+        semaphore = asyncio.Semaphore(self.query_workers)
+
+        async def embed(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._aembed(batch)
+
+        size = self.batch_size
+        batches = await asyncio.gather(
+            *(embed(texts[i : i + size]) for i in range(0, len(texts), size))
+        )
+        return [vector for batch in batches for vector in batch]
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    """Remote embeddings via `models.embed_content` (or a compatible client)."""
+
+    def __init__(self, client: Optional[Any] = None, model: str = EMBEDDING_MODEL):
+        super().__init__(query_workers=settings.gemini_max_concurrency)
+        self.client = client or create_client()
+        self.model = model
+        self.upstream = UpstreamManager("embed", max_concurrency=self.query_workers)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        # A single attempt: query calls are retried by the upstream manager
+        result = self.client.models.embed_content(model=self.model, contents=texts)
+        return [embedding.values for embedding in result.embeddings]
+
+    def embed_passages(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch in a single request, retrying rate limits."""
+        for attempt in range(settings.embedding_max_retries + 1):
+            try:
+                return self.embed_queries(texts)
+            except errors.APIError as e:
+                if (
+                    e.code not in RETRYABLE_STATUS_CODES
+                    or attempt == settings.embedding_max_retries
+                ):
+                    raise
+                time.sleep(retry_delay(attempt, settings.embedding_retry_base_delay, e))
+        raise RuntimeError("unreachable")
+
+
+class StubEmbeddingProvider(GeminiEmbeddingProvider):
+    """Hashed bag-of-words vectors computed in process."""
+
+    def __init__(self) -> None:
+        super().__init__(client=StubEmbeddingClient(), model=STUB_MODEL)
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    CPU sentence-embedding model run with ONNX Runtime through fastembed.
+
+    The model is downloaded once into fastembed's cache. ONNX Runtime
+    sessions are thread-safe, so builds and queries share one model.
+    """
+
+    def __init__(self, model_name: Optional[str] = None) -> None:
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            raise RuntimeError(
+                "The local embedding backend requires fastembed: pip install fastembed"
+            ) from e
+        super().__init__(query_workers=settings.local_embedding_workers)
+        model_name = model_name or settings.local_embedding_model
+        self.model = f"local:{model_name}"
+        self._model = TextEmbedding(
+            model_name=model_name, threads=settings.local_embedding_threads or None
+        )
+
+    @property
+    def batch_size(self) -> int:
+        return settings.local_embedding_batch_size
+
+    @property
+    def max_workers(self) -> int:
+        return settings.local_embedding_workers
+
+    def embed_passages(self, texts: list[str]) -> list[list[float]]:
+        vectors = self._model.passage_embed(texts, batch_size=self.batch_size)
+        return [vector.tolist() for vector in vectors]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        # Asymmetric models (e.g. BGE) prefix queries with an instruction
+        return [vector.tolist() for vector in self._model.query_embed(texts)]
+
+
+def _backend(backend: Optional[str]) -> str:
+    backend = backend or settings.embedding_backend
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding_backend {backend!r}, expected {EMBEDDING_BACKENDS}"
+        )
+    return backend
+
+
+def embedding_model(backend: Optional[str] = None) -> str:
+    """Model name recorded in the manifest and embedding cache keys."""
+    backend = _backend(backend)
+    if backend == "local":
+        return f"local:{settings.local_embedding_model}"
+    return STUB_MODEL if backend == "stub" else EMBEDDING_MODEL
+
+
+def embedding_provider(backend: Optional[str] = None) -> EmbeddingProvider:
+    """Provider for the configured backend."""
+    backend = _backend(backend)
+    if backend == "local":
+        return LocalEmbeddingProvider()
+    if backend == "stub":
+        return StubEmbeddingProvider()
+    return GeminiEmbeddingProvider()
@@ -0,0 +1,89 @@
+"""
+Portfolio Backend - Document Embedding
+Batched, concurrent and content-hash cached embedding for index builds
+"""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.services.embedding_backends import EmbeddingProvider
+
+
+def content_hash(text: str, model: str) -> str:
+    """Hash chunk text together with the model that embeds it."""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Content-hash keyed embedding vectors persisted next to the index."""
+
+    FILENAME = "embeddings.npz"
+
+    def __init__(self, vectors: Optional[dict[str, np.ndarray]] = None) -> None:
+        self.vectors: dict[str, np.ndarray] = vectors or {}
+
+    @classmethod
+    def load(cls, directory: Path) -> "EmbeddingStore":
+        """Load stored vectors, or return an empty store."""
+        path = directory / cls.FILENAME
+        if not path.exists():
+            return cls()
+        with np.load(path, allow_pickle=False) as data:
+            keys = data["keys"]
+            matrix = data["vectors"]
+        return cls({str(key): matrix[i] for i, key in enumerate(keys)})
+
+    def save(self, directory: Path, keep: set[str]) -> None:
+        """Persist only the vectors still referenced by the current index."""
+        keys = sorted(k for k in self.vectors if k in keep)
+        if not keys:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            directory / self.FILENAME,
+            keys=np.array(keys),
+            vectors=np.stack([self.vectors[k] for k in keys]),
+        )
+
+
+def embed_documents(
+    provider: EmbeddingProvider,
+    texts: list[str],
+    store: EmbeddingStore,
+) -> tuple[np.ndarray, int]:
+    """
+    Embed texts in input order, reusing vectors already in the store.
+
+    Only unseen content is embedded, in batches of `provider.batch_size`
+    across `provider.max_workers` threads.
+
+    Returns:
+        Tuple of (float32 matrix, number_of_newly_embedded_texts)
+    """
+    keys = [content_hash(text, provider.model) for text in texts]
+
+    missing: dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in store.vectors and key not in missing:
+            missing[key] = text
+
+    if missing:
+        pending = list(missing.items())
+        size = provider.batch_size
+        batches = [pending[i : i + size] for i in range(0, len(pending), size)]
+
+        with ThreadPoolExecutor(max_workers=provider.max_workers) as pool:
+            results = pool.map(
+                lambda batch: provider.embed_passages([t for _, t in batch]),
+                batches,
+            )
+            for batch, vectors in zip(batches, results):
+                for (key, _), vector in zip(batch, vectors):
+                    store.vectors[key] = np.asarray(vector, dtype=np.float32)
+
+    matrix = np.stack([store.vectors[key] for key in keys]).astype(np.float32)
+    return matrix, len(missing)
@@ -0,0 +1,143 @@
+"""
+Portfolio Backend - Retrieval Evaluation
+
+Scores retrieval against a golden question set. Expected chunks are labeled
+"source#anchor" rather than by chunk id, so the same golden set applies
+whatever the chunker settings or index backend.
+
+A section retrieved as several chunks counts once, at its best rank. Gains
+are graded (e.g. 2 = answers the question, 1 = related) for nDCG; recall
+and MRR treat any grade above zero as relevant.
+"""
+
+import json
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+
+from app.services.documents import Document
+
+if TYPE_CHECKING:
+    from app.services.rag_service import RAGService
+
+
+@dataclass
+class GoldenQuestion:
+    """A question and the graded relevance of the sections answering it."""
+
+    question: str
+    relevant: dict[str, int]
+
+
+def load_golden_set(path: Path) -> list[GoldenQuestion]:
+    """
+    Read a JSON Lines golden set.
+
+    Each line is {"question": ..., "relevant": {"source#anchor": grade}};
+    "relevant" may also be a list of labels, all with grade 1.
+    """
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            relevant = row["relevant"]
+            if isinstance(relevant, list):
+                relevant = dict.fromkeys(relevant, 1)
+            questions.append(GoldenQuestion(row["question"], relevant))
+    return questions
+
+
+def chunk_label(doc: Document) -> str:
+    """Stable label of the section a chunk belongs to."""
+    return f"{doc.source}#{doc.anchor}" if doc.anchor else doc.source
+
+
+def _first_ranks(labels: Sequence[str], k: int) -> dict[str, int]:
+    """1-based rank at which each label first appears in the top k."""
+    ranks: dict[str, int] = {}
+    for rank, label in enumerate(labels[:k], start=1):
+        ranks.setdefault(label, rank)
+    return ranks
+
+
+def recall_at_k(labels: Sequence[str], relevant: dict[str, int], k: int) -> float:
+    """Fraction of relevant sections found in the top k chunks."""
+    wanted = {label for label, grade in relevant.items() if grade > 0}
+    if not wanted:
+        return 0.0
+    return len(wanted & set(labels[:k])) / len(wanted)
+
+
+def reciprocal_rank(labels: Sequence[str], relevant: dict[str, int]) -> float:
+    """1 / rank of the first relevant chunk, or 0 if none was retrieved."""
+    for rank, label in enumerate(labels, start=1):
+        if relevant.get(label, 0) > 0:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(labels: Sequence[str], relevant: dict[str, int], k: int) -> float:
+    """Normalized discounted cumulative gain over the top k chunks."""
+    dcg = sum(
+        (2 ** relevant.get(label, 0) - 1) / math.log2(rank + 1)
+        for label, rank in _first_ranks(labels, k).items()
+    )
+    ideal = sorted((g for g in relevant.values() if g > 0), reverse=True)[:k]
+    idcg = sum((2**g - 1) / math.log2(rank + 1) for rank, g in enumerate(ideal, 1))
+    return dcg / idcg if idcg else 0.0
+
+
+async def evaluate(service: "RAGService", golden: list[GoldenQuestion], k: int) -> dict:
+    """
+    Run every golden question through `RAGService.retrieve_many`.
+
+    Questions run one at a time so latency percentiles are per query; a
+    second, batched pass (memory cache cleared again) reports the
+    throughput of retrieve_many.
+
+    Returns:
+        Mean recall@k, MRR and nDCG@k, latency percentiles and per-question
+        labels and scores
+    """
+    per_question = []
+    latencies = []
+    for item in golden:
+        start = time.perf_counter()
+        (retrieval,) = await service.retrieve_many([item.question], k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        labels = [chunk_label(doc) for doc in retrieval.documents]
+        per_question.append(
+            {
+                "question": item.question,
+                "retrieved": labels,
+                "mode": retrieval.mode,
+                "recall": recall_at_k(labels, item.relevant, k),
+                "rr": reciprocal_rank(labels, item.relevant),
+                "ndcg": ndcg_at_k(labels, item.relevant, k),
+            }
+        )
+
+    service.query_cache.clear()
+    start = time.perf_counter()
+    await service.retrieve_many([item.question for item in golden], k=k)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "questions": len(golden),
+        "k": k,
+        f"recall@{k}": round(float(np.mean([q["recall"] for q in per_question])), 4),
+        "mrr": round(float(np.mean([q["rr"] for q in per_question])), 4),
+        f"ndcg@{k}": round(float(np.mean([q["ndcg"] for q in per_question])), 4),
+        **{
+            f"p{pct}_ms": round(float(np.percentile(latencies, pct)), 3)
+            for pct in (50, 95, 99)
+        },
+        "batch_queries_per_s": round(len(golden) / batch_seconds, 1),
+        "per_question": per_question,
+    }
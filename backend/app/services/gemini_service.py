@@ -2,10 +2,55 @@
 Portfolio Backend - Gemini Service
 """
 
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Optional
+
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from app.core.config import settings
+from app.core.metrics import TOKENS, Stages
+from app.services.prompt import format_user_message
+from app.services.upstream import (
+    OVERLOAD_STATUS_CODES,
+    UpstreamManager,
+    UpstreamOverloaded,
+    retry_after_seconds,
+)
+
+EMBEDDING_MODEL = "gemini-embedding-001"
+FALLBACK_RESPONSE = "I couldn't generate a response. Please try again."
+
+# Sentinel marking the end of a streamed generation
+_STREAM_END = object()
+
+
+def create_client() -> genai.Client:
+    """Create a Gemini client using the configured base URL and timeout."""
+    http_options: dict[str, Any] = {
+        # SDK timeouts are in milliseconds
+        "timeout": int(settings.gemini_timeout_seconds * 1000),
+    }
+    if settings.gemini_base_url:
+        http_options["base_url"] = settings.gemini_base_url
+    return genai.Client(api_key=settings.google_api_key, http_options=http_options)
+
+
+def record_usage(usage: Any) -> None:
+    """Count prompt and output tokens reported in a response's usage metadata."""
+    for kind, field in (
+        ("prompt", "prompt_token_count"),
+        ("output", "candidates_token_count"),
+    ):
+        count = getattr(usage, field, None)
+        if isinstance(count, int):
+            TOKENS.inc(kind, amount=count)
 
 
 class GeminiService:
@@ -13,26 +58,47 @@ class GeminiService:
 
     def __init__(self) -> None:
         """Initialize Gemini client."""
-        self.client = genai.Client(api_key=settings.google_api_key)
+        self.client = create_client()
         self.model = "gemini-2.5-flash"
+        # The SDK's blocking calls run on a dedicated, bounded pool so they
+        # never stall the event loop and cannot exhaust the default executor.
+        # A call that times out, or a stream the client abandoned, frees its
+        # upstream slot at once but keeps its thread until the SDK returns
+        # (at most its own HTTP timeout per request or chunk). The pool has
+        # one spare thread per slot so new calls do not wait behind those;
+        # past that, an admitted call can still queue here and the wait
+        # counts against its timeout.
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.gemini_max_concurrency * 2,
+            thread_name_prefix="gemini",
+        )
+        self.upstream = UpstreamManager(
+            "generate", max_concurrency=settings.gemini_max_concurrency
+        )
 
-    async def generate(
+    async def _run(self, func: Callable[..., Any], **kwargs: Any) -> Any:
+        """Run a blocking SDK call on the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, **kwargs))
+
+    @staticmethod
+    def _request_key(
+        system_prompt: str, context: str, query: str, history: list[dict]
+    ) -> str:
+        """Identical prompts share one in-flight generation."""
+        payload = json.dumps([system_prompt, context, query, history])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _build_request(
         self,
         system_prompt: str,
         context: str,
         query: str,
         history: list[dict],
-    ) -> str:
-        """Generate response using Gemini with RAG context."""
+    ) -> dict[str, Any]:
+        """Build the model, contents and config shared by both generate paths."""
         # Build the full prompt with context
-        user_message = f"""
-Context from knowledge base:
-{context}
-
----
-
-User question: {query}
-""".strip()
+        user_message = format_user_message(context, query)
 
         # Build conversation contents
         contents: list[types.Content] = []
@@ -55,15 +121,115 @@ User question: {query}
             )
         )
 
-        # Generate response
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=contents,
-            config=types.GenerateContentConfig(
+        return {
+            "model": self.model,
+            "contents": contents,
+            "config": types.GenerateContentConfig(
                 system_instruction=system_prompt,
                 temperature=0.7,
                 max_output_tokens=1024,
             ),
-        )
+        }
+
+    async def generate(
+        self,
+        system_prompt: str,
+        context: str,
+        query: str,
+        history: list[dict],
+        stages: Optional[Stages] = None,
+    ) -> str:
+        """
+        Generate response using Gemini with RAG context.
+
+        Goes through the upstream manager: bounded, coalesced with identical
+        in-flight prompts and retried on 429/5xx (see upstream.py).
+        """
+        stages = stages or Stages()
+        request = self._build_request(system_prompt, context, query, history)
+        with stages.time("generate"):
+            response = await self.upstream.call(
+                partial(self._run, self.client.models.generate_content, **request),
+                timeout=settings.gemini_timeout_seconds,
+                key=self._request_key(system_prompt, context, query, history),
+            )
+        record_usage(response.usage_metadata)
+
+        return response.text or FALLBACK_RESPONSE
+
+    async def generate_stream(
+        self,
+        system_prompt: str,
+        context: str,
+        query: str,
+        history: list[dict],
+        stages: Optional[Stages] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream response text deltas as Gemini produces them.
+
+        The blocking SDK iterator is drained on the executor and handed to the
+        event loop through a queue; each wait is bounded by the generate timeout.
+        The "generate" stage excludes time spent waiting on the consumer.
+
+        The stream holds an upstream slot until it ends. It is neither
+        coalesced nor retried, since tokens may already have been sent;
+        an upstream 429/503 is raised as UpstreamOverloaded. When the
+        consumer stops early, the producer thread exits at the next chunk.
+        """
+        stages = stages or Stages()
+        start = time.perf_counter()
+        waited = 0.0
+        request = self._build_request(system_prompt, context, query, history)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        produced_any = False
+
+        def produce() -> None:
+            try:
+                usage = None
+                for chunk in self.client.models.generate_content_stream(**request):
+                    if cancelled.is_set():
+                        break
+                    if chunk.text:
+                        loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+                    # Cumulative; the last chunk carries the totals
+                    usage = chunk.usage_metadata or usage
+                record_usage(usage)
+                loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+
+        async with self.upstream.slot():
+            producer = loop.run_in_executor(self._executor, produce)
+            try:
+                while True:
+                    item = await asyncio.wait_for(
+                        queue.get(), timeout=settings.gemini_timeout_seconds
+                    )
+                    if item is _STREAM_END:
+                        break
+                    if (
+                        isinstance(item, errors.APIError)
+                        and item.code in OVERLOAD_STATUS_CODES
+                    ):
+                        retry_after = retry_after_seconds(item)
+                        raise UpstreamOverloaded(
+                            self.upstream.name,
+                            item.code,
+                            retry_after or self.upstream.retry_after(),
+                        ) from item
+                    if isinstance(item, Exception):
+                        raise item
+                    produced_any = True
+                    paused = time.perf_counter()
+                    yield item
+                    waited += time.perf_counter() - paused
+            finally:
+                cancelled.set()
+                producer.cancel()
+                stages.add("generate", time.perf_counter() - start - waited)
 
-        return response.text or "I couldn't generate a response. Please try again."
+        if not produced_any:
+            yield FALLBACK_RESPONSE
@@ -0,0 +1,261 @@
+"""
+Portfolio Backend - Index Artifact Store
+
+Each build is written to its own directory under `<root>/versions/` and
+published by atomically swapping the `<root>/current` symlink, so readers
+never see a half-written index. Builds across processes are serialized
+with an exclusive file lock on `<root>/.build.lock`.
+
+Versioned, pickle-free on-disk format for the FAISS index and its chunks:
+
+    manifest.json        format version, embedding model, dimension,
+                         chunker parameters, per-file SHA-256 checksums and
+                         content hashes of the source markdown files
+    index.faiss          FAISS index labeled by chunk id, opened memory-mapped
+    chunks.jsonl         one JSON record per chunk, in ascending id order
+    chunks.offsets.npy   uint64 byte offsets into chunks.jsonl (count + 1)
+    chunks.ids.npy       int64 chunk id per record; ids survive incremental
+                         updates, so FAISS labels stay valid
+    bm25_*               sparse keyword index (see app/services/bm25.py)
+
+Chunks are read lazily through mmap, so uvicorn workers share pages via the
+OS page cache instead of each holding a full copy. FAISS maps IVF inverted
+lists under IO_FLAG_MMAP; flat indexes are still copied into memory by
+faiss-cpu 1.9.
+"""
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+import faiss
+import numpy as np
+
+from app.services.documents import Document
+
+# v2: unit-normalized vectors searched by inner product (cosine similarity).
+# v3: BM25 keyword index stored alongside the vectors.
+# v4: stable chunk ids as FAISS labels, source file hashes in the manifest.
+# Older artifacts are rebuilt on load, reusing stored raw embeddings.
+FORMAT_VERSION = 4
+
+MANIFEST_FILE = "manifest.json"
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.jsonl"
+OFFSETS_FILE = "chunks.offsets.npy"
+IDS_FILE = "chunks.ids.npy"
+
+CURRENT_LINK = "current"
+VERSIONS_DIR = "versions"
+LOCK_FILE = ".build.lock"
+# Previous versions kept for readers that still hold them open
+KEEP_VERSIONS = 2
+
+# Written by earlier releases into the root; never unpickled by the server
+LEGACY_FILES = ("index.faiss", "documents.pkl")
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _build_time() -> datetime:
+    """Build timestamp, pinned by SOURCE_DATE_EPOCH for reproducible builds."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), timezone.utc)
+    return datetime.now(timezone.utc)
+
+
+def write_artifact(
+    directory: Path,
+    index: faiss.Index,
+    documents: Sequence[Document],
+    embedding_model: str,
+    chunker: dict[str, Any],
+    index_config: Optional[dict[str, Any]] = None,
+    ids: Optional[np.ndarray] = None,
+    files: Optional[dict[str, str]] = None,
+) -> dict:
+    """
+    Write index, chunk store and manifest; return the manifest.
+
+    Args:
+        ids: ascending chunk id (FAISS label) per document, default row number
+        files: content hash per source file, for incremental updates
+
+    Files already staged in the directory (e.g. the BM25 index) are
+    included in the manifest checksums.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    faiss.write_index(index, str(directory / INDEX_FILE))
+
+    if ids is None:
+        ids = np.arange(len(documents), dtype=np.int64)
+    np.save(directory / IDS_FILE, np.asarray(ids, dtype=np.int64))
+
+    offsets = np.zeros(len(documents) + 1, dtype=np.uint64)
+    with open(directory / CHUNKS_FILE, "wb") as f:
+        for i, doc in enumerate(documents):
+            record = json.dumps(asdict(doc), ensure_ascii=False).encode("utf-8")
+            f.write(record + b"\n")
+            offsets[i + 1] = offsets[i] + len(record) + 1
+    np.save(directory / OFFSETS_FILE, offsets)
+
+    checksums = {
+        path.name: file_sha256(path)
+        for path in sorted(directory.iterdir())
+        if path.is_file() and path.name != MANIFEST_FILE
+    }
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at": _build_time().isoformat(),
+        # Identical inputs give an identical digest, whenever they are built
+        "content_digest": hashlib.sha256(
+            json.dumps(checksums, sort_keys=True).encode()
+        ).hexdigest(),
+        "embedding_model": embedding_model,
+        "dimension": index.d,
+        "count": len(documents),
+        "index_type": type(index).__name__,
+        "metric": "inner_product"
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT
+        else "l2",
+        "index_config": index_config or {},
+        "chunker": chunker,
+        "next_id": int(ids[-1]) + 1 if len(ids) else 0,
+        "files": files or {},
+        "checksums": checksums,
+    }
+    (directory / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def current_artifact(root: Path) -> Path:
+    """Resolve the published artifact directory once, pinning its version."""
+    return (root / CURRENT_LINK).resolve()
+
+
+@contextmanager
+def build_lock(root: Path) -> Iterator[None]:
+    """Exclusive lock serializing index builds across threads and processes."""
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / LOCK_FILE, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def new_build_dir(root: Path) -> Path:
+    """Create a private staging directory for a build (call under build_lock)."""
+    versions = root / VERSIONS_DIR
+    versions.mkdir(parents=True, exist_ok=True)
+    # Leftovers from crashed builds
+    for stale in versions.glob(".build-*"):
+        shutil.rmtree(stale, ignore_errors=True)
+    return Path(tempfile.mkdtemp(prefix=".build-", dir=versions))
+
+
+def publish(root: Path, build_dir: Path) -> Path:
+    """
+    Atomically make a finished build the current artifact.
+
+    The staged directory is renamed to a sortable version name, then the
+    `current` symlink is replaced with os.replace (atomic on POSIX).
+    """
+    version = root / VERSIONS_DIR / str(time.time_ns())
+    os.rename(build_dir, version)
+
+    staging_link = root / f".{CURRENT_LINK}.tmp"
+    if staging_link.is_symlink():
+        staging_link.unlink()
+    os.symlink(Path(VERSIONS_DIR) / version.name, staging_link)
+    os.replace(staging_link, root / CURRENT_LINK)
+
+    for name in LEGACY_FILES:
+        (root / name).unlink(missing_ok=True)
+    published = sorted(
+        (p for p in (root / VERSIONS_DIR).iterdir() if not p.name.startswith(".")),
+        key=lambda p: int(p.name),
+    )
+    for old in published[:-KEEP_VERSIONS]:
+        shutil.rmtree(old, ignore_errors=True)
+    return version
+
+
+def read_manifest(directory: Path) -> Optional[dict]:
+    """Return the manifest, or None if missing or from another format version."""
+    path = directory / MANIFEST_FILE
+    if not path.is_file():
+        return None
+    manifest = json.loads(path.read_text())
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def verify_artifact(directory: Path, manifest: dict) -> list[str]:
+    """Return the files whose checksums do not match the manifest."""
+    return [
+        name
+        for name, expected in manifest["checksums"].items()
+        if not (directory / name).exists() or file_sha256(directory / name) != expected
+    ]
+
+
+def open_index(directory: Path) -> faiss.Index:
+    """Open the FAISS index memory-mapped (read-only)."""
+    return faiss.read_index(str(directory / INDEX_FILE), faiss.IO_FLAG_MMAP)
+
+
+class ChunkStore(Sequence[Document]):
+    """Read-only, lazily decoded view of chunks.jsonl."""
+
+    def __init__(self, directory: Path) -> None:
+        self._offsets = np.load(directory / OFFSETS_FILE, mmap_mode="r")
+        self.ids = np.load(directory / IDS_FILE, mmap_mode="r")
+        self._file = open(directory / CHUNKS_FILE, "rb")
+        size = int(self._offsets[-1])
+        self._data = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def rows(self, labels: np.ndarray) -> np.ndarray:
+        """Map FAISS labels (chunk ids) to record positions; unknown -> -1."""
+        if len(self) == 0:
+            return np.full(len(labels), -1)
+        rows = np.minimum(np.searchsorted(self.ids, labels), len(self) - 1)
+        return np.where((labels >= 0) & (self.ids[rows] == labels), rows, -1)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return Document(**json.loads(self._data[start : end - 1]))
+
+    def __iter__(self) -> Iterator[Document]:
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,202 @@
+"""
+Portfolio Backend - Prompt Assembly
+
+Fits the system prompt, retrieved chunks, conversation history and the
+question under an input token budget before each generation call. Tokens
+are counted locally with the chunker's approximate tokenizer, so budgeting
+costs no API round trip.
+
+- Retrieved chunks that overlap in their source file (the splitter repeats
+  up to `chunk_overlap` characters) are merged so shared text is sent once.
+- Chunks are added in relevance order up to the context budget.
+- The most recent history messages are kept verbatim; older ones are
+  compacted to their opening tokens, and the oldest are dropped when the
+  budget is still exceeded.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.core.config import settings
+from app.services.chunking import token_starts
+from app.services.documents import Document
+
+COMPACTION_MARKER = " …"
+
+
+def format_user_message(context: str, query: str) -> str:
+    """The final user turn: retrieved context followed by the question."""
+    return f"""
+Context from knowledge base:
+{context}
+
+---
+
+User question: {query}
+""".strip()
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (words and punctuation marks)."""
+    return len(token_starts(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Shorten text to `max_tokens` tokens, the marker counting as one.
+
+    Already truncated text is returned unchanged.
+    """
+    starts = token_starts(text)
+    if len(starts) <= max_tokens:
+        return text
+    return text[: starts[max(max_tokens - 1, 0)]].rstrip() + COMPACTION_MARKER
+
+
+@dataclass
+class Prompt:
+    """Budgeted prompt parts, plus token accounting for the request log."""
+
+    context: str
+    history: list[dict]
+    tokens: dict = field(default_factory=dict)
+
+
+class PromptAssembler:
+    """Token-budget-aware prompt builder."""
+
+    def __init__(
+        self,
+        max_input_tokens: Optional[int] = None,
+        max_context_tokens: Optional[int] = None,
+    ) -> None:
+        self.max_input_tokens = max_input_tokens or settings.prompt_max_input_tokens
+        self.max_context_tokens = (
+            max_context_tokens or settings.prompt_max_context_tokens
+        )
+
+    def assemble(
+        self,
+        system_prompt: str,
+        query: str,
+        documents: list[Document],
+        history: list[dict],
+    ) -> Prompt:
+        """Fit context and history under the budget; system and query always fit."""
+        fixed = count_tokens(system_prompt) + count_tokens(
+            format_user_message("", query)
+        )
+        budget = max(self.max_input_tokens - fixed, 0)
+
+        merged = merge_overlaps(documents)
+        overlap_saved = sum(count_tokens(d.contextual_text()) for d in documents) - sum(
+            count_tokens(d.contextual_text()) for d in merged
+        )
+        parts, context_tokens, dropped_chunks = self._fit_context(
+            merged, min(budget, self.max_context_tokens)
+        )
+        kept_history, history_tokens, compacted = self._fit_history(
+            history, budget - context_tokens
+        )
+
+        return Prompt(
+            context="\n\n".join(parts),
+            history=kept_history,
+            tokens={
+                "budget": self.max_input_tokens,
+                "system": count_tokens(system_prompt),
+                "query": count_tokens(query),
+                "context": context_tokens,
+                "history": history_tokens,
+                "total": fixed + context_tokens + history_tokens,
+                "chunks": len(documents),
+                "chunks_dropped": dropped_chunks,
+                "overlap_saved": overlap_saved,
+                "history_messages": len(kept_history),
+                "history_dropped": len(history) - len(kept_history),
+                "history_compacted": compacted,
+            },
+        )
+
+    @staticmethod
+    def _fit_context(
+        documents: list[Document], budget: int
+    ) -> tuple[list[str], int, int]:
+        """Merged chunks in relevance order while they fit."""
+        parts: list[str] = []
+        used = dropped = 0
+        for doc in documents:
+            text = doc.contextual_text()
+            tokens = count_tokens(text)
+            if used + tokens > budget:
+                dropped += 1
+                continue
+            parts.append(text)
+            used += tokens
+        return parts, used, dropped
+
+    @staticmethod
+    def _fit_history(history: list[dict], budget: int) -> tuple[list[dict], int, int]:
+        """Newest messages first: recent ones verbatim, older ones compacted."""
+        verbatim = settings.prompt_history_verbatim_messages
+        kept: list[dict] = []
+        used = compacted = 0
+        for age, msg in enumerate(reversed(history)):
+            content = msg["content"]
+            if age >= verbatim:
+                short = truncate_tokens(
+                    content, settings.prompt_compacted_message_tokens
+                )
+                compacted += short != content
+                content = short
+            tokens = count_tokens(content)
+            if used + tokens > budget:
+                # Everything older is dropped too, so history stays contiguous
+                break
+            kept.append({"role": msg["role"], "content": content})
+            used += tokens
+        kept.reverse()
+        # Start on a user turn rather than a dangling model reply
+        while kept and kept[0]["role"] != "user":
+            used -= count_tokens(kept.pop(0)["content"])
+        return kept, used, compacted
+
+
+def merge_overlaps(documents: list[Document]) -> list[Document]:
+    """
+    Merge chunks whose spans overlap or touch in the same source section.
+
+    Merged chunks take the position of their best-ranked member, so the
+    result stays in relevance order; text shared by two chunks appears once.
+    """
+    merged: list[Document] = []
+    for doc in documents:
+        for i, kept in enumerate(merged):
+            if kept == doc or (
+                kept.source == doc.source
+                and kept.heading_path == doc.heading_path
+                and doc.start <= kept.end
+                and kept.start <= doc.end
+                and doc.end > doc.start
+            ):
+                merged[i] = _union(kept, doc)
+                break
+        else:
+            merged.append(doc)
+    return merged
+
+
+def _union(a: Document, b: Document) -> Document:
+    """One chunk covering two overlapping spans of the same source text."""
+    first, second = (a, b) if a.start <= b.start else (b, a)
+    if second.end <= first.end:
+        return first
+    tail = second.content[first.end - second.start :]
+    return Document(
+        content=first.content + tail,
+        source=first.source,
+        start=first.start,
+        end=second.end,
+        heading_path=first.heading_path,
+        anchor=first.anchor,
+    )
@@ -3,262 +3,1018 @@ Portfolio Backend - RAG Service
 Direct implementation using FAISS and google.genai
 """
 
-import pickle
+import asyncio
+import hashlib
+import logging
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional, Sequence
 
 import faiss
 import numpy as np
-from google import genai
 
 from app.core.config import settings
+from app.core.metrics import CACHE_EVENTS, Stages
 from app.core.prompts import SYSTEM_PROMPT
 from app.models.schemas import ChatMessage
-from app.services.gemini_service import GeminiService
+from app.services.ann import build_ann_index, configure_search
+from app.services.bm25 import BM25Index
+from app.services.cache import SemanticResponseCache, SqliteCache, TTLCache
+from app.services.chunking import MarkdownSplitter
+from app.services.conversations import Conversation, ConversationStore
+from app.services.documents import Document
+from app.services.embedding_backends import (
+    EmbeddingProvider,
+    embedding_model,
+    embedding_provider,
+)
+from app.services.embeddings import EmbeddingStore, content_hash, embed_documents
+from app.services.gemini_service import FALLBACK_RESPONSE, GeminiService
+from app.services.index_store import (
+    INDEX_FILE,
+    ChunkStore,
+    build_lock,
+    current_artifact,
+    file_sha256,
+    new_build_dir,
+    open_index,
+    publish,
+    read_manifest,
+    verify_artifact,
+    write_artifact,
+)
+from app.services.prompt import Prompt, PromptAssembler
+
+logger = logging.getLogger(__name__)
 
 # Paths
 RAG_DOCS_PATH = Path(__file__).parent.parent.parent / "rag_docs"
 INDEX_PATH = Path(__file__).parent.parent.parent / "faiss_index"
 
+# Chunker parameters, recorded in the index manifest
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+# "chars" or "tokens" (approximate token count)
+CHUNK_LENGTH_UNIT = "chars"
 
-@dataclass
-class Document:
-    """Simple document container."""
-
-    content: str
-    source: str
-
-
-class TextSplitter:
-    """Simple recursive text splitter."""
-
-    def __init__(
-        self,
-        chunk_size: int = 500,
-        chunk_overlap: int = 50,
-    ) -> None:
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
-        self.separators = ["\n\n", "\n", ". ", " "]
-
-    def split(self, text: str, source: str) -> list[Document]:
-        """Split text into chunks with overlap."""
-        chunks = self._split_recursive(text, self.separators)
-        return [
-            Document(content=chunk, source=source) for chunk in chunks if chunk.strip()
-        ]
 
-    def _split_recursive(self, text: str, separators: list[str]) -> list[str]:
-        """Recursively split text using separators."""
-        if len(text) <= self.chunk_size:
-            return [text] if text.strip() else []
-
-        if not separators:
-            # No more separators, force split by chunk_size
-            return self._split_by_size(text)
-
-        sep = separators[0]
-        remaining_seps = separators[1:]
+@dataclass
+class IndexSnapshot:
+    """One published index version; swapped into RAGService as a whole."""
 
-        if sep not in text:
-            return self._split_recursive(text, remaining_seps)
+    index: faiss.Index
+    documents: ChunkStore
+    keyword_index: Optional[BM25Index]
+    version: str
 
-        parts = text.split(sep)
-        chunks: list[str] = []
-        current_chunk = ""
 
-        for part in parts:
-            test_chunk = current_chunk + sep + part if current_chunk else part
+@dataclass
+class Retrieval:
+    """Chunks retrieved for one query."""
 
-            if len(test_chunk) <= self.chunk_size:
-                current_chunk = test_chunk
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                if len(part) > self.chunk_size:
-                    chunks.extend(self._split_recursive(part, remaining_seps))
-                    current_chunk = ""
-                else:
-                    current_chunk = part
-
-        if current_chunk:
-            chunks.append(current_chunk)
-
-        # Add overlap
-        return self._add_overlap(chunks)
-
-    def _split_by_size(self, text: str) -> list[str]:
-        """Split text by fixed size."""
-        chunks = []
-        for i in range(0, len(text), self.chunk_size - self.chunk_overlap):
-            chunks.append(text[i : i + self.chunk_size])
-        return chunks
-
-    def _add_overlap(self, chunks: list[str]) -> list[str]:
-        """Add overlap between chunks."""
-        if len(chunks) <= 1 or self.chunk_overlap == 0:
-            return chunks
-
-        result = [chunks[0]]
-        for i in range(1, len(chunks)):
-            prev_overlap = (
-                chunks[i - 1][-self.chunk_overlap :]
-                if len(chunks[i - 1]) > self.chunk_overlap
-                else ""
-            )
-            result.append(prev_overlap + chunks[i])
-        return result
+    sources: list[dict]
+    # Retrieved chunks in relevance order
+    documents: list[Document]
+    # "memory", "shared" or None when the query embedding was not cached
+    embedding_cache: Optional[str] = None
+    chunk_ids: tuple[int, ...] = ()
+    query_embedding: Optional[np.ndarray] = None
+    # "vector", "hybrid" or "keyword" (fast path, no query embedding)
+    mode: str = "vector"
+    # Normalized query; keys fast-path answers in the response cache
+    query_key: Optional[str] = None
 
 
 class RAGService:
     """RAG service with FAISS vector store and Gemini integration."""
 
     _instance: Optional["RAGService"] = None
+    _instance_lock = threading.Lock()
+    # Chunker parameters, recorded in the manifest; changing them forces a
+    # full rebuild on the next reload
+    CHUNKER = {
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "length_unit": CHUNK_LENGTH_UNIT,
+        "splitter": "markdown",
+    }
 
     @classmethod
     def get_instance(cls) -> "RAGService":
-        """Get or create singleton instance."""
+        """Get or create singleton instance (created once across threads)."""
         if cls._instance is None:
-            cls._instance = cls()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
 
     @classmethod
-    def build_index(cls) -> None:
-        """Build and save FAISS index."""
-        print("Building FAISS index...")
+    async def aget_instance(cls) -> "RAGService":
+        """
+        Get the singleton from async code.
+
+        Creation may load or build the index, so it runs in a worker thread;
+        concurrent callers wait on the same single-flight initialization.
+        """
+        if cls._instance is not None:
+            return cls._instance
+        return await asyncio.to_thread(cls.get_instance)
+
+    @classmethod
+    def build_index(cls, provider: Optional[EmbeddingProvider] = None) -> None:
+        """
+        Build and publish FAISS index.
+
+        Chunks whose content was embedded by a previous build are reused from
+        the embedding store; only new or changed chunks hit the API. Builds
+        are serialized across processes by a file lock.
+        """
+        with build_lock(INDEX_PATH):
+            cls._build_index_locked(provider)
+
+    @classmethod
+    def _build_index_locked(cls, provider: Optional[EmbeddingProvider] = None) -> None:
+        """Build into a staging directory and atomically publish it."""
+        logger.info("Building FAISS index...")
+        files = cls._file_hashes()
         documents = cls._load_documents()
         if not documents:
-            print("No documents found, skipping index build")
+            logger.warning("No documents found, skipping index build")
             return
 
         # Get embeddings
-        client = genai.Client(api_key=settings.google_api_key)
-        embeddings: list[list[float]] = []
+        # Chunks are embedded and keyword-indexed with their heading path
+        texts = [doc.contextual_text() for doc in documents]
+        provider = provider or embedding_provider()
+        model = provider.model
+        store = EmbeddingStore.load(INDEX_PATH)
+        embeddings_array, embedded = embed_documents(provider, texts, store)
+        logger.info(
+            "Embedded %d new chunks, reused %d", embedded, len(documents) - embedded
+        )
+
+        # Build (and train, if needed) the configured FAISS index over unit
+        # vectors, so inner product is cosine similarity
+        faiss.normalize_L2(embeddings_array)
+        index, resolved = build_ann_index(
+            embeddings_array, metric=faiss.METRIC_INNER_PRODUCT
+        )
+
+        # Save index, keyword index and documents, then publish atomically
+        build_dir = new_build_dir(INDEX_PATH)
+        BM25Index.build(texts).save(build_dir)
+        write_artifact(
+            build_dir,
+            index,
+            documents,
+            embedding_model=model,
+            chunker=cls.CHUNKER,
+            index_config=resolved,
+            files=files,
+        )
+        version = publish(INDEX_PATH, build_dir)
+        store.save(
+            INDEX_PATH,
+            keep={content_hash(text, model) for text in texts},
+        )
+
+        logger.info("Index saved to %s (%d chunks)", version, len(documents))
+
+    @classmethod
+    def update_index(cls, provider: Optional[EmbeddingProvider] = None) -> dict:
+        """
+        Apply added, changed and removed rag_docs files to the current index.
+
+        Files are compared by content hash against the manifest; only chunks
+        of changed files are re-split and embedded, and their vectors are
+        removed from / added to an in-memory copy of the ID-mapped index.
+        Falls back to a full build when there is no compatible index.
+
+        Returns:
+            Summary with the added, changed and removed sources
+        """
+        with build_lock(INDEX_PATH):
+            artifact = current_artifact(INDEX_PATH)
+            manifest = cls._compatible_manifest(artifact)
+            files = cls._file_hashes()
+            if manifest is None or manifest["chunker"] != cls.CHUNKER:
+                cls._build_index_locked(provider)
+                return {
+                    "mode": "full",
+                    "added": sorted(files),
+                    "changed": [],
+                    "removed": [],
+                }
+
+            changes = {"mode": "incremental", **cls.diff_files(manifest, files)}
+            if changes["added"] or changes["changed"] or changes["removed"]:
+                cls._update_index_locked(artifact, manifest, files, changes, provider)
+            return changes
+
+    @staticmethod
+    def diff_files(manifest: dict, files: dict[str, str]) -> dict[str, list[str]]:
+        """Added, changed and removed sources relative to a manifest."""
+        old_files = manifest["files"]
+        return {
+            "added": sorted(set(files) - set(old_files)),
+            "changed": sorted(
+                s for s in files if s in old_files and files[s] != old_files[s]
+            ),
+            "removed": sorted(set(old_files) - set(files)),
+        }
+
+    @staticmethod
+    def _compatible_manifest(artifact: Path) -> Optional[dict]:
+        """Manifest of an artifact in the current format and embedding model."""
+        manifest = read_manifest(artifact)
+        if manifest is None or manifest["embedding_model"] != embedding_model():
+            return None
+        return manifest
+
+    @classmethod
+    def _update_index_locked(
+        cls,
+        artifact: Path,
+        manifest: dict,
+        files: dict[str, str],
+        changes: dict,
+        provider: Optional[EmbeddingProvider] = None,
+    ) -> None:
+        """Build the next version from the current one plus changed files."""
+        logger.info(
+            "Updating FAISS index: %d added, %d changed, %d removed",
+            len(changes["added"]),
+            len(changes["changed"]),
+            len(changes["removed"]),
+        )
+        chunks = ChunkStore(artifact)
+        stale = set(changes["changed"]) | set(changes["removed"])
+        kept = [
+            (int(chunk_id), doc)
+            for chunk_id, doc in zip(chunks.ids, chunks)
+            if doc.source not in stale
+        ]
+        removed_ids = np.array(
+            [
+                chunk_id
+                for chunk_id, doc in zip(chunks.ids, chunks)
+                if doc.source in stale
+            ],
+            dtype=np.int64,
+        )
+        new_documents = list(
+            cls._iter_documents(set(changes["added"]) | set(changes["changed"]))
+        )
+        if not kept and not new_documents:
+            cls._build_index_locked(provider)
+            return
 
-        for doc in documents:
-            result = client.models.embed_content(
-                model="gemini-embedding-001",
-                contents=doc.content,
+        new_texts = [doc.contextual_text() for doc in new_documents]
+        provider = provider or embedding_provider()
+        model = provider.model
+        store = EmbeddingStore.load(INDEX_PATH)
+        embedded = 0
+        if new_documents:
+            vectors, embedded = embed_documents(provider, new_texts, store)
+            faiss.normalize_L2(vectors)
+        new_ids = np.arange(
+            manifest["next_id"], manifest["next_id"] + len(new_documents)
+        ).astype(np.int64)
+
+        # Ids only grow, so kept + new documents stay in ascending id order
+        documents = [doc for _, doc in kept] + new_documents
+        ids = np.array([chunk_id for chunk_id, _ in kept], dtype=np.int64)
+        ids = np.concatenate([ids, new_ids])
+        texts = [doc.contextual_text() for doc in documents]
+
+        # Readable copy; the served index stays memory-mapped and untouched
+        index = faiss.read_index(str(artifact / INDEX_FILE))
+        resolved = manifest["index_config"]
+        try:
+            if len(removed_ids):
+                index.remove_ids(removed_ids)
+            # Removal-only reloads have nothing to embed or add
+            if new_documents:
+                index.add_with_ids(vectors, new_ids)
+        except RuntimeError:
+            # HNSW graphs do not support removal; rebuild from stored vectors
+            all_vectors, _ = embed_documents(provider, texts, store)
+            faiss.normalize_L2(all_vectors)
+            index, resolved = build_ann_index(
+                all_vectors, metric=faiss.METRIC_INNER_PRODUCT, ids=ids
             )
-            embeddings.append(result.embeddings[0].values)
 
-        # Build FAISS index
-        embeddings_array = np.array(embeddings, dtype=np.float32)
-        dimension = embeddings_array.shape[1]
-        index = faiss.IndexFlatL2(dimension)
-        index.add(embeddings_array)
+        build_dir = new_build_dir(INDEX_PATH)
+        BM25Index.build(texts).save(build_dir)
+        write_artifact(
+            build_dir,
+            index,
+            documents,
+            embedding_model=model,
+            chunker=cls.CHUNKER,
+            index_config=resolved,
+            ids=ids,
+            files=files,
+        )
+        version = publish(INDEX_PATH, build_dir)
+        store.save(
+            INDEX_PATH,
+            keep={content_hash(text, model) for text in texts},
+        )
+        logger.info(
+            "Index saved to %s (%d chunks, %d newly embedded)",
+            version,
+            len(documents),
+            embedded,
+        )
 
-        # Save index and documents
-        INDEX_PATH.mkdir(parents=True, exist_ok=True)
-        faiss.write_index(index, str(INDEX_PATH / "index.faiss"))
-        with open(INDEX_PATH / "documents.pkl", "wb") as f:
-            pickle.dump(documents, f)
+    @classmethod
+    def _markdown_files(cls) -> dict[str, Path]:
+        """Markdown files under rag_docs, recursively, by relative source."""
+        if not RAG_DOCS_PATH.exists():
+            return {}
+        return {
+            path.relative_to(RAG_DOCS_PATH).as_posix(): path
+            for path in sorted(RAG_DOCS_PATH.rglob("*.md"))
+        }
 
-        print(f"Index saved to {INDEX_PATH} ({len(documents)} chunks)")
+    @classmethod
+    def _file_hashes(cls) -> dict[str, str]:
+        """Content hash of every markdown file, keyed by source."""
+        return {
+            source: file_sha256(path) for source, path in cls._markdown_files().items()
+        }
 
     @classmethod
     def _load_documents(cls) -> list[Document]:
         """Load and split all markdown documents."""
-        documents: list[Document] = []
-        splitter = TextSplitter(chunk_size=500, chunk_overlap=50)
+        return list(cls._iter_documents())
 
-        if not RAG_DOCS_PATH.exists():
-            return documents
+    @classmethod
+    def _iter_documents(cls, sources: Optional[set[str]] = None) -> Iterator[Document]:
+        """
+        Stream chunks from markdown files under rag_docs, recursively.
 
-        for md_file in RAG_DOCS_PATH.glob("*.md"):
-            content = md_file.read_text(encoding="utf-8")
-            chunks = splitter.split(content, source=md_file.name)
-            documents.extend(chunks)
+        Files are read line by line; sources are paths relative to rag_docs.
+        Restricted to `sources` when given.
+        """
+        splitter = MarkdownSplitter(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
+            length_unit=CHUNK_LENGTH_UNIT,
+        )
 
-        return documents
+        for source, md_file in cls._markdown_files().items():
+            if sources is not None and source not in sources:
+                continue
+            # newline="" keeps offsets exact for CRLF files
+            with open(md_file, encoding="utf-8", newline="") as f:
+                yield from splitter.split_lines(f, source=source)
 
     def __init__(self) -> None:
         """Initialize RAG service."""
-        self.index: Optional[faiss.IndexFlatL2] = None
-        self.documents: list[Document] = []
-        self.client = genai.Client(api_key=settings.google_api_key)
+        # Replaced as a whole on reload; readers take one reference per request
+        self.snapshot: Optional[IndexSnapshot] = None
+        self._reload_lock = threading.Lock()
+        # Embeds queries, and documents when the index is built at runtime
+        self.embedder = embedding_provider()
         self.gemini = GeminiService()
+        self.prompt_assembler = PromptAssembler()
+        self.query_cache: TTLCache[np.ndarray] = TTLCache(
+            max_size=settings.query_cache_size,
+            ttl_seconds=settings.query_cache_ttl_seconds,
+        )
+        self.shared_query_cache: Optional[SqliteCache] = (
+            SqliteCache(
+                Path(settings.query_cache_shared_path),
+                ttl_seconds=settings.query_cache_ttl_seconds,
+            )
+            if settings.query_cache_shared_path
+            else None
+        )
+        self.response_cache: Optional[SemanticResponseCache] = (
+            SemanticResponseCache(
+                max_size=settings.response_cache_size,
+                ttl_seconds=settings.response_cache_ttl_seconds,
+                similarity=settings.response_cache_similarity,
+            )
+            if settings.response_cache_enabled
+            else None
+        )
+        self.conversations: Optional[ConversationStore] = (
+            ConversationStore(
+                max_size=settings.conversation_store_size,
+                ttl_seconds=settings.conversation_ttl_seconds,
+                max_bytes=settings.conversation_max_bytes,
+                max_messages=settings.max_conversation_history,
+                shared=SqliteCache(
+                    Path(settings.conversation_store_shared_path),
+                    ttl_seconds=settings.conversation_ttl_seconds,
+                )
+                if settings.conversation_store_shared_path
+                else None,
+            )
+            if settings.conversation_store_enabled
+            else None
+        )
         self._load_index()
 
     def _load_index(self) -> None:
-        """Load FAISS index from disk."""
-        index_file = INDEX_PATH / "index.faiss"
-        docs_file = INDEX_PATH / "documents.pkl"
+        """
+        Load the index artifact from disk, memory-mapped.
+
+        With runtime builds enabled, missing, legacy or differently embedded
+        indexes are rebuilt in the current format, reusing stored embeddings.
+        Otherwise the prebuilt artifact is only read, never written.
+        """
+        artifact = current_artifact(INDEX_PATH)
+        manifest = self._compatible_manifest(artifact)
+        if manifest is None and not settings.index_runtime_build:
+            raise RuntimeError(
+                f"No index for embedding model {embedding_model()!r} in "
+                f"{INDEX_PATH}; build it with `python -m app.index build`"
+            )
+        if manifest is None:
+            with build_lock(INDEX_PATH):
+                # Another worker may have published while we waited
+                artifact = current_artifact(INDEX_PATH)
+                manifest = self._compatible_manifest(artifact)
+                if manifest is None:
+                    self._build_index_locked(self.embedder)
+                    artifact = current_artifact(INDEX_PATH)
+                    manifest = self._compatible_manifest(artifact)
 
-        if not index_file.exists():
-            self.build_index()
+        if manifest is not None:
+            if settings.index_verify_checksums:
+                corrupted = verify_artifact(artifact, manifest)
+                if corrupted:
+                    raise RuntimeError(f"Index checksum mismatch: {corrupted}")
+            index = open_index(artifact)
+            configure_search(index)
+            self.snapshot = IndexSnapshot(
+                index=index,
+                documents=ChunkStore(artifact),
+                keyword_index=BM25Index.load(artifact)
+                if settings.hybrid_search_enabled
+                else None,
+                version=artifact.name,
+            )
+            # Cached answers were generated from the previous chunk set
+            if self.response_cache is not None:
+                self.response_cache.clear()
+
+    def reload(self, provider: Optional[EmbeddingProvider] = None) -> dict:
+        """
+        Apply rag_docs changes and swap the new version in without downtime.
+
+        Requests already retrieving keep the snapshot they started with. Also
+        picks up versions published by other workers, or, without runtime
+        builds, by an offline `python -m app.index build`.
+        """
+        with self._reload_lock:
+            if settings.index_runtime_build:
+                changes = self.update_index(provider or self.embedder)
+            else:
+                changes = {
+                    "mode": "read_only",
+                    "added": [],
+                    "changed": [],
+                    "removed": [],
+                }
+            version = current_artifact(INDEX_PATH).name
+            swapped = self.snapshot is None or self.snapshot.version != version
+            if swapped:
+                self._load_index()
+            return {**changes, "version": version, "swapped": swapped}
+
+    @property
+    def index(self) -> Optional[faiss.Index]:
+        return self.snapshot.index if self.snapshot else None
 
-        if index_file.exists() and docs_file.exists():
-            self.index = faiss.read_index(str(index_file))
-            with open(docs_file, "rb") as f:
-                self.documents = pickle.load(f)
+    @property
+    def documents(self) -> Sequence[Document]:
+        return self.snapshot.documents if self.snapshot else []
 
     def is_loaded(self) -> bool:
         """Check if index is loaded."""
-        return self.index is not None and len(self.documents) > 0
+        return self.snapshot is not None and len(self.snapshot.documents) > 0
+
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query with the configured embedding provider."""
+        values = await self.embedder.aembed_query(query)
+        return np.array([values], dtype=np.float32)
+
+    def _query_cache_key(self, query: str) -> str:
+        """Normalize case and whitespace so trivially different queries match."""
+        return f"{self.embedder.model}:{' '.join(query.casefold().split())}"
+
+    def _cached_query_embedding(
+        self, key: str
+    ) -> tuple[Optional[np.ndarray], Optional[str]]:
+        """Look a query embedding up in the memory, then the shared cache."""
+        cached = self.query_cache.get(key)
+        if cached is not None:
+            CACHE_EVENTS.inc("query_embedding", "memory")
+            return cached, "memory"
+
+        if self.shared_query_cache is not None:
+            blob = self.shared_query_cache.get(key)
+            if blob is not None:
+                embedding = np.frombuffer(blob, dtype=np.float32).reshape(1, -1)
+                self.query_cache.set(key, embedding)
+                CACHE_EVENTS.inc("query_embedding", "shared")
+                return embedding, "shared"
+
+        CACHE_EVENTS.inc("query_embedding", "miss")
+        return None, None
 
-    def _embed_query(self, query: str) -> np.ndarray:
-        """Embed a query using Gemini."""
-        result = self.client.models.embed_content(
-            model="gemini-embedding-001",
-            contents=query,
+    def _cache_query_embedding(self, key: str, embedding: np.ndarray) -> None:
+        self.query_cache.set(key, embedding)
+        if self.shared_query_cache is not None:
+            self.shared_query_cache.set(key, embedding.tobytes())
+
+    async def _cached_embed_query(self, query: str) -> tuple[np.ndarray, Optional[str]]:
+        """Embed a query through the memory and shared caches."""
+        key = self._query_cache_key(query)
+        embedding, hit = self._cached_query_embedding(key)
+        if embedding is None:
+            embedding = await self._embed_query(query)
+            self._cache_query_embedding(key, embedding)
+        return embedding, hit
+
+    async def _cached_embed_queries(
+        self, queries: list[str]
+    ) -> tuple[np.ndarray, list[Optional[str]]]:
+        """
+        Embed many queries through the caches, one row per query.
+
+        Misses are deduplicated and embedded in provider batches.
+        """
+        keys = [self._query_cache_key(query) for query in queries]
+        found: dict[str, np.ndarray] = {}
+        hits: list[Optional[str]] = []
+        missing: dict[str, str] = {}
+        for key, query in zip(keys, queries):
+            if key in found or key in missing:
+                hits.append("memory" if key in found else None)
+                continue
+            embedding, hit = self._cached_query_embedding(key)
+            hits.append(hit)
+            if embedding is None:
+                missing[key] = query
+            else:
+                found[key] = embedding
+        if missing:
+            vectors = await self.embedder.aembed_queries(list(missing.values()))
+            for key, values in zip(missing, vectors):
+                found[key] = np.array([values], dtype=np.float32)
+                self._cache_query_embedding(key, found[key])
+        return np.vstack([found[key] for key in keys]), hits
+
+    def cache_stats(
+        self, retrieval: Retrieval, conversation: Optional[Conversation] = None
+    ) -> dict:
+        """Cache metrics for the chat request log."""
+        stats = {
+            "query_embedding": {
+                "hit": retrieval.embedding_cache,
+                **self.query_cache.stats(),
+            }
+        }
+        if self.response_cache is not None:
+            stats["response"] = self.response_cache.stats()
+        if self.conversations is not None:
+            stats["conversation"] = {
+                "hit": conversation is not None,
+                **self.conversations.stats(),
+            }
+        return stats
+
+    @staticmethod
+    def _history_key(history: list[dict]) -> str:
+        """Key equivalent histories (same roles, normalized text) identically."""
+        if not history:
+            return ""
+        normalized = "\n".join(
+            f"{msg['role']}:{' '.join(msg['content'].casefold().split())}"
+            for msg in history
         )
-        return np.array([result.embeddings[0].values], dtype=np.float32)
+        return hashlib.sha256(normalized.encode()).hexdigest()
 
-    async def generate_response(
+    def _cached_response(
+        self, retrieval: Retrieval, history: list[dict]
+    ) -> Optional[str]:
+        """
+        Look up a semantically equivalent answer, if the cache is enabled.
+
+        Keyword fast-path retrievals have no query embedding, so their
+        answers only match the same normalized query.
+        """
+        if self.response_cache is None:
+            return None
+        history_key = self._history_key(history)
+        if retrieval.query_embedding is not None:
+            response = self.response_cache.get(
+                retrieval.query_embedding, retrieval.chunk_ids, history_key
+            )
+        elif retrieval.query_key is not None:
+            response = self.response_cache.get_exact(
+                retrieval.query_key, retrieval.chunk_ids, history_key
+            )
+        else:
+            return None
+        CACHE_EVENTS.inc("response", "miss" if response is None else "hit")
+        return response
+
+    def _cache_response(
+        self, retrieval: Retrieval, history: list[dict], response: str
+    ) -> None:
+        if self.response_cache is None or response == FALLBACK_RESPONSE:
+            return
+        history_key = self._history_key(history)
+        if retrieval.query_embedding is not None:
+            self.response_cache.set(
+                retrieval.query_embedding, retrieval.chunk_ids, history_key, response
+            )
+        elif retrieval.query_key is not None:
+            self.response_cache.set_exact(
+                retrieval.query_key, retrieval.chunk_ids, history_key, response
+            )
+
+    @staticmethod
+    def _select_hits(
+        scores: np.ndarray, indices: np.ndarray
+    ) -> list[tuple[float, int]]:
+        """
+        Dynamic k: keep hits above the similarity cutoff and close to the best.
+
+        Scores are cosine similarities in descending order.
+        """
+        hits = [
+            (float(score), int(idx))
+            for score, idx in zip(scores, indices)
+            if idx >= 0 and score >= settings.retrieval_min_similarity
+        ]
+        if not hits:
+            return []
+        floor = hits[0][0] - settings.retrieval_relative_margin
+        return [hit for hit in hits if hit[0] >= floor]
+
+    @staticmethod
+    def _calibrate(similarity: float) -> float:
+        """Map cosine similarity onto [0, 1] between the configured anchors."""
+        low, high = settings.similarity_floor, settings.similarity_ceiling
+        return float(np.clip((similarity - low) / (high - low), 0.0, 1.0))
+
+    @staticmethod
+    def _keyword_hits(
+        snapshot: IndexSnapshot, query: str, k: Optional[int] = None
+    ) -> list[tuple[float, int]]:
+        """BM25 hits above the keyword cutoff, as (normalized score, row)."""
+        if snapshot.keyword_index is None:
+            return []
+        indices, scores = snapshot.keyword_index.search(
+            query, k=k or settings.retrieval_max_k
+        )
+        return [
+            (float(score), int(idx))
+            for score, idx in zip(scores, indices)
+            if score >= settings.keyword_min_score
+        ]
+
+    @staticmethod
+    def _fuse(
+        *rankings: list[tuple[float, int]], k: Optional[int] = None
+    ) -> list[tuple[float, int]]:
+        """
+        Reciprocal rank fusion of ranked (relevance, chunk id) lists.
+
+        Order follows the summed 1 / (rrf_k + rank); each chunk keeps its
+        best relevance from any list.
+        """
+        fused: dict[int, float] = {}
+        relevance: dict[int, float] = {}
+        for ranking in rankings:
+            for rank, (score, idx) in enumerate(ranking, start=1):
+                fused[idx] = fused.get(idx, 0.0) + 1.0 / (settings.rrf_k + rank)
+                relevance[idx] = max(relevance.get(idx, 0.0), score)
+        order = sorted(fused, key=fused.__getitem__, reverse=True)
+        return [(relevance[idx], idx) for idx in order[: k or settings.retrieval_max_k]]
+
+    @staticmethod
+    def _is_strong_match(keyword_hits: list[tuple[float, int]]) -> bool:
+        """Whether the best keyword hit qualifies for the keyword fast path."""
+        fast_path = settings.keyword_fast_path_score
+        return bool(keyword_hits) and 0 < fast_path <= keyword_hits[0][0]
+
+    def _rank(
         self,
-        query: str,
-        history: list[ChatMessage],
-    ) -> dict:
-        """Generate response using RAG."""
+        snapshot: IndexSnapshot,
+        keyword_hits: list[tuple[float, int]],
+        scores: np.ndarray,
+        labels: np.ndarray,
+        k: Optional[int] = None,
+    ) -> tuple[list[tuple[float, int]], str]:
+        """Hits and mode for one query's FAISS results and keyword hits."""
+        rows = snapshot.documents.rows(labels)
+        vector_hits = [
+            (self._calibrate(score), idx)
+            for score, idx in self._select_hits(scores, rows)
+        ]
+        if snapshot.keyword_index is not None:
+            return self._fuse(vector_hits, keyword_hits, k=k), "hybrid"
+        return vector_hits, "vector"
+
+    @staticmethod
+    def _retrieval(
+        snapshot: IndexSnapshot, hits: list[tuple[float, int]], **fields
+    ) -> Retrieval:
+        """Sources and chunks for ranked (relevance, row) hits."""
         sources: list[dict] = []
-        context_parts: list[str] = []
-
-        # Retrieve relevant documents
-        if self.index and self.documents:
-            query_embedding = self._embed_query(query)
-            distances, indices = self.index.search(query_embedding, k=3)
-
-            for i, (dist, idx) in enumerate(zip(distances[0], indices[0])):
-                if idx < len(self.documents):
-                    doc = self.documents[idx]
-                    # Convert L2 distance to similarity score
-                    similarity = 1 / (1 + dist)
-                    context_parts.append(doc.content)
-                    sources.append(
-                        {
-                            "document": doc.source,
-                            "relevance_score": round(float(similarity), 2),
-                            "excerpt": doc.content[:200] + "..."
-                            if len(doc.content) > 200
-                            else doc.content,
-                        }
-                    )
+        documents: list[Document] = []
+        chunk_ids: list[int] = []
+        for relevance, idx in hits:
+            if idx < len(snapshot.documents):
+                doc = snapshot.documents[idx]
+                documents.append(doc)
+                chunk_ids.append(idx)
+                source = {
+                    "document": doc.source,
+                    "relevance_score": round(relevance, 2),
+                    "excerpt": doc.content[:200] + "..."
+                    if len(doc.content) > 200
+                    else doc.content,
+                }
+                if doc.heading_path:
+                    source["section"] = " > ".join(doc.heading_path)
+                    source["anchor"] = doc.anchor
+                sources.append(source)
+        return Retrieval(
+            sources=sources, documents=documents, chunk_ids=tuple(chunk_ids), **fields
+        )
+
+    async def _retrieve(self, query: str, stages: Optional[Stages] = None) -> Retrieval:
+        """Retrieve relevant chunks for a query, timing each search stage."""
+        stages = stages or Stages()
+
+        # One snapshot for the whole request, even if a reload swaps it
+        snapshot = self.snapshot
+        if snapshot is None or len(snapshot.documents) == 0:
+            return Retrieval(sources=[], documents=[])
+
+        with stages.time("keyword_search"):
+            keyword_hits = self._keyword_hits(snapshot, query)
+        strong_match = self._is_strong_match(keyword_hits)
+        # Keyword scores saturate at full relevance
+        keyword_hits = [(min(score, 1.0), idx) for score, idx in keyword_hits]
+        if strong_match:
+            # Exact-term match: answer without the embedding round trip
+            return self._retrieval(
+                snapshot,
+                keyword_hits,
+                mode="keyword",
+                query_key=self._query_cache_key(query),
+            )
 
-        context = "\n\n".join(context_parts)
+        with stages.time("embed"):
+            query_embedding, embedding_cache = await self._cached_embed_query(query)
+        with stages.time("vector_search"):
+            query_vector = query_embedding.copy()
+            faiss.normalize_L2(query_vector)
+            k = min(settings.retrieval_max_k, snapshot.index.ntotal)
+            scores, labels = snapshot.index.search(query_vector, k=k)
+            hits, mode = self._rank(snapshot, keyword_hits, scores[0], labels[0])
+        return self._retrieval(
+            snapshot,
+            hits,
+            embedding_cache=embedding_cache,
+            query_embedding=query_embedding,
+            mode=mode,
+        )
+
+    async def retrieve_many(
+        self,
+        queries: Sequence[str],
+        k: Optional[int] = None,
+        stages: Optional[Stages] = None,
+    ) -> list[Retrieval]:
+        """
+        Retrieve chunks for many queries at once, without generation.
 
-        # Build conversation history
-        gemini_history = [
+        Ranks like chat retrieval (keyword fast path, dynamic k, hybrid
+        fusion) with at most `k` chunks per query. Queries that need vectors
+        are embedded through the caches in provider batches and searched
+        with a single FAISS call over the stacked matrix. Used by offline
+        evaluation, prefetching scripts and /api/retrieve.
+
+        Returns:
+            One Retrieval per query, in order
+        """
+        stages = stages or Stages()
+        k = k or settings.retrieval_max_k
+        snapshot = self.snapshot
+        if snapshot is None or len(snapshot.documents) == 0:
+            return [Retrieval(sources=[], documents=[]) for _ in queries]
+
+        with stages.time("keyword_search"):
+            keyword_hits = [self._keyword_hits(snapshot, q, k) for q in queries]
+        results: dict[int, Retrieval] = {}
+        pending: list[int] = []
+        for i, hits in enumerate(keyword_hits):
+            strong_match = self._is_strong_match(hits)
+            keyword_hits[i] = [(min(score, 1.0), idx) for score, idx in hits]
+            if strong_match:
+                results[i] = self._retrieval(
+                    snapshot,
+                    keyword_hits[i],
+                    mode="keyword",
+                    query_key=self._query_cache_key(queries[i]),
+                )
+            else:
+                pending.append(i)
+
+        if pending:
+            with stages.time("embed"):
+                embeddings, cache_hits = await self._cached_embed_queries(
+                    [queries[i] for i in pending]
+                )
+            with stages.time("vector_search"):
+                query_vectors = embeddings.copy()
+                faiss.normalize_L2(query_vectors)
+                scores, labels = snapshot.index.search(
+                    query_vectors, k=min(k, snapshot.index.ntotal)
+                )
+                for row, i in enumerate(pending):
+                    hits, mode = self._rank(
+                        snapshot, keyword_hits[i], scores[row], labels[row], k
+                    )
+                    results[i] = self._retrieval(
+                        snapshot,
+                        hits,
+                        embedding_cache=cache_hits[row],
+                        query_embedding=embeddings[row : row + 1],
+                        mode=mode,
+                    )
+        return [results[i] for i in range(len(queries))]
+
+    @staticmethod
+    def _build_history(history: list[ChatMessage]) -> list[dict]:
+        """Convert the most recent history messages to Gemini format."""
+        return [
             {"role": msg.role, "content": msg.content}
             for msg in history[-settings.max_conversation_history :]
         ]
 
-        # Generate response
-        response = await self.gemini.generate(
-            system_prompt=SYSTEM_PROMPT,
-            context=context,
-            query=query,
-            history=gemini_history,
+    def _load_conversation(
+        self, conversation_id: Optional[str]
+    ) -> Optional[Conversation]:
+        """Stored state of a conversation, if the store is enabled."""
+        if self.conversations is None or not conversation_id:
+            return None
+        conversation = self.conversations.get(conversation_id)
+        CACHE_EVENTS.inc("conversation", "miss" if conversation is None else "hit")
+        return conversation
+
+    def _save_conversation(
+        self,
+        conversation_id: Optional[str],
+        query: str,
+        prompt: Prompt,
+        retrieval: Retrieval,
+        response: str,
+    ) -> None:
+        """Store the compacted history plus this turn, and its chunks."""
+        if (
+            self.conversations is None
+            or not conversation_id
+            or response == FALLBACK_RESPONSE
+        ):
+            return
+        turn = [
+            {"role": "user", "content": query},
+            {"role": "assistant", "content": response},
+        ]
+        self.conversations.save(
+            conversation_id,
+            Conversation(history=prompt.history + turn, documents=retrieval.documents),
         )
 
+    def _assemble_prompt(
+        self,
+        query: str,
+        retrieval: Retrieval,
+        history: list[ChatMessage],
+        conversation: Optional[Conversation] = None,
+    ) -> Prompt:
+        """
+        Fit retrieved chunks and history under the prompt token budget.
+
+        With a stored conversation, its history stands in for history the
+        client did not send, and the previous question's chunks follow the
+        new ones (overlaps are merged) for follow-up questions.
+        """
+        messages = self._build_history(history)
+        documents = list(retrieval.documents)
+        if conversation is not None:
+            if not messages:
+                messages = conversation.history[-settings.max_conversation_history :]
+            documents += conversation.documents
+        return self.prompt_assembler.assemble(SYSTEM_PROMPT, query, documents, messages)
+
+    async def generate_response(
+        self,
+        query: str,
+        history: list[ChatMessage],
+        conversation_id: Optional[str] = None,
+        stages: Optional[Stages] = None,
+    ) -> dict:
+        """
+        Generate response using RAG.
+
+        Stage durations are recorded into `stages` (and the stage histograms)
+        when the caller passes one for its request log.
+        """
+        stages = stages or Stages()
+        retrieval = await self._retrieve(query, stages)
+        with stages.time("prompt"):
+            conversation = self._load_conversation(conversation_id)
+            prompt = self._assemble_prompt(query, retrieval, history, conversation)
+
+        # Generate response, unless a similar question was already answered
+        response = self._cached_response(retrieval, prompt.history)
+        cached = response is not None
+        if response is None:
+            response = await self.gemini.generate(
+                system_prompt=SYSTEM_PROMPT,
+                context=prompt.context,
+                query=query,
+                history=prompt.history,
+                stages=stages,
+            )
+            self._cache_response(retrieval, prompt.history, response)
+        self._save_conversation(conversation_id, query, prompt, retrieval, response)
+
         # Evaluate response quality
-        evaluation = self._evaluate_response(sources, response)
+        with stages.time("evaluate"):
+            evaluation = self._evaluate_response(retrieval.sources, response)
 
         return {
             "response": response,
-            "sources": sources,
+            "sources": retrieval.sources,
+            **evaluation,
+            "cached": cached,
+            "cache": self.cache_stats(retrieval, conversation),
+            "prompt_tokens": prompt.tokens,
+        }
+
+    async def stream_response(
+        self,
+        query: str,
+        history: list[ChatMessage],
+        conversation_id: Optional[str] = None,
+        stages: Optional[Stages] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream a RAG response as events.
+
+        Yields a "sources" event, then one "token" event per text delta,
+        then a final "done" event carrying the evaluation.
+        """
+        stages = stages or Stages()
+        retrieval = await self._retrieve(query, stages)
+        yield {"event": "sources", "sources": retrieval.sources}
+
+        with stages.time("prompt"):
+            conversation = self._load_conversation(conversation_id)
+            prompt = self._assemble_prompt(query, retrieval, history, conversation)
+        response = self._cached_response(retrieval, prompt.history)
+        cached = response is not None
+        if response is not None:
+            yield {"event": "token", "text": response}
+        else:
+            response_parts: list[str] = []
+            async for delta in self.gemini.generate_stream(
+                system_prompt=SYSTEM_PROMPT,
+                context=prompt.context,
+                query=query,
+                history=prompt.history,
+                stages=stages,
+            ):
+                response_parts.append(delta)
+                yield {"event": "token", "text": delta}
+            response = "".join(response_parts)
+            self._cache_response(retrieval, prompt.history, response)
+        self._save_conversation(conversation_id, query, prompt, retrieval, response)
+
+        with stages.time("evaluate"):
+            evaluation = self._evaluate_response(retrieval.sources, response)
+        yield {
+            "event": "done",
             **evaluation,
+            "cached": cached,
+            "cache": self.cache_stats(retrieval, conversation),
+            "prompt_tokens": prompt.tokens,
         }
 
     def _evaluate_response(
@@ -0,0 +1,261 @@
+"""
+Portfolio Backend - Upstream Call Manager
+
+Gemini calls made while serving requests (query embeddings and generation)
+go through an UpstreamManager:
+
+- At most `max_concurrency` calls are in flight and at most `max_queue` more
+  wait for a slot. Calls beyond that are shed at once with
+  UpstreamOverloaded (503 + Retry-After) instead of queueing behind a slow
+  or rate-limited upstream.
+- Identical in-flight calls (same key) are coalesced: followers await the
+  first caller's result instead of sending their own request.
+- 429 and 5xx responses are retried with jittered exponential backoff,
+  honoring Retry-After, while the call's deadline allows. The slot is
+  released while backing off.
+- A 429 or 503 that outlives its retries is raised as UpstreamOverloaded
+  with the upstream status, so clients see 429/503 + Retry-After rather
+  than a generic 500.
+
+Slots are plain counters and per-waiter futures rather than an
+asyncio.Semaphore, so a manager is not bound to the first event loop
+that used it.
+"""
+
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+from google.genai import errors
+
+from app.core.config import settings
+from app.core.metrics import UPSTREAM_CALLS
+
+T = TypeVar("T")
+
+# Quota and transient server errors are worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Upstream statuses passed through to clients as "retry later"
+OVERLOAD_STATUS_CODES = {429, 503}
+
+
+class UpstreamOverloaded(Exception):
+    """A call was shed or rate limited; clients should retry later."""
+
+    def __init__(self, upstream: str, status_code: int, retry_after: float) -> None:
+        super().__init__(
+            f"{upstream} upstream overloaded ({status_code}), "
+            f"retry after {retry_after:.1f}s"
+        )
+        self.upstream = upstream
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Retry-After in whole seconds, at least 1."""
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """The Retry-After header of an API error response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return None
+
+
+def retry_delay(attempt: int, base_delay: float, error: BaseException) -> float:
+    """Honor Retry-After when present, else exponential backoff with jitter."""
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        return retry_after
+    base = base_delay * (2**attempt)
+    return base + random.uniform(0, base)
+
+
+class UpstreamManager:
+    """Bounded, coalescing, retrying gateway to one upstream API."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+        deadline_seconds: Optional[float] = None,
+        coalesce: Optional[bool] = None,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = settings.upstream_max_queue if max_queue is None else max_queue
+        self.max_retries = (
+            settings.upstream_max_retries if max_retries is None else max_retries
+        )
+        self.retry_base_delay = (
+            settings.upstream_retry_base_delay
+            if retry_base_delay is None
+            else retry_base_delay
+        )
+        self.deadline_seconds = (
+            settings.upstream_deadline_seconds
+            if deadline_seconds is None
+            else deadline_seconds
+        )
+        self.coalesce = settings.upstream_coalesce if coalesce is None else coalesce
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        # Moving average of attempt durations, for Retry-After estimates
+        self._attempt_seconds = 1.0
+
+    def stats(self) -> dict[str, int]:
+        """Calls holding a slot and calls waiting for one."""
+        return {"in_flight": self._active, "queued": len(self._waiters)}
+
+    def retry_after(self) -> float:
+        """Estimated seconds until the current queue drains."""
+        waves = (len(self._waiters) + self.max_concurrency) / self.max_concurrency
+        return self._attempt_seconds * waves
+
+    def check_capacity(self) -> None:
+        """Raise UpstreamOverloaded now if a new call would be shed."""
+        if self._active >= self.max_concurrency and (
+            len(self._waiters) >= self.max_queue
+        ):
+            UPSTREAM_CALLS.inc(self.name, "shed")
+            raise UpstreamOverloaded(self.name, 503, self.retry_after())
+
+    async def _acquire(self, deadline: float) -> None:
+        """Take a slot, waiting in the queue until the deadline at most."""
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+        self.check_capacity()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            UPSTREAM_CALLS.inc(self.name, "shed")
+            raise UpstreamOverloaded(self.name, 503, self.retry_after()) from None
+        except BaseException:
+            # Cancelled just after being handed a slot: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def slot(self) -> "_Slot":
+        """Async context manager holding a slot, e.g. for a streamed call."""
+        return _Slot(self)
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[T]],
+        *,
+        timeout: float,
+        key: Optional[Hashable] = None,
+    ) -> T:
+        """
+        Run `func()` in a slot, retrying retryable API errors.
+
+        Each attempt is bounded by `timeout` and the whole call, queueing
+        and backoff included, by the manager's deadline. Calls with the same
+        `key` made while one is in flight share its result.
+
+        Raises:
+            UpstreamOverloaded: shed, or rate limited past the retries
+        """
+        if key is None or not self.coalesce:
+            return await self._call(func, timeout)
+
+        leader = self._inflight.get(key)
+        if leader is not None:
+            UPSTREAM_CALLS.inc(self.name, "coalesced")
+            return await asyncio.shield(leader)
+
+        task = asyncio.ensure_future(self._call(func, timeout))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._call_done(key, done))
+        # A disconnecting client must not cancel the call its followers await
+        return await asyncio.shield(task)
+
+    def _call_done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the error retrieved even if every caller has gone
+            task.exception()
+
+    async def _call(self, func: Callable[[], Awaitable[T]], timeout: float) -> T:
+        deadline = time.monotonic() + self.deadline_seconds
+        attempt = 0
+        while True:
+            await self._acquire(deadline)
+            start = time.monotonic()
+            try:
+                result = await asyncio.wait_for(
+                    func(), timeout=min(timeout, deadline - start)
+                )
+            except errors.APIError as e:
+                delay = retry_delay(attempt, self.retry_base_delay, e)
+                if (
+                    e.code not in RETRYABLE_STATUS_CODES
+                    or attempt >= self.max_retries
+                    or time.monotonic() + delay >= deadline
+                ):
+                    UPSTREAM_CALLS.inc(self.name, "failed")
+                    if e.code in OVERLOAD_STATUS_CODES:
+                        raise UpstreamOverloaded(self.name, e.code, delay) from e
+                    raise
+            except Exception:
+                UPSTREAM_CALLS.inc(self.name, "failed")
+                raise
+            else:
+                UPSTREAM_CALLS.inc(self.name, "ok")
+                return result
+            finally:
+                elapsed = time.monotonic() - start
+                self._attempt_seconds += 0.2 * (elapsed - self._attempt_seconds)
+                self._release()
+
+            UPSTREAM_CALLS.inc(self.name, "retried")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+class _Slot:
+    """Holds one of a manager's slots for the duration of an `async with`."""
+
+    __slots__ = ("manager",)
+
+    def __init__(self, manager: UpstreamManager) -> None:
+        self.manager = manager
+
+    async def __aenter__(self) -> None:
+        await self.manager._acquire(time.monotonic() + self.manager.deadline_seconds)
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.manager._release()
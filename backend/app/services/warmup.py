@@ -0,0 +1,70 @@
+"""
+Portfolio Backend - Startup Warm-up
+"""
+
+import asyncio
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import PortfolioLogger
+from app.services.rag_service import RAGService
+
+
+class WarmupService:
+    """
+    Background warm-up run from the FastAPI lifespan.
+
+    Loads the RAG index (creating the Gemini clients with it) and pre-embeds
+    common queries so the first visitor after a scale-from-zero does not pay
+    for them. Readiness is reported by /ready.
+    """
+
+    status: str = "pending"  # pending -> warming_up -> ready | failed
+    error: Optional[str] = None
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def start(cls) -> None:
+        """Schedule warm-up on the running event loop."""
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls.run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Cancel an unfinished warm-up on shutdown."""
+        if cls._task is not None and not cls._task.done():
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+
+    @classmethod
+    async def run(cls) -> None:
+        """Load the index and pre-embed common queries."""
+        cls.status, cls.error = "warming_up", None
+        try:
+            rag_service = await RAGService.aget_instance()
+        except Exception as e:
+            cls.status, cls.error = "failed", str(e)
+            PortfolioLogger.log_error("warmup_error", str(e))
+            return
+
+        # Pre-embedding is best effort; a failure here should not block traffic
+        if rag_service.is_loaded():
+            try:
+                for query in cls.queries():
+                    await rag_service._cached_embed_query(query)
+            except Exception as e:
+                PortfolioLogger.log_error("warmup_error", str(e))
+
+        cls.status = "ready"
+
+    @staticmethod
+    def queries() -> list[str]:
+        """Configured warm-up queries (comma-separated)."""
+        return [q.strip() for q in settings.warmup_queries.split(",") if q.strip()]
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls.status == "ready"
@@ -0,0 +1,80 @@
+"""
+Portfolio Backend - ANN Recall vs Latency Benchmark
+
+Builds every index backend from app/services/ann.py over a synthetic
+clustered corpus and compares recall@k against the flat ground truth,
+together with build time and single-query search latency.
+
+Usage (from backend/):
+    python -m benchmarks.ann_recall --vectors 50000 --dimension 256
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+
+def clustered_vectors(
+    count: int, dimension: int, clusters: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Gaussian blobs, closer to real embedding layouts than uniform noise."""
+    centers = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    noise = rng.normal(scale=0.35, size=(count, dimension)).astype(np.float32)
+    return centers[labels] + noise
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+    from app.core.config import Settings
+    from app.services.ann import INDEX_TYPES, build_ann_index
+
+    rng = np.random.default_rng(0)
+    corpus = clustered_vectors(args.vectors, args.dimension, 200, rng)
+    queries = clustered_vectors(args.queries, args.dimension, 200, rng)
+
+    ground_truth = None
+    print(f"{args.vectors} vectors x {args.dimension} dims, recall@{args.k}")
+    print(
+        f"{'backend':<10} {'build s':>8} {'recall':>7} {'p50 us':>8} "
+        f"{'p99 us':>8}  params"
+    )
+    for index_type in INDEX_TYPES:
+        config = Settings(index_type=index_type)
+        start = time.perf_counter()
+        index, resolved = build_ann_index(corpus, config=config)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        found = []
+        for query in queries:
+            start = time.perf_counter()
+            _, ids = index.search(query.reshape(1, -1), args.k)
+            latencies.append((time.perf_counter() - start) * 1e6)
+            found.append(ids[0])
+        found = np.array(found)
+
+        if ground_truth is None:
+            ground_truth = found  # flat runs first and is exact
+        recall = np.mean(
+            [len(set(f) & set(t)) / args.k for f, t in zip(found, ground_truth)]
+        )
+        params = {k: v for k, v in resolved.items() if k != "type"}
+        print(
+            f"{index_type:<10} {build_seconds:>8.2f} {recall:>7.3f} "
+            f"{np.percentile(latencies, 50):>8.0f} {np.percentile(latencies, 99):>8.0f}"
+            f"  {params}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Portfolio Backend - Index Build Benchmark
+
+Measures RAGService.build_index throughput against a fake embedding backend
+for a serial one-chunk-per-request baseline, a batched full rebuild and an
+incremental rebuild after editing a fraction of the corpus.
+
+Usage (from backend/):
+    python -m benchmarks.build_index --files 40 --latency-ms 50
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmarks.corpus import write_corpus
+from benchmarks.stub_gemini import FakeEmbeddingClient
+
+
+def _timed_build(client: FakeEmbeddingClient) -> tuple[float, int]:
+    from app.services.embedding_backends import GeminiEmbeddingProvider
+    from app.services.rag_service import RAGService
+
+    calls_before = client.calls
+    start = time.perf_counter()
+    RAGService.build_index(GeminiEmbeddingProvider(client))
+    return time.perf_counter() - start, client.calls - calls_before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--changed", type=float, default=0.05)
+    args = parser.parse_args()
+
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+    from app.core.config import settings
+    from app.services import rag_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs_path = Path(tmp) / "rag_docs"
+        rag_service.RAG_DOCS_PATH = docs_path
+        write_corpus(docs_path, args.files, args.sections)
+        chunks = len(rag_service.RAGService._load_documents())
+        client = FakeEmbeddingClient(args.latency_ms)
+        results = []
+
+        # Baseline: one chunk per request, no concurrency, no reuse
+        rag_service.INDEX_PATH = Path(tmp) / "baseline_index"
+        with (
+            patch.object(settings, "embedding_batch_size", 1),
+            patch.object(settings, "embedding_max_workers", 1),
+        ):
+            results.append(("serial baseline", chunks, *_timed_build(client)))
+
+        rag_service.INDEX_PATH = Path(tmp) / "faiss_index"
+        results.append(("batched full", chunks, *_timed_build(client)))
+
+        # Edit a fraction of the files, then rebuild
+        changed = max(1, int(args.files * args.changed))
+        for md_file in sorted(docs_path.glob("*.md"))[:changed]:
+            with md_file.open("a", encoding="utf-8") as f:
+                f.write("\n## Update\n\nAdded a new certification this year.\n")
+        results.append(("incremental", chunks, *_timed_build(client)))
+
+    print(f"{chunks} chunks, {args.latency_ms:.0f} ms per embed request")
+    print(f"{'build':<18} {'seconds':>8} {'requests':>9} {'chunks/s':>10}")
+    for name, n, seconds, calls in results:
+        print(f"{name:<18} {seconds:>8.2f} {calls:>9} {n / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
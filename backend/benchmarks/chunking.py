@@ -0,0 +1,127 @@
+"""
+Portfolio Backend - Chunking Benchmark
+
+Splits multi-megabyte synthetic markdown with the span-based TextSplitter
+(character and token sizing), the heading-aware MarkdownSplitter and the
+previous concatenating splitter, reporting throughput and peak allocations.
+
+Usage (from backend/):
+    python -m benchmarks.chunking --megabytes 2 4 8
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.corpus import synthetic_markdown
+
+
+class LegacyTextSplitter:
+    """The pre-span splitter, kept here as the baseline."""
+
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50) -> None:
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = ["\n\n", "\n", ". ", " "]
+
+    def split(self, text: str) -> list[str]:
+        return [c for c in self._split_recursive(text, self.separators) if c.strip()]
+
+    def _split_recursive(self, text: str, separators: list[str]) -> list[str]:
+        if len(text) <= self.chunk_size:
+            return [text] if text.strip() else []
+        if not separators:
+            step = self.chunk_size - self.chunk_overlap
+            return [text[i : i + self.chunk_size] for i in range(0, len(text), step)]
+        sep, remaining = separators[0], separators[1:]
+        if sep not in text:
+            return self._split_recursive(text, remaining)
+
+        chunks: list[str] = []
+        current = ""
+        for part in text.split(sep):
+            candidate = current + sep + part if current else part
+            if len(candidate) <= self.chunk_size:
+                current = candidate
+            else:
+                if current:
+                    chunks.append(current)
+                if len(part) > self.chunk_size:
+                    chunks.extend(self._split_recursive(part, remaining))
+                    current = ""
+                else:
+                    current = part
+        if current:
+            chunks.append(current)
+
+        if len(chunks) <= 1 or self.chunk_overlap == 0:
+            return chunks
+        result = [chunks[0]]
+        for i in range(1, len(chunks)):
+            prev = chunks[i - 1]
+            tail = prev[-self.chunk_overlap :] if len(prev) > self.chunk_overlap else ""
+            result.append(tail + chunks[i])
+        return result
+
+
+def _measure(split: Callable[[], list]) -> tuple[float, float, list]:
+    """Return (seconds, peak MiB allocated, chunks)."""
+    start = time.perf_counter()
+    chunks = split()
+    seconds = time.perf_counter() - start
+    # Separate run: tracemalloc slows allocation-heavy code considerably
+    del chunks
+    tracemalloc.start()
+    chunks = split()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20, chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    args = parser.parse_args()
+
+    from app.services.chunking import MarkdownSplitter, TextSplitter
+
+    section = synthetic_markdown(200)
+    print(
+        f"{'MB':>5} {'splitter':<14} {'seconds':>8} {'MB/s':>7} "
+        f"{'peak MiB':>9} {'chunks':>7} {'oversized':>9}"
+    )
+    for megabytes in args.megabytes:
+        text = section * max(1, int(megabytes * 2**20 / len(section)))
+        size_mb = len(text) / 2**20
+        legacy = LegacyTextSplitter(args.chunk_size, args.chunk_overlap)
+        splitters = {
+            "legacy": lambda: legacy.split(text),
+            "span/chars": lambda: TextSplitter(
+                args.chunk_size, args.chunk_overlap
+            ).split(text, "bench.md"),
+            "markdown": lambda: MarkdownSplitter(
+                args.chunk_size, args.chunk_overlap
+            ).split(text, "bench.md"),
+            "span/tokens": lambda: TextSplitter(
+                args.chunk_size // 4, args.chunk_overlap // 4, length_unit="tokens"
+            ).split(text, "bench.md"),
+        }
+        for name, split in splitters.items():
+            seconds, peak, chunks = _measure(split)
+            contents = [c if isinstance(c, str) else c.content for c in chunks]
+            oversized = (
+                sum(len(c) > args.chunk_size for c in contents)
+                if name != "span/tokens"
+                else 0
+            )
+            print(
+                f"{size_mb:>5.1f} {name:<14} {seconds:>8.2f} {size_mb / seconds:>7.1f} "
+                f"{peak:>9.1f} {len(chunks):>7} {oversized:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
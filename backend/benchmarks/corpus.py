@@ -0,0 +1,47 @@
+"""
+Portfolio Backend - Synthetic Benchmark Corpus
+
+Deterministic markdown shaped like the real rag_docs files.
+"""
+
+import random
+from pathlib import Path
+
+TOPICS = [
+    "Python", "FastAPI", "React", "TypeScript", "Docker", "Terraform",
+    "Google Cloud", "AWS", "Azure", "PostgreSQL", "FAISS", "Gemini",
+    "Spring Boot", "GitHub Actions", "LangChain", "Tailwind CSS",
+]  # fmt: skip
+
+WORDS = (
+    "built shipped designed migrated maintained scaled tested documented "
+    "services pipelines dashboards APIs clients teams releases features "
+    "latency throughput reliability accessibility security costs"
+).split()
+
+
+def synthetic_markdown(sections: int, seed: int = 0) -> str:
+    """Return a markdown document with headings, bullets and prose."""
+    rng = random.Random(seed)
+    lines: list[str] = [f"# Synthetic Profile {seed}", ""]
+    for s in range(sections):
+        topic = rng.choice(TOPICS)
+        lines += [f"## {topic} experience {s}", ""]
+        for _ in range(rng.randint(2, 5)):
+            detail = " ".join(rng.choices(WORDS, k=rng.randint(6, 14)))
+            lines.append(f"- **{topic}**: {detail}.")
+        lines.append("")
+        sentences = [
+            " ".join(rng.choices(WORDS, k=rng.randint(8, 20))).capitalize() + "."
+            for _ in range(rng.randint(2, 6))
+        ]
+        lines += [" ".join(sentences), ""]
+    return "\n".join(lines)
+
+
+def write_corpus(directory: Path, files: int, sections: int, seed: int = 0) -> None:
+    """Write `files` synthetic markdown documents into `directory`."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(files):
+        text = synthetic_markdown(sections, seed=seed + i)
+        (directory / f"doc_{i:04d}.md").write_text(text, encoding="utf-8")
@@ -0,0 +1,115 @@
+"""
+Portfolio Backend - Embedding Provider Benchmark
+
+Embeds the rag_docs chunks with each embedding provider, then measures
+per-query embedding latency and retrieval quality (hit rate at k and MRR of
+the expected section) over a small set of paraphrased questions.
+
+Providers that cannot run are skipped: `local` needs fastembed, `gemini`
+needs GOOGLE_API_KEY (or GEMINI_BASE_URL pointing at a compatible server).
+
+Usage (from backend/):
+    python -m benchmarks.embedding_providers --providers stub,local,gemini
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Paraphrased questions with expected sections, shared with the retrieval
+# evaluation harness
+GOLDEN_SET = Path(__file__).parent / "golden_questions.jsonl"
+
+
+async def _query_latencies(provider, questions: list[str], repeats: int) -> list[float]:
+    """Sequential query embeddings, in milliseconds, after one warm-up call."""
+    await provider.aembed_query(questions[0])
+    latencies = []
+    for _ in range(repeats):
+        for question in questions:
+            start = time.perf_counter()
+            await provider.aembed_query(question)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _evaluate(provider, documents, golden, k: int, repeats: int) -> dict:
+    import faiss
+
+    from app.services.embeddings import EmbeddingStore, embed_documents
+    from app.services.evaluation import chunk_label, recall_at_k, reciprocal_rank
+
+    start = time.perf_counter()
+    vectors, _ = embed_documents(
+        provider, [doc.contextual_text() for doc in documents], EmbeddingStore()
+    )
+    build_seconds = time.perf_counter() - start
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+
+    questions = [item.question for item in golden]
+    latencies = asyncio.run(_query_latencies(provider, questions, repeats))
+
+    hits, reciprocal_ranks = 0, []
+    for item in golden:
+        query = np.array([provider.embed_queries([item.question])[0]], dtype=np.float32)
+        faiss.normalize_L2(query)
+        _, indices = index.search(query, k)
+        labels = [chunk_label(documents[i]) for i in indices[0] if i >= 0]
+        hits += recall_at_k(labels, item.relevant, k) > 0
+        reciprocal_ranks.append(reciprocal_rank(labels, item.relevant))
+
+    return {
+        "dimension": vectors.shape[1],
+        "build_s": build_seconds,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "hit_rate": hits / len(golden),
+        "mrr": float(np.mean(reciprocal_ranks)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--providers", default="stub,local,gemini")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    has_gemini = bool(os.environ.get("GOOGLE_API_KEY"))
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+    from app.services.embedding_backends import embedding_provider
+    from app.services.evaluation import load_golden_set
+    from app.services.rag_service import RAGService
+
+    documents = RAGService._load_documents()
+    golden = load_golden_set(GOLDEN_SET)
+    print(f"{len(documents)} chunks, {len(golden)} questions, k={args.k}")
+    print(
+        f"{'provider':<10} {'dim':>5} {'build s':>8} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'hit@k':>6} {'MRR':>6}"
+    )
+    for name in args.providers.split(","):
+        if name == "gemini" and not (has_gemini or os.environ.get("GEMINI_BASE_URL")):
+            print(f"{name:<10} skipped: GOOGLE_API_KEY is not set")
+            continue
+        try:
+            provider = embedding_provider(name)
+        except RuntimeError as e:
+            print(f"{name:<10} skipped: {e}")
+            continue
+        r = _evaluate(provider, documents, golden, args.k, args.repeats)
+        print(
+            f"{name:<10} {r['dimension']:>5} {r['build_s']:>8.2f} "
+            f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+            f"{r['hit_rate']:>6.2f} {r['mrr']:>6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Portfolio Backend - Index Startup Benchmark
+
+Compares cold-start load time and resident memory of the legacy
+pickle + in-memory FAISS format against the memory-mapped artifact format.
+Each load runs in a fresh subprocess so RSS numbers are independent.
+
+Usage (from backend/):
+    python -m benchmarks.index_startup --chunks 20000 --dimension 3072
+"""
+
+import argparse
+import json
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from benchmarks.corpus import synthetic_markdown
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (Linux /proc)."""
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _child(mode: str, directory: Path) -> None:
+    """Load one format, run one query and report timings as JSON."""
+    from app.services.index_store import ChunkStore, open_index
+
+    baseline = _rss_mb()
+    start = time.perf_counter()
+    if mode == "pickle":
+        index = faiss.read_index(str(directory / "index.faiss"))
+        with open(directory / "documents.pkl", "rb") as f:
+            documents = pickle.load(f)
+    else:
+        index = open_index(directory)
+        documents = ChunkStore(directory)
+    load_ms = (time.perf_counter() - start) * 1000
+    loaded = _rss_mb()
+
+    query = np.random.default_rng(1).random((1, index.d), dtype=np.float32)
+    _, indices = index.search(query, k=3)
+    _ = [documents[int(i)].content for i in indices[0]]
+
+    print(
+        json.dumps(
+            {
+                "load_ms": load_ms,
+                "rss_after_load_mb": loaded - baseline,
+                "rss_after_query_mb": _rss_mb() - baseline,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=3072)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "DIR"))
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], Path(args.child[1]))
+        return
+
+    from app.services.documents import Document
+    from app.services.index_store import write_artifact
+
+    rng = np.random.default_rng(0)
+    vectors = rng.random((args.chunks, args.dimension), dtype=np.float32)
+    text = synthetic_markdown(sections=args.chunks // 10 + 1)
+    documents = [
+        Document(content=text[(i * 450) % len(text) :][:500], source=f"doc_{i % 50}.md")
+        for i in range(args.chunks)
+    ]
+    index = faiss.IndexFlatL2(args.dimension)
+    index.add(vectors)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy, current = Path(tmp) / "pickle", Path(tmp) / "mmap"
+        legacy.mkdir()
+        faiss.write_index(index, str(legacy / "index.faiss"))
+        with open(legacy / "documents.pkl", "wb") as f:
+            pickle.dump(documents, f)
+        write_artifact(current, index, documents, "benchmark", {})
+        del index, vectors
+
+        print(f"{args.chunks} chunks x {args.dimension} dims")
+        print(f"{'format':<8} {'load ms':>9} {'RSS load MB':>12} {'RSS query MB':>13}")
+        for mode, directory in (("pickle", legacy), ("mmap", current)):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.index_startup", "--child", mode,
+                 str(directory)],
+                check=True, capture_output=True, text=True,
+            ).stdout  # fmt: skip
+            r = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:<8} {r['load_ms']:>9.1f} {r['rss_after_load_mb']:>12.1f} "
+                f"{r['rss_after_query_mb']:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Portfolio Backend - /api/chat Load Benchmark
+
+Drives concurrent chat requests through the ASGI app against a local stub
+Gemini server and reports throughput and latency per concurrency level.
+
+Usage (from backend/):
+    python -m benchmarks.load_chat --latency-ms 200 --concurrency 1,4,16,32
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.stub_gemini import StubGeminiServer
+
+QUESTIONS = [
+    "What programming languages does Yuka know?",
+    "Does she have cloud experience?",
+    "What AI tools has she used?",
+    "Which frontend frameworks does she use?",
+]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run_level(
+    client: httpx.AsyncClient, concurrency: int, total: int
+) -> dict[str, float]:
+    """Fire `total` chat requests with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    health_latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/chat", json={"message": QUESTIONS[i % len(QUESTIONS)]}
+            )
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def probe_health() -> None:
+        # /health must stay responsive while chats are in flight
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            health_latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.05)
+
+    prober = asyncio.create_task(probe_health())
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": _percentile(latencies, 95),
+        "health_max_ms": max(health_latencies, default=0.0),
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    # Import after the environment points the app at the stub server
+    from app.main import app
+    from app.services import rag_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rag_service.INDEX_PATH = Path(tmp)
+        rag_service.RAGService.build_index()
+        rag_service.RAGService._instance = None
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=120
+        ) as client:
+            print(
+                f"{'conc':>5} {'reqs':>5} {'req/s':>8} {'p50 ms':>8} "
+                f"{'p95 ms':>8} {'health max ms':>14}"
+            )
+            for concurrency in args.concurrency:
+                total = max(args.requests, concurrency * 4)
+                r = await _run_level(client, concurrency, total)
+                print(
+                    f"{r['concurrency']:>5} {r['requests']:>5} {r['rps']:>8.1f} "
+                    f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+                    f"{r['health_max_ms']:>14.1f}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=30.0)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument(
+        "--concurrency",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[1, 4, 16, 32],
+    )
+    args = parser.parse_args()
+
+    with StubGeminiServer(args.latency_ms, args.embed_latency_ms) as stub:
+        os.environ["GEMINI_BASE_URL"] = stub.base_url
+        os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+        os.environ.setdefault("GEMINI_MAX_CONCURRENCY", str(max(args.concurrency)))
+        asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Portfolio Backend - Upstream Overload Benchmark
+
+Bursts /api/chat through the ASGI app against a local stub Gemini server
+and compares the upstream call manager (see app/services/upstream.py) with
+unmanaged calls:
+
+    identical  N concurrent copies of one question (single-flight coalescing)
+    distinct   N concurrent different questions (queue bound and shedding)
+    throttled  distinct questions, stub quota at half the slots (429 +
+               Retry-After, retried)
+    flaky      distinct questions at --capacity concurrency, --error-rate
+               503s (retries with jittered backoff)
+
+"unmanaged" disables coalescing and retries and never sheds; the executor
+still bounds concurrency. That is how requests behaved before the manager,
+except that upstream 429/503s now reach clients as 429/503 rather than 500.
+
+Usage (from backend/):
+    python -m benchmarks.load_upstream --burst 64 --capacity 8
+    python -m benchmarks.load_upstream --output upstream.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+from benchmarks.load_chat import QUESTIONS, _percentile
+from benchmarks.stub_gemini import StubGeminiServer
+
+MODES = {
+    "managed": {},
+    "unmanaged": {
+        "upstream_coalesce": False,
+        "upstream_max_retries": 0,
+        "upstream_max_queue": 10**6,
+    },
+}
+
+
+async def _burst(
+    client: httpx.AsyncClient, messages: list[str], concurrency: int
+) -> dict:
+    """Send `messages` with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: dict[int, list[float]] = {}
+    retry_after: list[int] = []
+
+    async def one(message: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/api/chat", json={"message": message})
+            latencies.setdefault(response.status_code, []).append(
+                (time.perf_counter() - start) * 1000
+            )
+            if "Retry-After" in response.headers:
+                retry_after.append(int(response.headers["Retry-After"]))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(message) for message in messages))
+    ok = latencies.get(200, [])
+    failed = [
+        ms for status, values in latencies.items() if status != 200 for ms in values
+    ]
+    return {
+        "requests": len(messages),
+        "elapsed_s": round(time.perf_counter() - start, 3),
+        "status": {str(k): len(v) for k, v in sorted(latencies.items())},
+        "ok_p50_ms": round(statistics.median(ok), 1) if ok else None,
+        "ok_p95_ms": round(_percentile(ok, 95), 1) if ok else None,
+        "failed_p50_ms": round(statistics.median(failed), 1) if failed else None,
+        "retry_after_s": sorted(set(retry_after)),
+    }
+
+
+def _scenarios(args: argparse.Namespace) -> dict[str, tuple]:
+    """Scenario -> (messages, client concurrency, stub capacity, stub 503 rate)."""
+    distinct = [
+        f"{QUESTIONS[i % len(QUESTIONS)]} (question {i})" for i in range(args.burst)
+    ]
+    throttled = max(1, args.capacity // 2)
+    return {
+        "identical": ([QUESTIONS[0]] * args.burst, args.burst, args.capacity, 0.0),
+        "distinct": (distinct, args.burst, args.capacity, 0.0),
+        "throttled": (distinct[: args.capacity * 2], args.capacity, throttled, 0.0),
+        "flaky": (distinct, args.capacity, args.capacity, args.error_rate),
+    }
+
+
+async def _run_mode(
+    stub: StubGeminiServer, mode: str, args: argparse.Namespace
+) -> list[dict]:
+    from app.core.config import settings
+    from app.main import app
+    from app.services import rag_service
+
+    rows = []
+    with ExitStack() as stack:
+        for name, value in MODES[mode].items():
+            stack.enter_context(patch.object(settings, name, value))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=120
+        ) as client:
+            for scenario, scenario_args in _scenarios(args).items():
+                messages, concurrency, capacity, error_rate = scenario_args
+                # A fresh service: empty caches and managers built from settings
+                rag_service.RAGService._instance = None
+                await rag_service.RAGService.aget_instance()
+                stub.app.state.capacity = capacity
+                stub.app.state.error_rate = error_rate
+                stub.app.state.stats = Counter()
+                result = await _burst(client, messages, concurrency)
+                stats = stub.app.state.stats
+                rows.append(
+                    {
+                        "mode": mode,
+                        "scenario": scenario,
+                        **result,
+                        "upstream_generate": stats["generateContent"],
+                        "upstream_embed": stats["batchEmbedContents"],
+                        "upstream_rejected": sum(
+                            v for k, v in stats.items() if k.endswith(("_429", "_503"))
+                        ),
+                    }
+                )
+    return rows
+
+
+async def _main(stub: StubGeminiServer, args: argparse.Namespace) -> list[dict]:
+    from app.services import rag_service
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        rag_service.INDEX_PATH = Path(tmp)
+        rag_service.RAGService.build_index()
+        for mode in args.modes.split(","):
+            rows += await _run_mode(stub, mode, args)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=30.0)
+    parser.add_argument("--burst", type=int, default=64, help="requests per burst")
+    parser.add_argument(
+        "--capacity", type=int, default=8, help="slots, and stub quota per action"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--queue", type=int, default=16, help="UPSTREAM_MAX_QUEUE")
+    parser.add_argument("--modes", default="managed,unmanaged")
+    parser.add_argument("--output", type=Path, help="JSON report path")
+    args = parser.parse_args()
+
+    with StubGeminiServer(args.latency_ms, args.embed_latency_ms) as stub:
+        os.environ["GEMINI_BASE_URL"] = stub.base_url
+        os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+        # Slots match the stub's capacity, as they would a real quota
+        os.environ.setdefault("GEMINI_MAX_CONCURRENCY", str(args.capacity))
+        os.environ.setdefault("UPSTREAM_MAX_QUEUE", str(args.queue))
+        os.environ.setdefault("UPSTREAM_RETRY_BASE_DELAY", "0.1")
+        rows = asyncio.run(_main(stub, args))
+
+    print(
+        f"{'mode':<10} {'scenario':<10} {'reqs':>5} {'status':<22} "
+        f"{'ok p50':>7} {'ok p95':>7} {'fail p50':>8} "
+        f"{'gen':>4} {'emb':>4} {'rej':>4} {'secs':>6}",
+        file=sys.stderr,
+    )
+    for r in rows:
+        status = " ".join(f"{k}:{v}" for k, v in r["status"].items())
+        print(
+            f"{r['mode']:<10} {r['scenario']:<10} {r['requests']:>5} {status:<22} "
+            f"{r['ok_p50_ms'] or 0:>7.0f} {r['ok_p95_ms'] or 0:>7.0f} "
+            f"{r['failed_p50_ms'] or 0:>8.0f} {r['upstream_generate']:>4} "
+            f"{r['upstream_embed']:>4} {r['upstream_rejected']:>4} "
+            f"{r['elapsed_s']:>6.2f}",
+            file=sys.stderr,
+        )
+    if args.output:
+        report = {"config": vars(args) | {"output": str(args.output)}, "results": rows}
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
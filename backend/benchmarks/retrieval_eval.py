@@ -0,0 +1,164 @@
+"""
+Portfolio Backend - Retrieval Evaluation Harness
+
+Builds the rag_docs index for every combination of chunker settings and
+index backend, runs the golden question set through RAGService.retrieve_many
+and reports recall@k, MRR, nDCG@k and per-query latency percentiles
+(see app/services/evaluation.py).
+
+Runs offline: the stub backend embeds in process, and other backends reuse
+chunk embeddings cached in faiss_index/embeddings.npz plus query embeddings
+cached in the --query-cache SQLite file after the first run.
+
+Chunker settings are SIZE/OVERLAP/UNIT, e.g. 500/50/chars or 128/16/tokens.
+Stub similarities are not calibrated to the production cutoffs, so compare
+stub runs with --no-cutoffs (pure top-k ranking).
+
+Usage (from backend/):
+    python -m benchmarks.retrieval_eval --no-cutoffs --output eval.json
+    python -m benchmarks.retrieval_eval --backend gemini --query-cache q.db \\
+        --chunkers 500/50/chars,300/30/chars --index-types flat,hnsw
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+GOLDEN_SET = Path(__file__).parent / "golden_questions.jsonl"
+
+
+def _chunker(spec: str) -> dict:
+    size, overlap, unit = spec.split("/")
+    return {"chunk_size": int(size), "chunk_overlap": int(overlap), "length_unit": unit}
+
+
+def _run_config(provider, golden, chunker: dict, index_type: str, k: int) -> dict:
+    """Build (reusing stored embeddings) and evaluate one configuration."""
+    from app.core.config import settings
+    from app.services import rag_service
+    from app.services.evaluation import evaluate
+    from app.services.index_store import current_artifact, read_manifest
+
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch.multiple(
+                rag_service,
+                CHUNK_SIZE=chunker["chunk_size"],
+                CHUNK_OVERLAP=chunker["chunk_overlap"],
+                CHUNK_LENGTH_UNIT=chunker["length_unit"],
+                embedding_provider=lambda backend=None: provider,
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                rag_service.RAGService,
+                "CHUNKER",
+                {**chunker, "splitter": "markdown"},
+            )
+        )
+        stack.enter_context(patch.object(settings, "index_type", index_type))
+        rag_service.RAGService.build_index(provider)
+        service = rag_service.RAGService()
+        result = asyncio.run(evaluate(service, golden, k))
+
+    manifest = read_manifest(current_artifact(rag_service.INDEX_PATH))
+    return {
+        "chunker": "{chunk_size}/{chunk_overlap}/{length_unit}".format(**chunker),
+        # Small corpora fall back to simpler indexes (see app/services/ann.py)
+        "index_type": manifest["index_config"]["type"],
+        "chunks": len(service.snapshot.documents),
+        **result,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--golden", type=Path, default=GOLDEN_SET)
+    parser.add_argument("--backend", default="stub", help="gemini, local or stub")
+    parser.add_argument("--chunkers", default="500/50/chars,200/20/chars,64/8/tokens")
+    parser.add_argument("--index-types", default="flat,hnsw")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument(
+        "--no-cutoffs",
+        action="store_true",
+        help="disable the similarity cutoff and margin (pure top-k ranking)",
+    )
+    parser.add_argument("--query-cache", type=Path, help="SQLite query embeddings")
+    parser.add_argument("--output", type=Path, help="JSON report path")
+    parser.add_argument("--per-question", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+    os.environ["EMBEDDING_BACKEND"] = args.backend
+    os.environ["INDEX_RUNTIME_BUILD"] = "true"
+    if args.query_cache:
+        os.environ["QUERY_CACHE_SHARED_PATH"] = str(args.query_cache)
+    if args.no_cutoffs:
+        os.environ["RETRIEVAL_MIN_SIMILARITY"] = "-1"
+        os.environ["RETRIEVAL_RELATIVE_MARGIN"] = "2"
+    from app.services import rag_service
+    from app.services.embedding_backends import embedding_provider
+    from app.services.embeddings import EmbeddingStore
+    from app.services.evaluation import load_golden_set
+
+    golden = load_golden_set(args.golden)
+    provider = embedding_provider(args.backend)
+    cached_store = rag_service.INDEX_PATH / EmbeddingStore.FILENAME
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Builds share one store, so each chunk text is embedded at most once
+        rag_service.INDEX_PATH = Path(tmp)
+        if cached_store.exists():
+            shutil.copy(cached_store, Path(tmp) / EmbeddingStore.FILENAME)
+        for spec in args.chunkers.split(","):
+            for index_type in args.index_types.split(","):
+                rows.append(
+                    _run_config(provider, golden, _chunker(spec), index_type, args.k)
+                )
+
+    k = args.k
+    print(
+        f"{len(golden)} questions, backend={args.backend}, k={k}, "
+        f"cutoffs={'off' if args.no_cutoffs else 'on'}",
+        file=sys.stderr,
+    )
+    print(
+        f"{'chunker':<16} {'index':<9} {'chunks':>6} {f'R@{k}':>6} {'MRR':>6} "
+        f"{f'nDCG@{k}':>7} {'p50 ms':>7} {'p99 ms':>7} {'batch q/s':>10}",
+        file=sys.stderr,
+    )
+    for r in rows:
+        print(
+            f"{r['chunker']:<16} {r['index_type']:<9} {r['chunks']:>6} "
+            f"{r[f'recall@{k}']:>6.3f} {r['mrr']:>6.3f} {r[f'ndcg@{k}']:>7.3f} "
+            f"{r['p50_ms']:>7.2f} {r['p99_ms']:>7.2f} "
+            f"{r['batch_queries_per_s']:>10.1f}",
+            file=sys.stderr,
+        )
+        if args.per_question:
+            for q in r["per_question"]:
+                if q["recall"] < 1:
+                    print(
+                        f"    missed: {q['question']} -> {q['retrieved']}",
+                        file=sys.stderr,
+                    )
+
+    report = {
+        "backend": args.backend,
+        "golden_set": str(args.golden),
+        "cutoffs": not args.no_cutoffs,
+        "results": rows,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
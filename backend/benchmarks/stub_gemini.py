@@ -0,0 +1,222 @@
+"""
+Portfolio Backend - Stub Gemini Server
+
+Local stand-in for the Gemini REST API used by benchmarks.
+Embeddings are deterministic bag-of-words hashes so retrieval stays meaningful.
+
+Overload can be injected: beyond `capacity` concurrent requests per action
+(embed, generate, ...) the stub answers 429 with Retry-After, like a
+per-model quota, and `error_rate` of requests fail with 503.
+Both live on `app.state` so a running server can be reconfigured, and
+`app.state.stats` counts requests and rejections per action.
+"""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import uvicorn
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DIMENSION = 256
+STUB_ANSWER = "Yuka has hands-on experience with Python, FastAPI and Google Cloud."
+
+
+def fake_embedding(text: str, dimension: int = DIMENSION) -> list[float]:
+    """Same vectors as the app's offline stub backend."""
+    from app.services.embedding_backends import stub_embedding
+
+    return stub_embedding(text, dimension)
+
+
+class FakeEmbeddingClient:
+    """
+    In-process stand-in for `genai.Client` covering `models.embed_content`.
+
+    Each call sleeps `latency_ms` regardless of batch size, like a network
+    round trip, and counts requests so benchmarks can report API usage.
+    """
+
+    def __init__(self, latency_ms: float = 50.0) -> None:
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.models = SimpleNamespace(embed_content=self._embed_content)
+
+    def _embed_content(self, *, model: str, contents, config=None):
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000)
+        texts = [contents] if isinstance(contents, str) else contents
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=fake_embedding(t)) for t in texts]
+        )
+
+
+class FakeGeminiClient(FakeEmbeddingClient):
+    """
+    In-process stand-in for `genai.Client` that also generates.
+
+    `models.generate_content` sleeps `generate_latency_ms` and returns the
+    stub answer with usage metadata; `generate_content_stream` spreads the
+    same delay over one chunk per word.
+    """
+
+    def __init__(
+        self, embed_latency_ms: float = 30.0, generate_latency_ms: float = 200.0
+    ) -> None:
+        super().__init__(embed_latency_ms)
+        self.generate_latency_ms = generate_latency_ms
+        self.models.generate_content = self._generate_content
+        self.models.generate_content_stream = self._generate_content_stream
+
+    @staticmethod
+    def _usage(contents) -> SimpleNamespace:
+        prompt = sum(len(p.text.split()) for c in contents for p in c.parts)
+        return SimpleNamespace(
+            prompt_token_count=prompt,
+            candidates_token_count=len(STUB_ANSWER.split()),
+        )
+
+    def _generate_content(self, *, model: str, contents, config=None):
+        time.sleep(self.generate_latency_ms / 1000)
+        return SimpleNamespace(text=STUB_ANSWER, usage_metadata=self._usage(contents))
+
+    def _generate_content_stream(self, *, model: str, contents, config=None):
+        words = STUB_ANSWER.split(" ")
+        for i, word in enumerate(words):
+            time.sleep(self.generate_latency_ms / 1000 / len(words))
+            yield SimpleNamespace(
+                text=word if i == 0 else " " + word,
+                usage_metadata=self._usage(contents) if i == len(words) - 1 else None,
+            )
+
+
+async def _stream_answer(latency_ms: float):
+    """Spread the stub answer over several SSE chunks within the latency."""
+    words = STUB_ANSWER.split(" ")
+    for i, word in enumerate(words):
+        await asyncio.sleep(latency_ms / 1000 / len(words))
+        chunk = {
+            "candidates": [
+                {
+                    "content": {
+                        "role": "model",
+                        "parts": [{"text": word if i == 0 else " " + word}],
+                    }
+                }
+            ]
+        }
+        yield f"data: {json.dumps(chunk)}\r\n\r\n"
+
+
+def _error(status: int, retry_after: str = "") -> JSONResponse:
+    headers = {"Retry-After": retry_after} if retry_after else None
+    body = {"error": {"code": status, "message": "stub overload", "status": ""}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def create_app(
+    latency_ms: float = 200.0,
+    embed_latency_ms: float = 30.0,
+    capacity: int = 0,
+    error_rate: float = 0.0,
+) -> FastAPI:
+    """
+    Create a stub app that answers embed and generate calls after a delay.
+
+    `capacity` 0 admits any number of concurrent requests per action.
+    """
+    app = FastAPI()
+    app.state.capacity = capacity
+    app.state.error_rate = error_rate
+    app.state.stats = Counter()
+    in_flight: Counter = Counter()
+
+    @app.post("/{version}/models/{target}")
+    async def models(version: str, target: str, request: Request):
+        body = await request.json()
+        _, _, action = target.partition(":")
+        stats = app.state.stats
+        stats[action] += 1
+        if app.state.capacity and in_flight[action] >= app.state.capacity:
+            stats[f"{action}_429"] += 1
+            return _error(429, retry_after="1")
+        if random.random() < app.state.error_rate:
+            stats[f"{action}_503"] += 1
+            return _error(503)
+        in_flight[action] += 1
+        try:
+            return await _answer(action, body)
+        finally:
+            # Streams are counted until their response starts
+            in_flight[action] -= 1
+
+    async def _answer(action: str, body: dict):
+        if action == "batchEmbedContents":
+            await asyncio.sleep(embed_latency_ms / 1000)
+            texts = [
+                " ".join(part.get("text", "") for part in r["content"]["parts"])
+                for r in body["requests"]
+            ]
+            return {"embeddings": [{"values": fake_embedding(t)} for t in texts]}
+
+        if action == "streamGenerateContent":
+            return StreamingResponse(
+                _stream_answer(latency_ms), media_type="text/event-stream"
+            )
+
+        await asyncio.sleep(latency_ms / 1000)
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": STUB_ANSWER}]},
+                    "finishReason": "STOP",
+                }
+            ]
+        }
+
+    return app
+
+
+class StubGeminiServer:
+    """Run the stub app with uvicorn on a background thread."""
+
+    def __init__(
+        self,
+        latency_ms: float = 200.0,
+        embed_latency_ms: float = 30.0,
+        capacity: int = 0,
+        error_rate: float = 0.0,
+    ):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.app = create_app(latency_ms, embed_latency_ms, capacity, error_rate)
+        config = uvicorn.Config(
+            self.app,
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "StubGeminiServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.should_exit = True
+        self._thread.join()
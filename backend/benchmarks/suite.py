@@ -0,0 +1,399 @@
+"""
+Portfolio Backend - End-to-End Benchmark Suite
+
+Runs offline against in-process fake Gemini backends with configurable
+latency and writes one JSON report, so runs can be compared for regressions:
+
+    splitter     TextSplitter / MarkdownSplitter throughput
+    build_index  full and incremental RAGService.build_index time
+    search       FAISS single-query latency across corpus sizes
+    chat         /api/chat requests/sec and tail latency through the ASGI
+                 app, with server-side stage quantiles from app.core.metrics
+
+Usage (from backend/):
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --quick --output new.json --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+from unittest.mock import patch
+
+import numpy as np
+
+from benchmarks.corpus import TOPICS, synthetic_markdown, write_corpus
+from benchmarks.stub_gemini import DIMENSION, FakeGeminiClient
+
+SECTIONS = ("splitter", "build_index", "search", "chat")
+QUESTION_TEMPLATES = (
+    "What has Yuka built with {}?",
+    "How much {} experience does she have?",
+    "Which projects used {}?",
+    "Has she shipped {} to production?",
+)
+
+# Fields identifying a result row, matched between a run and its baseline
+ROW_KEYS = {
+    "splitter": ("splitter", "megabytes"),
+    "build_index": ("build",),
+    "search": ("index_type", "vectors"),
+    "chat": ("concurrency",),
+}
+# Metric suffixes compared against a baseline, and whether higher is better
+HIGHER_IS_BETTER = ("_per_s", "rps")
+LOWER_IS_BETTER = ("_ms", "_s", "errors")
+
+
+def _ms_percentiles(seconds: list[float]) -> dict[str, float]:
+    values = np.array(seconds) * 1000
+    return {
+        f"p{pct}_ms": round(float(np.percentile(values, pct)), 3)
+        for pct in (50, 95, 99)
+    }
+
+
+def bench_splitter(megabytes: list[float]) -> list[dict]:
+    """Split synthetic markdown with each splitter configuration."""
+    from app.services.chunking import MarkdownSplitter, TextSplitter
+
+    section = synthetic_markdown(200)
+    splitters: dict[str, Callable[[], TextSplitter]] = {
+        "text/chars": lambda: TextSplitter(500, 50),
+        "text/tokens": lambda: TextSplitter(125, 12, length_unit="tokens"),
+        "markdown": lambda: MarkdownSplitter(500, 50),
+    }
+    rows = []
+    for size in megabytes:
+        text = section * max(1, int(size * 2**20 / len(section)))
+        size_mb = len(text) / 2**20
+        for name, make in splitters.items():
+            start = time.perf_counter()
+            chunks = make().split(text, "bench.md")
+            seconds = time.perf_counter() - start
+            rows.append(
+                {
+                    "splitter": name,
+                    "megabytes": round(size_mb, 2),
+                    "chunks": len(chunks),
+                    "seconds_s": round(seconds, 4),
+                    "mb_per_s": round(size_mb / seconds, 2),
+                }
+            )
+    return rows
+
+
+def bench_build_index(
+    files: int, sections: int, client: FakeGeminiClient
+) -> list[dict]:
+    """Full build of a synthetic corpus, then an incremental update."""
+    from app.services import rag_service
+    from app.services.embedding_backends import GeminiEmbeddingProvider
+
+    provider = GeminiEmbeddingProvider(client)
+    write_corpus(rag_service.RAG_DOCS_PATH, files, sections)
+    chunks = len(rag_service.RAGService._load_documents())
+
+    def timed(name: str, build: Callable[[], object]) -> dict:
+        calls = client.calls
+        start = time.perf_counter()
+        build()
+        seconds = time.perf_counter() - start
+        return {
+            "build": name,
+            "chunks": chunks,
+            "embed_requests": client.calls - calls,
+            "seconds_s": round(seconds, 3),
+            "chunks_per_s": round(chunks / seconds, 1),
+        }
+
+    rows = [timed("full", lambda: rag_service.RAGService.build_index(provider))]
+    # Touch 5% of the files, then apply only those changes
+    for md_file in sorted(rag_service.RAG_DOCS_PATH.glob("*.md"))[
+        : max(1, files // 20)
+    ]:
+        with md_file.open("a", encoding="utf-8") as f:
+            f.write("\n## Update\n\nAdded a new certification this year.\n")
+    rows.append(
+        timed("incremental", lambda: rag_service.RAGService.update_index(provider))
+    )
+    return rows
+
+
+def bench_search(
+    sizes: list[int], index_types: list[str], queries: int, k: int
+) -> list[dict]:
+    """Single-query search latency over clustered unit vectors."""
+    import faiss
+
+    from app.core.config import settings
+    from app.services.ann import build_ann_index, configure_search
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for size in sizes:
+        centers = rng.normal(size=(max(size // 100, 1), DIMENSION))
+        labels = rng.integers(0, len(centers), size=size + queries)
+        vectors = centers[labels] + rng.normal(
+            scale=0.35, size=(len(labels), DIMENSION)
+        )
+        vectors = vectors.astype(np.float32)
+        faiss.normalize_L2(vectors)
+        corpus, probes = vectors[:size], vectors[size:]
+        for index_type in index_types:
+            config = settings.model_copy(update={"index_type": index_type})
+            start = time.perf_counter()
+            index, resolved = build_ann_index(
+                corpus, metric=faiss.METRIC_INNER_PRODUCT, config=config
+            )
+            build_seconds = time.perf_counter() - start
+            configure_search(index, config)
+            latencies = []
+            for probe in probes:
+                start = time.perf_counter()
+                index.search(probe.reshape(1, -1), k)
+                latencies.append(time.perf_counter() - start)
+            rows.append(
+                {
+                    "index_type": resolved["type"],
+                    "vectors": size,
+                    "build_s": round(build_seconds, 3),
+                    **_ms_percentiles(latencies),
+                }
+            )
+    return rows
+
+
+async def _chat_level(client, questions: list[str], concurrency: int, total: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/chat", json={"message": questions[i % len(questions)]}
+            )
+            if response.status_code != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 2),
+        **_ms_percentiles(latencies),
+    }
+
+
+def bench_chat(
+    client: FakeGeminiClient, concurrency: list[int], requests: int
+) -> tuple[list[dict], dict]:
+    """Concurrent /api/chat load against the index built by bench_build_index."""
+    import httpx
+
+    from app.core import logging as app_logging
+    from app.core.metrics import STAGE_SECONDS
+    from app.main import app
+    from app.services import rag_service
+    from app.services.embedding_backends import GeminiEmbeddingProvider
+
+    provider = GeminiEmbeddingProvider(client)
+    with patch.object(rag_service, "embedding_provider", lambda backend=None: provider):
+        service = rag_service.RAGService()
+    service.gemini.client = client
+    rag_service.RAGService._instance = service
+    # Distinct questions, so query embeddings are not all served from cache
+    questions = [t.format(topic) for topic in TOPICS for t in QUESTION_TEMPLATES]
+
+    async def run() -> list[dict]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=120
+        ) as http:
+            # Warm-up outside the timed levels (first-request and import costs)
+            await http.post("/api/chat", json={"message": "Warm-up question"})
+            return [
+                await _chat_level(http, questions, c, max(requests, c * 4))
+                for c in concurrency
+            ]
+
+    devnull = open(os.devnull, "w")
+    with (
+        contextlib.closing(devnull),
+        patch.object(app_logging._writer, "stream", devnull),
+    ):
+        rows = asyncio.run(run())
+        app_logging._writer.stop()
+    # Bucketed estimates from the in-process stage histograms
+    stages = {
+        stage: {
+            f"p{int(q * 100)}_ms": round(STAGE_SECONDS.quantile(q, stage) * 1000, 3)
+            for q in (0.5, 0.99)
+        }
+        for (stage,) in sorted(STAGE_SECONDS._series)
+    }
+    return rows, stages
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _row_key(section: str, row: dict) -> tuple:
+    return (section, *(row.get(key) for key in ROW_KEYS[section]))
+
+
+def _direction(metric: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if not compared."""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """
+    Describe metrics that got worse than the baseline.
+
+    Timings and throughput regress beyond the relative tolerance; error
+    counts regress on any increase.
+    """
+    previous = {
+        _row_key(section, row): row
+        for section, rows in baseline["results"].items()
+        if section in ROW_KEYS
+        for row in rows
+    }
+    regressions = []
+    for section, rows in current["results"].items():
+        if section not in ROW_KEYS:
+            continue
+        for row in rows:
+            old = previous.get(_row_key(section, row))
+            if old is None:
+                continue
+            labels = ", ".join(f"{k}={row.get(k)}" for k in ROW_KEYS[section])
+            for metric, value in row.items():
+                direction = _direction(metric)
+                before = old.get(metric)
+                if not direction or before is None:
+                    continue
+                if metric == "errors":
+                    worse = value > before
+                else:
+                    change = (value - before) / before * direction if before else 0
+                    worse = change < -tolerance
+                if worse:
+                    regressions.append(
+                        f"{section} [{labels}] {metric}: {before} -> {value}"
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sections", default=",".join(SECTIONS))
+    parser.add_argument("--quick", action="store_true", help="small sizes, for CI")
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[1.0, 4.0])
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--doc-sections", type=int, default=20)
+    parser.add_argument("--vectors", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--index-types", default="flat,hnsw,ivf_flat")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--embed-latency-ms", type=float, default=30.0)
+    parser.add_argument("--generate-latency-ms", type=float, default=200.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--output", type=Path, help="JSON report path")
+    parser.add_argument("--baseline", type=Path, help="report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    if args.quick:
+        args.megabytes, args.files, args.doc_sections = [0.5], 8, 10
+        args.vectors, args.queries = [1000, 10000], 200
+        args.concurrency, args.requests = [1, 8], 16
+    sections = args.sections.split(",")
+
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+    # Offline and reproducible: no warm-up, runtime builds into a temp dir
+    os.environ["EMBEDDING_BACKEND"] = "gemini"
+    os.environ["INDEX_RUNTIME_BUILD"] = "true"
+    from app.services import rag_service
+
+    client = FakeGeminiClient(args.embed_latency_ms, args.generate_latency_ms)
+    results: dict = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        rag_service.RAG_DOCS_PATH = Path(tmp) / "rag_docs"
+        rag_service.INDEX_PATH = Path(tmp) / "faiss_index"
+        if "splitter" in sections:
+            results["splitter"] = bench_splitter(args.megabytes)
+        if "build_index" in sections or "chat" in sections:
+            builds = bench_build_index(args.files, args.doc_sections, client)
+            if "build_index" in sections:
+                results["build_index"] = builds
+        if "search" in sections:
+            results["search"] = bench_search(
+                args.vectors, args.index_types.split(","), args.queries, args.k
+            )
+        if "chat" in sections:
+            results["chat"], results["chat_stages"] = bench_chat(
+                client, args.concurrency, args.requests
+            )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {
+                k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()
+            },
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(baseline, report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
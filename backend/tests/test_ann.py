@@ -0,0 +1,56 @@
+"""Tests for ANN index backends."""
+
+import numpy as np
+import pytest
+
+from app.core.config import Settings
+from app.services.ann import (
+    INDEX_TYPES,
+    MIN_POINTS_PER_CENTROID,
+    build_ann_index,
+    index_config,
+)
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_backends_find_exact_matches(index_type):
+    """Every backend should return a corpus vector as its own nearest neighbor."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 32)).astype(np.float32)
+    config = Settings(index_type=index_type, index_nlist=16, index_nprobe=16)
+
+    index, resolved = build_ann_index(vectors, config=config)
+    _, ids = index.search(vectors[:20], 1)
+
+    assert resolved["type"] == index_type
+    assert index.ntotal == 2000
+    assert (ids[:, 0] == np.arange(20)).mean() >= 0.9
+
+
+def test_small_corpus_parameters_are_clamped():
+    """Training parameters should shrink to what a tiny corpus supports."""
+    config = Settings(index_type="ivf_pq", index_nlist=100, index_pq_m=64)
+
+    resolved = index_config(count=400, dimension=48, config=config)
+
+    assert resolved == {"type": "ivf_pq", "nlist": 10, "pq_m": 48, "pq_bits": 3}
+    assert index_config(50, 48, config) == {"type": "flat"}
+
+
+def test_mid_size_corpus_trains_pq_with_enough_points():
+    """PQ codebooks should get MIN_POINTS_PER_CENTROID points per centroid."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(3000, 32)).astype(np.float32)
+    config = Settings(index_type="ivf_pq", index_nlist=16, index_nprobe=16)
+
+    index, resolved = build_ann_index(vectors, config=config)
+    _, ids = index.search(vectors[:20], 1)
+
+    assert resolved["pq_bits"] == 6
+    assert 2 ** resolved["pq_bits"] * MIN_POINTS_PER_CENTROID <= 3000
+    assert (ids[:, 0] == np.arange(20)).mean() >= 0.9
+
+
+def test_unknown_index_type_is_rejected():
+    with pytest.raises(ValueError):
+        index_config(10, 8, Settings(index_type="annoy"))
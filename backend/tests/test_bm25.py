@@ -0,0 +1,46 @@
+"""Tests for the BM25 keyword index."""
+
+import numpy as np
+
+from app.services.bm25 import BM25Index, tokenize
+
+TEXTS = [
+    "Backend: Python, FastAPI and PostgreSQL",
+    "Infrastructure as code with Terraform on AWS",
+    "Frontend work in React, Next.js and TypeScript",
+]
+
+
+def test_tokenize_keeps_tech_names_and_drops_stopwords():
+    assert tokenize("Does she know C++, C# or Next.js?") == ["c++", "c#", "next.js"]
+
+
+def test_exact_term_ranks_matching_chunk_first():
+    """A rare exact term should find its chunk with a strong normalized score."""
+    index = BM25Index.build(TEXTS)
+
+    ids, scores = index.search("Terraform?", k=3)
+
+    assert ids.tolist() == [1]
+    assert scores[0] >= 1.0
+
+
+def test_unknown_terms_match_nothing():
+    ids, scores = BM25Index.build(TEXTS).search("What is her salary?", k=3)
+
+    assert len(ids) == 0 and len(scores) == 0
+
+
+def test_save_and_load_memory_mapped(tmp_path):
+    """A saved index should reload memory-mapped with identical results."""
+    built = BM25Index.build(TEXTS)
+    built.save(tmp_path)
+
+    loaded = BM25Index.load(tmp_path)
+
+    assert isinstance(loaded.doc_ids, np.memmap)
+    for query in ("fastapi postgresql", "react typescript"):
+        expected, loaded_result = built.search(query, 3), loaded.search(query, 3)
+        assert expected[0].tolist() == loaded_result[0].tolist()
+        assert np.allclose(expected[1], loaded_result[1])
+    assert BM25Index.load(tmp_path / "missing") is None
@@ -0,0 +1,111 @@
+"""Tests for in-process caches."""
+
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+
+from app.services.cache import SemanticResponseCache, SqliteCache, TTLCache
+from app.services.rag_service import RAGService
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    """Test LRU eviction, TTL expiry and counters."""
+
+    def test_hit_and_miss_counters(self):
+        cache: TTLCache[int] = TTLCache(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 1}
+
+    def test_least_recently_used_is_evicted(self):
+        cache: TTLCache[int] = TTLCache(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache: TTLCache[int] = TTLCache(max_size=2, ttl_seconds=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 11
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestSemanticResponseCache:
+    """Test similarity matching and context keying."""
+
+    def _cache(self) -> SemanticResponseCache:
+        return SemanticResponseCache(max_size=8, ttl_seconds=60, similarity=0.95)
+
+    def test_similar_query_with_same_chunks_hits(self):
+        cache = self._cache()
+        cache.set(np.array([1.0, 0.0]), (1, 2), "", "answer")
+
+        assert cache.get(np.array([0.99, 0.05]), (1, 2), "") == "answer"
+
+    def test_dissimilar_query_misses(self):
+        cache = self._cache()
+        cache.set(np.array([1.0, 0.0]), (1, 2), "", "answer")
+
+        assert cache.get(np.array([0.0, 1.0]), (1, 2), "") is None
+
+    def test_different_chunks_or_history_miss(self):
+        cache = self._cache()
+        cache.set(np.array([1.0, 0.0]), (1, 2), "", "answer")
+
+        assert cache.get(np.array([1.0, 0.0]), (1, 3), "") is None
+        assert cache.get(np.array([1.0, 0.0]), (1, 2), "history") is None
+
+    def test_exact_entries_match_query_and_context(self):
+        cache = self._cache()
+        cache.set_exact("model:terraform?", (1,), "", "answer")
+
+        assert cache.get_exact("model:terraform?", (1,), "") == "answer"
+        assert cache.get_exact("model:aws?", (1,), "") is None
+        assert cache.get_exact("model:terraform?", (2,), "") is None
+        assert cache.stats()["size"] == 1
+
+    def test_clear_invalidates(self):
+        cache = self._cache()
+        cache.set(np.array([1.0, 0.0]), (1,), "", "answer")
+        cache.clear()
+
+        assert cache.get(np.array([1.0, 0.0]), (1,), "") is None
+
+
+def test_sqlite_cache_round_trip(tmp_path):
+    """Shared cache should persist bytes across instances."""
+    SqliteCache(tmp_path / "cache.db", ttl_seconds=60).set("k", b"value")
+
+    assert SqliteCache(tmp_path / "cache.db", ttl_seconds=60).get("k") == b"value"
+
+
+async def test_query_embedding_is_cached_on_normalized_query():
+    """Repeated queries differing only in case/spacing should embed once."""
+    with patch.object(RAGService, "_load_index"):
+        service = RAGService()
+    service._embed_query = AsyncMock(return_value=np.ones((1, 4), dtype=np.float32))
+
+    _, first = await service._cached_embed_query("What is her stack?")
+    _, second = await service._cached_embed_query("  what is HER   stack? ")
+
+    assert first is None
+    assert second == "memory"
+    service._embed_query.assert_awaited_once()
@@ -24,7 +24,15 @@ def test_chat_endpoint_accepts_valid_request(client):
     # Mock the RAGService.get_instance() to avoid real API calls
     mock_response = {
         "response": "I have experience in full-stack development.",
-        "sources": [],
+        "sources": [
+            {
+                "document": "skills.md",
+                "relevance_score": 0.9,
+                "excerpt": "Python and FastAPI.",
+                "section": "Skills > Languages",
+                "anchor": "languages",
+            }
+        ],
         "confidence": 0.85,
         "has_sufficient_context": True,
     }
@@ -48,6 +56,8 @@ def test_chat_endpoint_accepts_valid_request(client):
         assert "confidence" in data
         assert "conversation_id" in data
         assert data["response"] == "I have experience in full-stack development."
+        assert data["sources"][0]["section"] == "Skills > Languages"
+        assert data["sources"][0]["anchor"] == "languages"
 
 
 def test_chat_request_validation(client):
@@ -71,3 +81,69 @@ def test_chat_request_validation(client):
         assert response.status_code == 422, (
             f"Request {invalid_request} should return 422, got {response.status_code}"
         )
+
+
+def test_chat_stream_emits_sources_tokens_and_done(client):
+    """Streaming endpoint should send sources first, then tokens, then done."""
+
+    async def mock_stream(*args, **kwargs):
+        yield {
+            "event": "sources",
+            "sources": [
+                {"document": "skills.md", "relevance_score": 0.9, "excerpt": "Python"}
+            ],
+        }
+        yield {"event": "token", "text": "Python "}
+        yield {"event": "token", "text": "and FastAPI."}
+        yield {"event": "done", "confidence": 0.9, "has_sufficient_context": True}
+
+    with patch("app.services.rag_service.RAGService.get_instance") as mock_get_instance:
+        mock_instance = MagicMock()
+        mock_instance.stream_response = mock_stream
+        mock_get_instance.return_value = mock_instance
+
+        response = client.post("/api/chat/stream", json={"message": "Python?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        line.removeprefix("event: ")
+        for line in response.text.splitlines()
+        if line.startswith("event: ")
+    ]
+    assert events == ["sources", "token", "token", "done"]
+    assert '"has_sufficient_context": true' in response.text
+
+
+def test_chat_stream_requires_message(client):
+    """Streaming endpoint should reject empty messages."""
+    response = client.post("/api/chat/stream", json={"message": "  "})
+
+    assert response.status_code == 400
+
+
+def test_oversized_requests_are_rejected(client):
+    """Messages and histories beyond the configured limits should get 422."""
+    with patch("app.services.rag_service.RAGService.get_instance") as mock_get_instance:
+        long_message = client.post(
+            "/api/chat", json={"message": "x" * 2001, "history": []}
+        )
+        long_history = client.post(
+            "/api/chat",
+            json={
+                "message": "hi",
+                "history": [{"role": "user", "content": "x" * 30000}] * 2,
+            },
+        )
+        many_messages = client.post(
+            "/api/chat",
+            json={
+                "message": "hi",
+                "history": [{"role": "user", "content": "hi"}] * 51,
+            },
+        )
+
+    assert long_message.status_code == 422
+    assert long_history.status_code == 422
+    assert many_messages.status_code == 422
+    mock_get_instance.assert_not_called()
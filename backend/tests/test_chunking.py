@@ -0,0 +1,112 @@
+"""Tests for text chunking."""
+
+import pytest
+
+from app.services.chunking import MarkdownSplitter, TextSplitter
+
+
+def synthetic_markdown(sections: int) -> str:
+    return "\n\n".join(
+        f"## Section {i}\n\n- Built APIs with FastAPI and Python.\n"
+        f"- Shipped features. Wrote tests for every release {i}.\n\n"
+        + " ".join(f"sentence{j} about work." for j in range(i % 7 + 3))
+        for i in range(sections)
+    )
+
+
+@pytest.mark.parametrize("length_unit", ["chars", "tokens"])
+def test_chunks_fit_size_including_overlap(length_unit):
+    """No chunk may exceed chunk_size, overlap included."""
+    text = synthetic_markdown(sections=40)
+    splitter = TextSplitter(chunk_size=120, chunk_overlap=20, length_unit=length_unit)
+
+    chunks = splitter.split(text, source="doc.md")
+
+    assert len(chunks) > 10
+    for chunk in chunks:
+        if length_unit == "chars":
+            assert len(chunk.content) <= 120
+        else:
+            assert len(chunk.content.split()) <= 120
+
+
+def test_offsets_point_into_source_text():
+    """Each chunk should record its exact span in the source file."""
+    text = synthetic_markdown(sections=10)
+
+    chunks = TextSplitter(chunk_size=200, chunk_overlap=30).split(text, "doc.md")
+
+    for chunk in chunks:
+        assert text[chunk.start : chunk.end] == chunk.content
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(text.rstrip())
+
+
+def test_overlap_repeats_tail_of_previous_chunk():
+    """Consecutive chunks should overlap but still cover the text in order."""
+    text = " ".join(f"word{i}" for i in range(200))
+
+    chunks = TextSplitter(chunk_size=100, chunk_overlap=25).split(text, "doc.md")
+
+    for prev, cur in zip(chunks, chunks[1:]):
+        assert prev.start < cur.start < prev.end
+        assert prev.end - cur.start <= 25
+
+
+def test_text_without_separators_is_cut_by_size():
+    chunks = TextSplitter(chunk_size=10, chunk_overlap=0).split("x" * 35, "doc.md")
+
+    assert [len(c.content) for c in chunks] == [10, 10, 10, 5]
+
+
+def test_overlap_must_be_smaller_than_size():
+    with pytest.raises(ValueError):
+        TextSplitter(chunk_size=50, chunk_overlap=50)
+
+
+MARKDOWN = """# Profile
+
+## Projects
+Portfolio site with a RAG chatbot.
+
+```python
+# not a heading
+def answer():
+    pass
+```
+
+| Stack | Years |
+|-------|-------|
+| React | 8 |
+
+## Projects
+Second section with a duplicate title.
+"""
+
+
+def test_markdown_chunks_carry_heading_path_and_anchor():
+    chunks = MarkdownSplitter(chunk_size=500, chunk_overlap=50).split(MARKDOWN, "a.md")
+
+    assert [c.heading_path for c in chunks] == [["Profile", "Projects"]] * 2
+    assert [c.anchor for c in chunks] == ["projects", "projects-1"]
+    assert chunks[0].contextual_text().startswith("[Profile > Projects]\n")
+    for chunk in chunks:
+        assert MARKDOWN[chunk.start : chunk.end] == chunk.content
+
+
+def test_markdown_keeps_code_and_tables_whole():
+    """Blocks that fit should never be cut, even when chunks are small."""
+    chunks = MarkdownSplitter(chunk_size=60, chunk_overlap=10).split(MARKDOWN, "a.md")
+    contents = [c.content for c in chunks]
+
+    assert "```python\n# not a heading\ndef answer():\n    pass\n```" in contents
+    assert "| Stack | Years |\n|-------|-------|\n| React | 8 |" in contents
+    assert all(len(c) <= 60 for c in contents)
+
+
+def test_markdown_streams_lines():
+    """Splitting an iterator of lines should match splitting the full text."""
+    splitter = MarkdownSplitter(chunk_size=80, chunk_overlap=10)
+    lines = iter(MARKDOWN.splitlines(keepends=True))
+
+    assert list(splitter.split_lines(lines, "a.md")) == splitter.split(MARKDOWN, "a.md")
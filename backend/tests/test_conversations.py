@@ -0,0 +1,94 @@
+"""Tests for the server-side conversation store."""
+
+from unittest.mock import AsyncMock, patch
+
+from app.services.cache import SqliteCache
+from app.services.conversations import Conversation, ConversationStore
+from app.services.documents import Document
+from app.services.rag_service import RAGService
+
+
+def _store(**overrides) -> ConversationStore:
+    options = {"max_size": 10, "ttl_seconds": 60, "max_bytes": 4096, "max_messages": 10}
+    return ConversationStore(**(options | overrides))
+
+
+def _turns(count: int, size: int = 10) -> list[dict]:
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"{i} " + "x" * size}
+        for i in range(count)
+    ]
+
+
+def test_state_round_trips_with_chunks():
+    """History and the previous turn's chunks should come back intact."""
+    store = _store()
+    doc = Document(content="Python", source="skills.md", start=3, end=9)
+    store.save("c1", Conversation(history=_turns(2), documents=[doc]))
+
+    restored = store.get("c1")
+
+    assert restored.history == _turns(2)
+    assert restored.documents == [doc]
+    assert store.get("unknown") is None
+
+
+def test_oversized_state_drops_oldest_turns():
+    """The byte cap should evict whole turns, oldest first."""
+    store = _store(max_bytes=600)
+    store.save("c1", Conversation(history=_turns(10, size=100)))
+
+    history = store.get("c1").history
+    assert history == _turns(10, size=100)[-len(history) :]
+    assert len(history) % 2 == 0 and history
+
+
+def test_expired_conversations_are_forgotten():
+    """Entries past their TTL should not be returned."""
+    store = _store(ttl_seconds=0)
+    store.save("c1", Conversation(history=_turns(2)))
+
+    assert store.get("c1") is None
+
+
+def test_shared_backend_serves_other_workers(tmp_path):
+    """A second worker should find conversations saved by the first."""
+    path = tmp_path / "conversations.db"
+    first = _store(shared=SqliteCache(path, ttl_seconds=60))
+    second = _store(shared=SqliteCache(path, ttl_seconds=60))
+    first.save("c1", Conversation(history=_turns(2)))
+
+    assert second.get("c1").history == _turns(2)
+
+
+def test_workers_see_turns_saved_by_each_other(tmp_path):
+    """A worker's local copy must not hide later turns saved elsewhere."""
+    path = tmp_path / "conversations.db"
+    first = _store(shared=SqliteCache(path, ttl_seconds=60))
+    second = _store(shared=SqliteCache(path, ttl_seconds=60))
+    first.save("c1", Conversation(history=_turns(2)))
+    assert second.get("c1").history == _turns(2)
+
+    second.save("c1", Conversation(history=_turns(4)))
+
+    assert first.get("c1").history == _turns(4)
+
+
+async def test_follow_up_turn_uses_stored_history():
+    """Clients should only need to send the new message after the first turn."""
+    with (
+        patch.object(RAGService, "_load_index"),
+        patch("app.services.rag_service.settings.conversation_store_enabled", True),
+    ):
+        service = RAGService()
+    service.gemini.generate = AsyncMock(side_effect=["First answer", "Second"])
+
+    await service.generate_response("First question", [], conversation_id="c1")
+    result = await service.generate_response("And then?", [], conversation_id="c1")
+
+    history = service.gemini.generate.await_args.kwargs["history"]
+    assert history == [
+        {"role": "user", "content": "First question"},
+        {"role": "assistant", "content": "First answer"},
+    ]
+    assert result["cache"]["conversation"]["hit"] is True
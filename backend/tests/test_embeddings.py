@@ -0,0 +1,119 @@
+"""Tests for document embedding."""
+
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+import requests
+from google.genai import errors
+
+from app.services.embedding_backends import (
+    GeminiEmbeddingProvider,
+    embedding_provider,
+)
+from app.services.embeddings import EmbeddingStore, embed_documents
+from app.services.upstream import UpstreamOverloaded
+
+
+class FakeClient:
+    """Records embed_content batches and returns length-based vectors."""
+
+    def __init__(self, failures: int = 0, status: int = 429) -> None:
+        self.batches: list[list[str]] = []
+        self.failures = failures
+        self.status = status
+        self.models = SimpleNamespace(embed_content=self.embed_content)
+
+    def embed_content(self, *, model, contents):
+        if self.failures:
+            self.failures -= 1
+            response = requests.Response()
+            response.status_code = self.status
+            response._content = b"{}"
+            raise errors.ClientError(self.status, response)
+        self.batches.append(list(contents))
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=[len(t), 1.0]) for t in contents]
+        )
+
+
+def _provider(client: FakeClient) -> GeminiEmbeddingProvider:
+    return GeminiEmbeddingProvider(client, model="model")
+
+
+@pytest.fixture(autouse=True)
+def fast_retries():
+    with (
+        patch("app.services.embedding_backends.settings.embedding_retry_base_delay", 0),
+        patch("app.services.upstream.settings.upstream_retry_base_delay", 0),
+        patch("app.services.upstream.settings.upstream_max_retries", 2),
+    ):
+        yield
+
+
+def test_embeddings_are_batched():
+    """Texts should be sent in batches rather than one request each."""
+    client = FakeClient()
+    with patch("app.services.embedding_backends.settings.embedding_batch_size", 2):
+        matrix, embedded = embed_documents(
+            _provider(client), ["a", "bb", "ccc", "dddd", "eeeee"], EmbeddingStore()
+        )
+
+    assert embedded == 5
+    assert sorted(len(b) for b in client.batches) == [1, 2, 2]
+    assert matrix[:, 0].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_unchanged_chunks_are_reused(tmp_path):
+    """A rebuild should only embed content missing from the store."""
+    store = EmbeddingStore()
+    embed_documents(_provider(FakeClient()), ["a", "bb"], store)
+    store.save(tmp_path, keep=set(store.vectors))
+
+    client = FakeClient()
+    matrix, embedded = embed_documents(
+        _provider(client), ["a", "bb", "new"], EmbeddingStore.load(tmp_path)
+    )
+
+    assert embedded == 1
+    assert client.batches == [["new"]]
+    assert matrix.shape == (3, 2)
+
+
+def test_rate_limited_batches_are_retried():
+    """429 responses should be retried with backoff."""
+    client = FakeClient(failures=2)
+    matrix, _ = embed_documents(_provider(client), ["a"], EmbeddingStore())
+
+    assert matrix.shape == (1, 2)
+
+
+def test_non_retryable_errors_are_raised():
+    """Client errors other than rate limits should not be retried."""
+    client = FakeClient(failures=1, status=400)
+    with pytest.raises(errors.ClientError):
+        embed_documents(_provider(client), ["a"], EmbeddingStore())
+
+
+async def test_query_embedding_retries_rate_limits_then_gives_up():
+    """The query path retries 429s a bounded number of times, then reports 429."""
+    provider = _provider(FakeClient(failures=1))
+    assert await provider.aembed_query("a") == [1, 1.0]
+
+    provider = _provider(FakeClient(failures=3))
+    with pytest.raises(UpstreamOverloaded) as excinfo:
+        await provider.aembed_query("a")
+    assert excinfo.value.status_code == 429
+
+    provider = _provider(FakeClient(failures=1, status=400))
+    with pytest.raises(errors.ClientError):
+        await provider.aembed_query("a")
+    assert await provider.aembed_query("bb") == [2, 1.0]
+
+
+def test_local_backend_requires_fastembed():
+    """Selecting the local backend without fastembed should explain the fix."""
+    with patch.dict(sys.modules, {"fastembed": None}):
+        with pytest.raises(RuntimeError, match="pip install fastembed"):
+            embedding_provider("local")
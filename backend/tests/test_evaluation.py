@@ -0,0 +1,84 @@
+"""Tests for retrieval evaluation metrics and the golden set harness."""
+
+import json
+import math
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.embedding_backends import StubEmbeddingProvider
+from app.services.evaluation import (
+    GoldenQuestion,
+    evaluate,
+    load_golden_set,
+    ndcg_at_k,
+    recall_at_k,
+    reciprocal_rank,
+)
+from app.services.rag_service import RAGService
+
+
+def test_metrics_count_each_section_once():
+    """Repeated chunks of a section should not inflate recall or nDCG."""
+    relevant = {"a.md#x": 2, "a.md#y": 1}
+    labels = ["a.md#z", "a.md#x", "a.md#x", "a.md#y"]
+
+    assert recall_at_k(labels, relevant, k=3) == 0.5
+    assert recall_at_k(labels, relevant, k=4) == 1.0
+    assert reciprocal_rank(labels, relevant) == 0.5
+    ideal = 3 + 1 / math.log2(3)
+    assert ndcg_at_k(labels, relevant, k=4) == pytest.approx(
+        (3 / math.log2(3) + 1 / math.log2(5)) / ideal
+    )
+    assert ndcg_at_k(["a.md#x", "a.md#y"], relevant, k=2) == pytest.approx(1.0)
+    assert ndcg_at_k([], relevant, k=3) == 0.0
+
+
+def test_golden_set_accepts_label_lists(tmp_path):
+    """Lists of labels should load as grade-1 relevance."""
+    path = tmp_path / "golden.jsonl"
+    path.write_text(
+        json.dumps({"question": "q1", "relevant": ["a.md#x"]})
+        + "\n\n"
+        + json.dumps({"question": "q2", "relevant": {"a.md#y": 2}})
+        + "\n"
+    )
+
+    assert load_golden_set(path) == [
+        GoldenQuestion("q1", {"a.md#x": 1}),
+        GoldenQuestion("q2", {"a.md#y": 2}),
+    ]
+
+
+async def test_evaluate_scores_a_stub_index(tmp_path):
+    """The harness should score a real index built with stub embeddings."""
+    docs = tmp_path / "rag_docs"
+    docs.mkdir()
+    (docs / "skills.md").write_text(
+        "# Skills\n\n## Languages\n\nPython and Java.\n\n"
+        "## Cloud\n\nTerraform on AWS.\n"
+    )
+    provider = StubEmbeddingProvider()
+    golden = [
+        GoldenQuestion("Which languages, Python?", {"skills.md#languages": 2}),
+        GoldenQuestion("Terraform on which cloud?", {"skills.md#cloud": 2}),
+    ]
+    with (
+        patch("app.services.rag_service.RAG_DOCS_PATH", docs),
+        patch("app.services.rag_service.INDEX_PATH", tmp_path / "faiss_index"),
+        patch("app.services.rag_service.embedding_provider", return_value=provider),
+        patch("app.services.rag_service.embedding_model", return_value=provider.model),
+        patch.object(settings, "retrieval_min_similarity", -1.0),
+        patch.object(settings, "retrieval_relative_margin", 2.0),
+    ):
+        result = await evaluate(RAGService(), golden, k=1)
+
+    assert result["recall@1"] == 1.0
+    assert result["mrr"] == 1.0
+    assert result["ndcg@1"] == 1.0
+    assert result["p50_ms"] <= result["p99_ms"]
+    assert [q["retrieved"] for q in result["per_question"]] == [
+        ["skills.md#languages"],
+        ["skills.md#cloud"],
+    ]
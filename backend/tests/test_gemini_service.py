@@ -0,0 +1,44 @@
+"""Tests for Gemini service."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.gemini_service import GeminiService
+
+
+def _slow_response(*args, **kwargs):
+    time.sleep(0.2)
+    response = MagicMock()
+    response.text = "ok"
+    return response
+
+
+@pytest.fixture
+def gemini():
+    """GeminiService with a mocked, blocking SDK client."""
+    service = GeminiService()
+    service.client = MagicMock()
+    service.client.models.generate_content.side_effect = _slow_response
+    return service
+
+
+async def test_generate_does_not_block_event_loop(gemini):
+    """Concurrent generations should overlap instead of running serially."""
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(gemini.generate("system", "context", "query", []) for _ in range(4))
+    )
+    elapsed = time.perf_counter() - start
+
+    assert results == ["ok"] * 4
+    assert elapsed < 0.6
+
+
+async def test_generate_times_out(gemini):
+    """Upstream calls exceeding the configured timeout should raise."""
+    with patch("app.services.gemini_service.settings.gemini_timeout_seconds", 0.05):
+        with pytest.raises(asyncio.TimeoutError):
+            await gemini.generate("system", "context", "query", [])
@@ -1,6 +1,9 @@
 """Tests for health check endpoint."""
 
 import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.warmup import WarmupService
 
 
 def test_health_endpoint(client):
@@ -14,3 +17,34 @@ def test_health_endpoint(client):
     assert data["status"] == "healthy"
     assert "rag_index_loaded" in data
     assert isinstance(data["rag_index_loaded"], bool)
+
+
+def test_ready_endpoint_not_ready_before_warmup(client):
+    """Readiness should report 503 until warm-up has finished."""
+    with patch("app.services.warmup.WarmupService.status", "warming_up"):
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+
+async def test_warmup_loads_index_and_pre_embeds_queries(client):
+    """Warm-up should load the RAG service, pre-embed queries and become ready."""
+    mock_instance = MagicMock()
+    mock_instance.is_loaded.return_value = True
+    mock_instance._cached_embed_query = AsyncMock()
+
+    with (
+        patch("app.services.warmup.WarmupService.status", "pending"),
+        patch(
+            "app.services.rag_service.RAGService.get_instance",
+            return_value=mock_instance,
+        ),
+    ):
+        await WarmupService.run()
+
+        assert WarmupService.is_ready()
+        assert mock_instance._cached_embed_query.await_count == len(
+            WarmupService.queries()
+        )
+        assert client.get("/ready").status_code == 200
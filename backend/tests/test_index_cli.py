@@ -0,0 +1,81 @@
+"""Tests for the offline index CLI and read-only loading."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app import index as cli
+from app.services import rag_service
+from app.services.index_store import CHUNKS_FILE, current_artifact
+from app.services.rag_service import RAGService
+
+
+@pytest.fixture
+def docs(tmp_path):
+    docs = tmp_path / "rag_docs"
+    docs.mkdir()
+    (docs / "skills.md").write_text("# Skills\n\nPython and FastAPI.\n")
+    (docs / "about.md").write_text("# About\n\nDeaf, prefers text.\n")
+    with (
+        patch.object(rag_service, "RAG_DOCS_PATH", docs),
+        patch.object(rag_service, "INDEX_PATH", tmp_path / "faiss_index"),
+        patch.object(rag_service.settings, "embedding_backend", "stub"),
+    ):
+        yield docs
+
+
+def _run(capsys, *argv: str) -> tuple[int, dict]:
+    code = cli.main(list(argv))
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_build_verify_stats_diff(docs, capsys):
+    code, built = _run(capsys, "build")
+    assert code == 0
+    assert built["embedding_model"] == "stub-hashed-bow-256"
+    assert built["files"] == 2
+
+    assert _run(capsys, "verify") == (
+        0,
+        {"ok": True, "version": built["version"], "errors": []},
+    )
+    assert _run(capsys, "stats")[1]["count"] == built["count"]
+
+    (docs / "skills.md").write_text("# Skills\n\nPython, FastAPI, Terraform.\n")
+    _, changes = _run(capsys, "diff")
+    assert changes["changed"] == ["skills.md"]
+
+
+def test_verify_fails_on_corruption(docs, capsys):
+    _run(capsys, "build")
+    with open(current_artifact(rag_service.INDEX_PATH) / CHUNKS_FILE, "ab") as f:
+        f.write(b"tampered")
+
+    code, result = _run(capsys, "verify")
+
+    assert code == 1
+    assert result["errors"] == [f"checksum mismatch: {CHUNKS_FILE}"]
+
+
+def test_builds_are_reproducible(docs, capsys, monkeypatch):
+    """Rebuilding the same docs gives the same content digest."""
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    _, first = _run(capsys, "build", "--full")
+    _, second = _run(capsys, "build", "--full")
+
+    assert first["version"] != second["version"]
+    assert first["content_digest"] == second["content_digest"]
+    assert first["created_at"] == second["created_at"]
+
+
+def test_server_never_builds_without_runtime_builds(docs, capsys):
+    """A read-only server refuses to start without a prebuilt artifact."""
+    with patch.object(rag_service.settings, "index_runtime_build", False):
+        with pytest.raises(RuntimeError, match="python -m app.index build"):
+            RAGService()
+
+        _run(capsys, "build")
+        service = RAGService()
+
+    assert service.is_loaded()
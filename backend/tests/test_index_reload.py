@@ -0,0 +1,165 @@
+"""Tests for incremental index updates and hot reload."""
+
+import asyncio
+import hashlib
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.services.docs_watcher import DocsWatcher
+from app.services.embedding_backends import GeminiEmbeddingProvider
+from app.services.rag_service import RAGService
+
+
+class FakeClient:
+    """Deterministic text-hash embeddings; records every embedded text."""
+
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+        self.models = SimpleNamespace(embed_content=self.embed_content)
+
+    def embed_content(self, *, model, contents):
+        self.texts.extend(contents)
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=self.vector(t)) for t in contents]
+        )
+
+    @staticmethod
+    def vector(text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "big")
+        return np.random.default_rng(seed).normal(size=8).tolist()
+
+
+@pytest.fixture
+def paths(tmp_path):
+    docs = tmp_path / "rag_docs"
+    (docs / "projects").mkdir(parents=True)
+    (docs / "skills.md").write_text("# Skills\n\nPython and FastAPI.\n")
+    (docs / "about.md").write_text("# About\n\nDeaf, prefers text.\n")
+    (docs / "projects" / "portfolio.md").write_text("# Portfolio\n\nRAG chat.\n")
+    client = FakeClient()
+    with (
+        patch("app.services.rag_service.RAG_DOCS_PATH", docs),
+        patch("app.services.rag_service.INDEX_PATH", tmp_path / "faiss_index"),
+        patch(
+            "app.services.rag_service.embedding_provider",
+            return_value=GeminiEmbeddingProvider(client),
+        ),
+    ):
+        yield docs, client
+
+
+def _sources(service: RAGService) -> list[str]:
+    return sorted({doc.source for doc in service.snapshot.documents})
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_reload_applies_only_changed_files(paths, index_type):
+    """Only changed files are re-embedded; the new snapshot is swapped in."""
+    docs, client = paths
+    with patch("app.services.rag_service.settings.index_type", index_type):
+        service = RAGService()
+        before = service.snapshot
+        client.texts.clear()
+
+        (docs / "skills.md").write_text("# Skills\n\nPython, FastAPI, Terraform.\n")
+        (docs / "about.md").unlink()
+        (docs / "contact.md").write_text("# Contact\n\nEmail or LinkedIn.\n")
+        result = service.reload()
+
+    assert result["mode"] == "incremental"
+    assert result["added"] == ["contact.md"]
+    assert result["changed"] == ["skills.md"]
+    assert result["removed"] == ["about.md"]
+    assert result["swapped"]
+    assert len(client.texts) == 2
+    assert _sources(service) == ["contact.md", "projects/portfolio.md", "skills.md"]
+
+    # Vector labels resolve to the right chunks in the new snapshot
+    snapshot = service.snapshot
+    query = np.array([FakeClient.vector(client.texts[0])], dtype=np.float32)
+    query /= np.linalg.norm(query)
+    _, labels = snapshot.index.search(query, 1)
+    row = snapshot.documents.rows(labels[0])[0]
+    assert snapshot.documents[row].contextual_text() == client.texts[0]
+
+    # A request that started before the swap still sees the old version
+    assert "about.md" in {doc.source for doc in before.documents}
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_reload_after_only_removing_files(paths, index_type):
+    """Deleting a file should drop its chunks without embedding anything."""
+    docs, client = paths
+    with patch("app.services.rag_service.settings.index_type", index_type):
+        service = RAGService()
+        client.texts.clear()
+
+        (docs / "about.md").unlink()
+        result = service.reload()
+
+    assert result["removed"] == ["about.md"]
+    assert result["swapped"]
+    assert client.texts == []
+    assert _sources(service) == ["projects/portfolio.md", "skills.md"]
+    assert service.snapshot.index.ntotal == len(service.snapshot.documents)
+
+
+def test_reload_without_changes_is_a_no_op(paths):
+    _, client = paths
+    service = RAGService()
+    version = service.snapshot.version
+    client.texts.clear()
+
+    result = service.reload()
+
+    assert not (result["added"] or result["changed"] or result["removed"])
+    assert not result["swapped"]
+    assert service.snapshot.version == version
+    assert client.texts == []
+
+
+def test_watcher_signature_skips_vanished_files(paths):
+    docs, _ = paths
+    files = RAGService._markdown_files()
+    (docs / "about.md").unlink()
+
+    with patch.object(RAGService, "_markdown_files", return_value=files):
+        signature = DocsWatcher.signature()
+
+    assert [entry[0] for entry in signature] == ["projects/portfolio.md", "skills.md"]
+
+
+async def test_watcher_keeps_polling_after_a_failed_poll():
+    signatures = iter([OSError("rag_docs unavailable"), ("skills.md", 1, 1)])
+    reloaded = asyncio.Event()
+
+    def signature():
+        result = next(signatures)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def reload_index():
+        reloaded.set()
+
+    with (
+        patch.object(DocsWatcher, "signature", signature),
+        patch("app.services.docs_watcher.reload_index", reload_index),
+        patch("app.services.docs_watcher.settings.docs_watch_interval_seconds", 0),
+    ):
+        task = asyncio.create_task(DocsWatcher.run())
+        try:
+            await asyncio.wait_for(reloaded.wait(), timeout=1)
+        finally:
+            task.cancel()
+
+
+def test_admin_reload_requires_token(client):
+    with patch("app.core.auth.settings.admin_token", ""):
+        assert client.post("/admin/reload").status_code == 404
+    with patch("app.core.auth.settings.admin_token", "secret"):
+        response = client.post("/admin/reload", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 401
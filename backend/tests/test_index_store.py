@@ -0,0 +1,99 @@
+"""Tests for the index artifact store."""
+
+import threading
+import time
+
+import faiss
+import numpy as np
+
+from app.services.documents import Document
+from app.services.index_store import (
+    CHUNKS_FILE,
+    ChunkStore,
+    build_lock,
+    current_artifact,
+    new_build_dir,
+    open_index,
+    publish,
+    read_manifest,
+    verify_artifact,
+    write_artifact,
+)
+
+
+def _write(tmp_path):
+    documents = [
+        Document(content="Python and FastAPI", source="skills.md"),
+        Document(content="Deaf, prefers text — email or LinkedIn", source="about.md"),
+    ]
+    vectors = np.eye(2, 4, dtype=np.float32)
+    index = faiss.IndexFlatL2(4)
+    index.add(vectors)
+    manifest = write_artifact(
+        tmp_path, index, documents, "test-model", {"chunk_size": 500}
+    )
+    return documents, vectors, manifest
+
+
+def test_round_trip(tmp_path):
+    """Chunks and index should load back without pickle."""
+    documents, vectors, manifest = _write(tmp_path)
+
+    assert read_manifest(tmp_path) == manifest
+    assert manifest["dimension"] == 4
+    assert manifest["count"] == 2
+
+    store = ChunkStore(tmp_path)
+    assert len(store) == 2
+    assert list(store) == documents
+    assert store[-1] == documents[1]
+
+    _, indices = open_index(tmp_path).search(vectors[1:], k=1)
+    assert indices[0][0] == 1
+
+
+def test_verify_detects_corruption(tmp_path):
+    """Checksum verification should flag modified files."""
+    _, _, manifest = _write(tmp_path)
+    assert verify_artifact(tmp_path, manifest) == []
+
+    with open(tmp_path / CHUNKS_FILE, "ab") as f:
+        f.write(b"tampered")
+
+    assert verify_artifact(tmp_path, manifest) == [CHUNKS_FILE]
+
+
+def test_publish_swaps_current_and_prunes_old_versions(tmp_path):
+    """Each publish should repoint `current` and keep only recent versions."""
+    published = []
+    for _ in range(3):
+        with build_lock(tmp_path):
+            build_dir = new_build_dir(tmp_path)
+            _write(build_dir)
+            published.append(publish(tmp_path, build_dir))
+
+    assert current_artifact(tmp_path) == published[-1].resolve()
+    assert read_manifest(current_artifact(tmp_path)) is not None
+    assert not published[0].exists()
+    assert published[1].exists()
+
+
+def test_build_lock_is_exclusive(tmp_path):
+    """Only one holder of the build lock at a time, even across threads."""
+    active, overlaps = [], []
+
+    def hold():
+        with build_lock(tmp_path):
+            if active:
+                overlaps.append(True)
+            active.append(True)
+            time.sleep(0.02)
+            active.pop()
+
+    threads = [threading.Thread(target=hold) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert overlaps == []
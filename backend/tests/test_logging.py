@@ -0,0 +1,74 @@
+"""Tests for the background structured log writer."""
+
+import json
+import threading
+
+import pytest
+
+from app.core.logging import LogWriter
+
+
+class SlowStream:
+    """stderr stand-in whose writes wait until released."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.writing = threading.Event()
+        self.lines: list[str] = []
+
+    def write(self, text: str) -> None:
+        self.writing.set()
+        self.release.wait(5)
+        self.lines += text.splitlines()
+
+    def flush(self) -> None:
+        pass
+
+
+@pytest.fixture
+def stream():
+    return SlowStream()
+
+
+def test_records_are_written_unchanged_on_stop(stream):
+    """Every queued record should be flushed, one JSON line each."""
+    stream.release.set()
+    writer = LogWriter(max_size=100, stream=stream)
+    entries = [{"type": "chat_request", "metrics": {"n": i}} for i in range(50)]
+    for entry in entries:
+        writer.emit(entry)
+    writer.stop()
+
+    assert [json.loads(line) for line in stream.lines] == entries
+
+
+def test_full_queue_drops_and_reports(stream):
+    """With a stuck writer, excess records are counted and reported later."""
+    writer = LogWriter(max_size=2, batch_size=1, stream=stream)
+    writer.emit({"n": 0})
+    assert stream.writing.wait(5)
+    for i in range(1, 6):
+        writer.emit({"n": i})
+
+    assert writer.dropped == 3
+    stream.release.set()
+    writer.stop()
+
+    records = [json.loads(line) for line in stream.lines]
+    assert [r["n"] for r in records if "n" in r] == [0, 1, 2]
+    assert [r["dropped"] for r in records if r.get("type") == "log_dropped"] == [3]
+
+
+def test_block_policy_waits_for_room(stream):
+    """The block policy should only drop after its timeout."""
+    writer = LogWriter(
+        max_size=1, policy="block", block_timeout=0.01, batch_size=1, stream=stream
+    )
+    writer.emit({"n": 0})
+    assert stream.writing.wait(5)
+    writer.emit({"n": 1})
+    writer.emit({"n": 2})
+
+    assert writer.dropped == 1
+    stream.release.set()
+    writer.stop()
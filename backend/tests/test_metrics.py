@@ -0,0 +1,85 @@
+"""Tests for in-process metrics and the /metrics endpoint."""
+
+from unittest.mock import MagicMock, patch
+
+from app.core.metrics import Histogram, Stages
+
+
+def test_histogram_quantiles_follow_the_distribution():
+    """Quantiles should land in the buckets holding p50/p95/p99."""
+    histogram = Histogram("test_seconds", "Test", labels=("stage",))
+    for _ in range(90):
+        histogram.observe(0.004, "embed")
+    for _ in range(10):
+        histogram.observe(2.0, "embed")
+
+    assert histogram.count("embed") == 100
+    assert 0.0025 < histogram.quantile(0.5, "embed") <= 0.005
+    assert 1.0 < histogram.quantile(0.95, "embed") <= 2.5
+    assert histogram.quantile(0.5, "other") == 0.0
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Bucket counts are cumulative and end with +Inf equal to the count."""
+    histogram = Histogram("test_seconds", "Test", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    samples = {name + labels: value for name, labels, value in histogram.samples()}
+    assert samples['test_seconds_bucket{le="0.1"}'] == 1
+    assert samples['test_seconds_bucket{le="1"}'] == 2
+    assert samples['test_seconds_bucket{le="+Inf"}'] == 3
+    assert samples["test_seconds_count"] == 3
+    assert samples["test_seconds_sum"] == 5.55
+
+
+def test_stages_accumulate_per_request():
+    """Repeated stages add up; the breakdown is in milliseconds."""
+    stages = Stages()
+    stages.add("generate", 0.25)
+    stages.add("generate", 0.25)
+    with stages.time("prompt"):
+        pass
+
+    breakdown = stages.as_ms()
+    assert breakdown["generate"] == 500.0
+    assert 0 <= breakdown["prompt"] < 50
+
+
+def test_metrics_endpoint_reports_chat_stages(client):
+    """A chat request should show up in the request and stage metrics."""
+
+    async def mock_generate(*args, stages, **kwargs):
+        stages.add("generate", 0.2)
+        return {
+            "response": "ok",
+            "sources": [],
+            "confidence": 0.9,
+            "has_sufficient_context": True,
+        }
+
+    instance = MagicMock(generate_response=mock_generate)
+    with (
+        patch(
+            "app.services.rag_service.RAGService.get_instance", return_value=instance
+        ),
+        patch("app.core.logging.PortfolioLogger.log_chat_request") as log,
+    ):
+        assert client.post("/api/chat", json={"message": "Hi"}).status_code == 200
+
+    assert set(log.call_args.kwargs["stages"]) == {"sanitize", "generate"}
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'portfolio_requests_total{endpoint="chat"}' in body
+    assert 'portfolio_stage_duration_seconds_bucket{stage="generate",le="0.25"}' in body
+    assert 'stage="generate",quantile="0.99"' in body
+
+
+def test_metrics_endpoint_can_be_disabled(client):
+    """METRICS_ENABLED=false should hide the endpoint."""
+    with patch("app.routers.metrics.settings.metrics_enabled", False):
+        assert client.get("/metrics").status_code == 404
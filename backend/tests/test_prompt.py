@@ -0,0 +1,72 @@
+"""Tests for prompt assembly."""
+
+from unittest.mock import patch
+
+from app.services.chunking import TextSplitter
+from app.services.documents import Document
+from app.services.prompt import (
+    COMPACTION_MARKER,
+    PromptAssembler,
+    count_tokens,
+    merge_overlaps,
+)
+
+
+def test_overlapping_chunks_are_sent_once():
+    """Adjacent chunks should be merged back into their source text."""
+    text = " ".join(f"word{i}" for i in range(120))
+    chunks = TextSplitter(chunk_size=200, chunk_overlap=50).split(text, "a.md")
+    assert chunks[0].end > chunks[1].start
+
+    merged = merge_overlaps([chunks[1], chunks[0], chunks[2]])
+
+    assert len(merged) == 1
+    assert merged[0].content == text[chunks[0].start : chunks[2].end]
+
+
+def test_chunks_from_other_sources_are_not_merged():
+    """Offsets are only comparable within one source file."""
+    a = Document(content="alpha beta", source="a.md", start=0, end=10)
+    b = Document(content="beta gamma", source="b.md", start=6, end=16)
+
+    assert merge_overlaps([a, b]) == [a, b]
+
+
+def test_context_keeps_best_chunks_within_budget():
+    """Lower-ranked chunks are dropped once the context budget is spent."""
+    documents = [
+        Document(content=f"{name} " * 40, source=f"{name}.md")
+        for name in ("first", "second", "third")
+    ]
+    prompt = PromptAssembler(max_context_tokens=60).assemble(
+        "system", "question", documents, []
+    )
+
+    assert prompt.context.split()[0] == "first"
+    assert "third" not in prompt.context
+    assert prompt.tokens["chunks_dropped"] == 2
+    assert prompt.tokens["context"] <= 60
+
+
+def test_older_history_is_compacted_then_dropped():
+    """Recent turns stay verbatim; older ones shrink, the oldest go first."""
+    long_turn = "detail " * 200
+    history = [
+        {"role": "user" if i % 2 == 0 else "model", "content": f"turn{i} {long_turn}"}
+        for i in range(8)
+    ]
+    with (
+        patch("app.services.prompt.settings.prompt_history_verbatim_messages", 2),
+        patch("app.services.prompt.settings.prompt_compacted_message_tokens", 10),
+    ):
+        prompt = PromptAssembler(max_input_tokens=500).assemble(
+            "system", "question", [], history
+        )
+
+    kept = prompt.history
+    assert kept[-1]["content"] == history[-1]["content"]
+    assert kept[0]["role"] == "user"
+    assert all(msg["content"].endswith(COMPACTION_MARKER) for msg in kept[:-2])
+    assert prompt.tokens["history_dropped"] == len(history) - len(kept)
+    assert prompt.tokens["total"] <= 500
+    assert prompt.tokens["history"] == sum(count_tokens(m["content"]) for m in kept)
@@ -0,0 +1,145 @@
+"""Tests for RAG service."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from app.services.bm25 import BM25Index
+from app.services.cache import SemanticResponseCache
+from app.services.documents import Document
+from app.services.rag_service import IndexSnapshot, RAGService
+
+
+def test_get_instance_is_single_flight_across_threads():
+    """Concurrent first calls should construct exactly one instance."""
+    constructed = []
+
+    def slow_load(self):
+        constructed.append(self)
+        time.sleep(0.05)
+
+    with (
+        patch.object(RAGService, "_load_index", slow_load),
+        patch.object(RAGService, "_instance", None),
+    ):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(RAGService.get_instance()))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert len(constructed) == 1
+    assert all(r is constructed[0] for r in results)
+
+
+def test_select_hits_applies_cutoff_and_margin():
+    """Only hits above the cutoff and near the best score should be kept."""
+    scores = np.array([0.82, 0.78, 0.66, 0.58, 0.30], dtype=np.float32)
+    indices = np.array([4, 2, 7, 1, -1])
+
+    with (
+        patch("app.services.rag_service.settings.retrieval_min_similarity", 0.55),
+        patch("app.services.rag_service.settings.retrieval_relative_margin", 0.1),
+    ):
+        hits = RAGService._select_hits(scores, indices)
+
+    assert [idx for _, idx in hits] == [4, 2]
+
+
+def test_select_hits_returns_nothing_below_cutoff():
+    """Irrelevant chunks should not reach the prompt at all."""
+    hits = RAGService._select_hits(np.array([0.2, 0.1]), np.array([0, 1]))
+
+    assert hits == []
+
+
+def test_calibrated_relevance_is_bounded():
+    """Relevance scores should map cosine similarity onto [0, 1]."""
+    assert RAGService._calibrate(0.1) == 0.0
+    assert RAGService._calibrate(0.99) == 1.0
+    assert 0.0 < RAGService._calibrate(0.7) < 1.0
+
+
+def test_fuse_orders_by_reciprocal_rank():
+    """Chunks found by both retrievers should outrank single-list hits."""
+    vector_hits = [(0.9, 3), (0.6, 5)]
+    keyword_hits = [(1.0, 5), (0.7, 8)]
+
+    fused = RAGService._fuse(vector_hits, keyword_hits)
+
+    assert [idx for _, idx in fused] == [5, 3, 8]
+    assert dict((idx, score) for score, idx in fused)[5] == 1.0
+
+
+def _keyword_service() -> RAGService:
+    """A service over two documents with a keyword index and no vector search."""
+    documents = [
+        Document(content="Python and FastAPI", source="skills.md"),
+        Document(content="Terraform on AWS", source="infra.md"),
+    ]
+    service = RAGService.__new__(RAGService)
+    service.embedder = SimpleNamespace(model="test-embedding")
+    service.response_cache = None
+    service.snapshot = IndexSnapshot(
+        index=object(),
+        documents=documents,
+        keyword_index=BM25Index.build([d.content for d in documents]),
+        version="test",
+    )
+    return service
+
+
+async def _fail_to_embed(query):
+    raise AssertionError("query should not be embedded")
+
+
+async def test_strong_keyword_match_skips_query_embedding():
+    """Exact-term questions should be answered without embedding the query."""
+    service = _keyword_service()
+
+    with patch.object(service, "_cached_embed_query", _fail_to_embed):
+        retrieval = await service._retrieve("Terraform?")
+
+    assert retrieval.mode == "keyword"
+    assert retrieval.query_embedding is None
+    assert [s["document"] for s in retrieval.sources] == ["infra.md"]
+
+
+async def test_repeated_keyword_match_is_served_from_response_cache():
+    """Fast-path answers should be cached despite having no query embedding."""
+    service = _keyword_service()
+    service.response_cache = SemanticResponseCache(
+        max_size=8, ttl_seconds=60, similarity=0.95
+    )
+
+    with patch.object(service, "_cached_embed_query", _fail_to_embed):
+        first = await service._retrieve("Terraform?")
+        assert service._cached_response(first, []) is None
+        service._cache_response(first, [], "Yuka uses Terraform on AWS.")
+        repeated = await service._retrieve("  terraform? ")
+
+    assert repeated.mode == "keyword"
+    assert service._cached_response(repeated, []) == "Yuka uses Terraform on AWS."
+    assert service.response_cache.stats()["hits"] == 1
+
+
+def test_documents_are_loaded_recursively(tmp_path):
+    """Markdown in subdirectories should be indexed with relative sources."""
+    (tmp_path / "projects").mkdir()
+    (tmp_path / "about.md").write_text("# About\nDeaf, prefers text.\n")
+    (tmp_path / "projects" / "portfolio.md").write_text("# Portfolio\nRAG chat.\n")
+
+    with patch("app.services.rag_service.RAG_DOCS_PATH", tmp_path):
+        documents = RAGService._load_documents()
+
+    assert [(d.source, d.anchor) for d in documents] == [
+        ("about.md", "about"),
+        ("projects/portfolio.md", "portfolio"),
+    ]
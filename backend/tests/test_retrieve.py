@@ -0,0 +1,115 @@
+"""Tests for batched retrieval and the /api/retrieve endpoint."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.embedding_backends import StubEmbeddingProvider
+from app.services.rag_service import RAGService
+
+QUERIES = [
+    "Which Python web frameworks?",
+    "Cloud infrastructure experience",
+    "Accessibility and communication",
+]
+
+
+@pytest.fixture
+def service(tmp_path):
+    """RAGService over a small stub-embedded index; counts query batches."""
+    docs = tmp_path / "rag_docs"
+    docs.mkdir()
+    (docs / "skills.md").write_text("# Skills\n\nPython, FastAPI and Django.\n")
+    (docs / "cloud.md").write_text("# Cloud\n\nTerraform on AWS and Google Cloud.\n")
+    (docs / "about.md").write_text("# About\n\nDeaf, prefers text communication.\n")
+    provider = StubEmbeddingProvider()
+    provider.batches = []
+    embed_queries = provider.embed_queries
+
+    def counting_embed(texts):
+        provider.batches.append(list(texts))
+        return embed_queries(texts)
+
+    provider.embed_queries = counting_embed
+    with (
+        patch("app.services.rag_service.RAG_DOCS_PATH", docs),
+        patch("app.services.rag_service.INDEX_PATH", tmp_path / "faiss_index"),
+        patch("app.services.rag_service.embedding_provider", return_value=provider),
+        patch("app.services.rag_service.embedding_model", return_value=provider.model),
+        patch.object(settings, "retrieval_min_similarity", 0.0),
+        patch.object(settings, "similarity_floor", 0.0),
+        patch.object(settings, "keyword_fast_path_score", 0.0),
+    ):
+        yield RAGService()
+
+
+async def test_retrieve_many_matches_single_queries(service):
+    """Batched results should equal one-at-a-time retrieval, in query order."""
+    batched = await service.retrieve_many(QUERIES)
+    service.query_cache.clear()
+    single = [await service._retrieve(query) for query in QUERIES]
+
+    assert [r.sources for r in batched] == [r.sources for r in single]
+    assert [r.chunk_ids for r in batched] == [r.chunk_ids for r in single]
+    assert batched[0].sources[0]["document"] == "skills.md"
+
+
+async def test_retrieve_many_embeds_misses_in_one_batch(service):
+    """Uncached queries share one embedding call; duplicates and hits are free."""
+    await service.retrieve_many(QUERIES[:1])
+    service.embedder.batches.clear()
+
+    results = await service.retrieve_many([*QUERIES, QUERIES[1]], k=1)
+
+    assert service.embedder.batches == [QUERIES[1:]]
+    # The repeated miss is embedded once, with the first occurrence
+    assert [r.embedding_cache for r in results] == ["memory", None, None, None]
+    assert results[3].sources == results[1].sources
+    assert all(len(r.sources) <= 1 for r in results)
+
+
+@pytest.fixture
+def admin_headers():
+    with patch.object(settings, "admin_token", "secret"):
+        yield {"X-Admin-Token": "secret"}
+
+
+def test_retrieve_endpoint_requires_admin_token(client, service):
+    """Without ADMIN_TOKEN the endpoint is hidden; a wrong token is refused."""
+    body = {"queries": QUERIES}
+    service.embedder.batches.clear()
+    with patch.object(RAGService, "_instance", service):
+        with patch.object(settings, "admin_token", ""):
+            assert client.post("/api/retrieve", json=body).status_code == 404
+        with patch.object(settings, "admin_token", "secret"):
+            assert client.post("/api/retrieve", json=body).status_code == 401
+            response = client.post(
+                "/api/retrieve", json=body, headers={"X-Admin-Token": "wrong"}
+            )
+            assert response.status_code == 401
+
+    assert service.embedder.batches == []
+
+
+def test_retrieve_endpoint_returns_one_result_per_query(client, service, admin_headers):
+    """The endpoint should skip generation and preserve query order."""
+    with patch.object(RAGService, "_instance", service):
+        response = client.post(
+            "/api/retrieve", json={"queries": QUERIES, "k": 2}, headers=admin_headers
+        )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == len(QUERIES)
+    assert results[1]["sources"][0]["document"] == "cloud.md"
+    assert all(len(r["sources"]) <= 2 for r in results)
+
+
+def test_retrieve_endpoint_limits_batch_size(client, admin_headers):
+    """Empty or oversized batches should be rejected before retrieval."""
+    too_many = ["q"] * (settings.max_retrieve_queries + 1)
+
+    for body in ({"queries": []}, {"queries": too_many}, {"queries": ["q"], "k": 0}):
+        response = client.post("/api/retrieve", json=body, headers=admin_headers)
+        assert response.status_code == 422
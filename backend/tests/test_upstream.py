@@ -0,0 +1,149 @@
+"""Tests for the upstream call manager and overload responses."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from google.genai import errors
+
+from app.services.rag_service import RAGService
+from app.services.upstream import UpstreamManager, UpstreamOverloaded
+
+
+def _api_error(status: int, retry_after: str = "") -> errors.APIError:
+    response = requests.Response()
+    response.status_code = status
+    response._content = b"{}"
+    if retry_after:
+        response.headers["Retry-After"] = retry_after
+    return errors.APIError(status, response)
+
+
+def _manager(**kwargs) -> UpstreamManager:
+    options = {
+        "max_concurrency": 2,
+        "max_queue": 2,
+        "max_retries": 2,
+        "retry_base_delay": 0,
+        "deadline_seconds": 5,
+        "coalesce": True,
+    }
+    return UpstreamManager("test", **{**options, **kwargs})
+
+
+class Upstream:
+    """Counts calls; fails with the queued errors first, then sleeps and answers."""
+
+    def __init__(self, *failures: Exception, latency: float = 0.05) -> None:
+        self.failures = list(failures)
+        self.latency = latency
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        await asyncio.sleep(self.latency)
+        return "ok"
+
+
+async def test_identical_in_flight_calls_are_coalesced():
+    """Callers with the same key should share a single upstream request."""
+    manager = _manager()
+    upstream = Upstream()
+
+    results = await asyncio.gather(
+        *(manager.call(upstream, timeout=1, key="same") for _ in range(5)),
+        manager.call(upstream, timeout=1, key="other"),
+    )
+
+    assert results == ["ok"] * 6
+    assert upstream.calls == 2
+    # Finished calls are not reused
+    await manager.call(upstream, timeout=1, key="same")
+    assert upstream.calls == 3
+
+
+async def test_retryable_errors_are_retried():
+    """429 and 5xx responses should be retried; other errors should not."""
+    upstream = Upstream(_api_error(429), _api_error(503))
+    assert await _manager().call(upstream, timeout=1) == "ok"
+    assert upstream.calls == 3
+
+    upstream = Upstream(_api_error(400))
+    with pytest.raises(errors.APIError):
+        await _manager().call(upstream, timeout=1)
+    assert upstream.calls == 1
+
+
+async def test_rate_limit_past_retries_keeps_status_and_retry_after():
+    """An upstream 429 outliving the retries should surface as a 429."""
+    upstream = Upstream(*[_api_error(429, retry_after="0.01")] * 3)
+
+    with pytest.raises(UpstreamOverloaded) as excinfo:
+        await _manager().call(upstream, timeout=1)
+
+    assert upstream.calls == 3
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers == {"Retry-After": "1"}
+
+
+async def test_retries_stop_at_the_deadline():
+    """A Retry-After beyond the deadline should not be waited out."""
+    upstream = Upstream(_api_error(503, retry_after="30"))
+
+    with pytest.raises(UpstreamOverloaded) as excinfo:
+        await _manager(deadline_seconds=1).call(upstream, timeout=1)
+
+    assert upstream.calls == 1
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "30"}
+
+
+async def test_full_queue_is_shed_immediately():
+    """Calls beyond the slots and the queue should fail fast with 503."""
+    manager = _manager(max_concurrency=1, max_queue=1)
+    upstream = Upstream(latency=0.2)
+    running = [asyncio.create_task(manager.call(upstream, timeout=1)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert manager.stats() == {"in_flight": 1, "queued": 1}
+
+    with pytest.raises(UpstreamOverloaded) as excinfo:
+        await manager.call(upstream, timeout=1)
+
+    assert excinfo.value.status_code == 503
+    assert int(excinfo.value.headers["Retry-After"]) >= 1
+    assert await asyncio.gather(*running) == ["ok", "ok"]
+    assert manager.stats() == {"in_flight": 0, "queued": 0}
+
+
+async def test_queued_calls_are_shed_at_the_deadline():
+    """A call that cannot get a slot before its deadline should give up."""
+    manager = _manager(max_concurrency=1, deadline_seconds=0.05)
+    upstream = Upstream()
+
+    async with manager.slot():
+        with pytest.raises(UpstreamOverloaded):
+            await manager.call(upstream, timeout=1)
+
+    assert upstream.calls == 0
+    assert manager.stats() == {"in_flight": 0, "queued": 0}
+
+
+def test_chat_returns_retry_after_when_overloaded(client):
+    """Overloads should map to 429/503 with Retry-After, not a generic 500."""
+    service = MagicMock()
+    service.generate_response.side_effect = UpstreamOverloaded("generate", 429, 2.5)
+    service.gemini.upstream.check_capacity.side_effect = UpstreamOverloaded(
+        "generate", 503, 1.0
+    )
+
+    with patch.object(RAGService, "_instance", service):
+        response = client.post("/api/chat", json={"message": "Hello"})
+        stream = client.post("/api/chat/stream", json={"message": "Hello"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert stream.status_code == 503
+    assert stream.headers["Retry-After"] == "1"
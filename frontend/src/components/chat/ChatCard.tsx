@@ -188,6 +188,7 @@ export const ChatCard: React.FC<ChatCardProps> = ({ initialText }) => {
             value={inputValue}
             onChange={(e) => setInputValue(e.target.value)}
             placeholder="Type your question..."
+            maxLength={2000}
             disabled={isLoading}
             aria-label="Chat message input"
             className="w-full bg-bg-input border-2 border-border-primary rounded-xl px-3 sm:px-4 py-2.5 sm:py-3.5 text-xs sm:text-sm text-text-primary placeholder:text-text-muted focus:outline-none focus:border-coral-300 focus:ring-2 focus:ring-coral-200 transition-all shadow-inner"
@@ -2,6 +2,9 @@ import { useState, useCallback } from 'react';
 import type { ChatMessage, ChatResponse } from '../types/chat';
 import { chatService } from '../services/chatService';
 
+// The backend only uses the most recent turns and caps request size
+const MAX_HISTORY_MESSAGES = 10;
+
 export const useChat = () => {
   const [messages, setMessages] = useState<ChatMessage[]>([]);
   const [isLoading, setIsLoading] = useState(false);
@@ -20,7 +23,7 @@ export const useChat = () => {
       try {
         const response: ChatResponse = await chatService.sendMessage({
           message: content,
-          history: messages,
+          history: messages.slice(-MAX_HISTORY_MESSAGES),
           conversation_id: conversationId,
         });
 
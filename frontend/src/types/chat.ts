@@ -13,6 +13,8 @@ export interface Source {
   document: string;
   relevance_score: number;
   excerpt: string;
+  section?: string;
+  anchor?: string;
 }
 
 export interface ChatResponse {